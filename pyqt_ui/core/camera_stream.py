@@ -3,44 +3,430 @@
 import cv2
 import threading
 import time
+import numpy as np
+from collections import deque
 from PyQt6.QtCore import QObject, pyqtSignal
-from PyQt6.QtGui import QImage
-from PyQt6.QtWidgets import QMessageBox
+from core.tick_scheduler import TickScheduler
+from core.frame_pool import FramePool
+from core.frame_mailbox import FrameMailbox
+from core.frame_sources import CameraSource, SyntheticSource
+from core.shared_frames import SharedFrameWriter
 
 
 class CameraStreamHandler(QObject):
-    frame_updated = pyqtSignal(QImage)
+    # Emitted with a message when the frame source cannot be opened
+    error_occurred = pyqtSignal(str)
+    # Emitted by the worker thread, with itself, as its last action once the source is released
+    worker_finished = pyqtSignal(object)
 
-    def __init__(self, camera_index=0, parent=None):
+    def __init__(self, camera_index=0, fps=30.0, pool_size=4, source=None, undistorter=None, detector=None,
+                 shared_name=None, shared_slots=4, parent=None):
+        """
+        Capture frames from a frame source on a worker thread.
+
+        :param camera_index: Camera device index, used when no source is given.
+        :param fps: Capture rate.
+        :param pool_size: Number of frame buffers per pool.
+        :param source: A core.frame_sources.FrameSource (default: the camera device).
+        :param undistorter: Optional core.undistort.Undistorter applied to every frame.
+        :param detector: Optional core.magnet_detector.MagnetDetector whose detections are
+                         published in frame.meta['detections'] (drawn by sections.camera_section).
+        :param shared_name: Name of a shared memory ring every frame is published to, for
+                            other processes (core.shared_frames.SharedFrameReader); None disables it.
+        :param shared_slots: Number of frames kept in the shared ring.
+        :param parent: Parent object (default None)
+        """
         super().__init__(parent)
         self.running = False
-        self.cap = None
-        self.camera_index = camera_index
+        self.source = source if source is not None else CameraSource(camera_index)
+        self.undistorter = undistorter
+        self.detector = detector
+        self.shared_name = shared_name
+        self.shared_slots = shared_slots
+        self.shared_writer = None
+        # Distorted image scratch buffer, reused by the source when undistorting
+        self.raw = None
+        self.scheduler = TickScheduler(fps)
+        self.pool_size = pool_size
+        self.pool = FramePool(pool_size)
+        # Frames resized for display, so the GUI thread only has to blit them
+        self.display_pool = FramePool(pool_size)
+        self.target_size = None
+        # Set to False while no one shows this stream, to skip the display path entirely
+        self.display_enabled = True
+        # Latest captured frame; consumers connect to mailbox.frame_available and take() it
+        self.mailbox = FrameMailbox()
+        self.frame_shape = None
+        self.thread = None
+        # Set when start() is called while the previous worker is still closing its source
+        self.restart_pending = False
+        self.worker_finished.connect(self.reap_worker)
+        self.scale_times = deque(maxlen=300)
+        # Optional core.video_recorder.VideoRecorder fed with every captured frame
+        self.recorder = None
+        self.reset_stats()
+
+    def reset_stats(self):
+        """Reset the capture counters."""
+        self.sequence = 0
+        self.frames_captured = 0
+        self.frames_dropped = 0
+        self.frames_shared = 0
+        self.stats_started = time.monotonic()
+        self.scale_times.clear()
+        self.mailbox.reset_stats()
 
     def start(self):
-        """Start the camera stream in a separate thread."""
-        self.cap = cv2.VideoCapture(self.camera_index)
-        if not self.cap.isOpened():
-            QMessageBox.warning(None, "Camera Error", "Unable to access the camera.")
+        """
+        Start the camera stream in a separate thread.
+
+        Never blocks: the source is opened on the worker, and if the previous
+        worker is still releasing its source the new one is started when it
+        has finished. Calling start() on a running stream does nothing, and a
+        stopped stream can be started again.
+        """
+        if self.running:
             return
+        if self.thread is not None and self.thread.is_alive():
+            self.restart_pending = True
+            return
+        self.thread = None
+        self.restart_pending = False
         self.running = True
-        threading.Thread(target=self.run, daemon=True).start()
+        self.scheduler.start()
+        self.reset_stats()
+        self.frame_shape = None
+        if self.recorder is not None:
+            self.recorder.start()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
 
     def stop(self):
-        """Stop the camera stream."""
+        """
+        Ask the worker to stop and return at once.
+
+        The worker releases the source on its way out and then emits
+        worker_finished; a pending read does not block the caller.
+        """
         self.running = False
-        if self.cap:
-            self.cap.release()
+        self.restart_pending = False
+        self.scheduler.stop()
+        self.mailbox.clear()
+        if self.recorder is not None:
+            self.recorder.stop()
+
+    def reap_worker(self, thread):
+        """
+        Forget the finished worker, and start the stream again if start() was called meanwhile.
+
+        The worker may still be returning from run() when this slot runs, so it
+        is identified by the thread it sent rather than by is_alive(): it has
+        nothing left to release.
+        """
+        if thread is self.thread:
+            self.thread = None
+        if self.restart_pending and self.thread is None:
+            self.start()
+
+    def wait(self, timeout=None):
+        """Block until the worker (and the recorder) have exited (for scripts and benchmarks, not the GUI thread)."""
+        if self.thread is not None and self.thread is not threading.current_thread():
+            self.thread.join(timeout)
+        if self.recorder is not None:
+            self.recorder.wait(timeout)
+        return self.thread is None or not self.thread.is_alive()
+
+    def set_recorder(self, recorder):
+        """
+        Attach a VideoRecorder (or None to detach it).
+
+        The capture pool grows by the recorder's queue size, so frames waiting
+        to be encoded never starve the capture of buffers.
+        """
+        if self.recorder is not None:
+            self.recorder.stop()
+            self.recorder.on_error = None
+        self.recorder = recorder
+        if recorder is not None:
+            recorder.on_error = self.error_occurred.emit
+        count = self.pool_size + (recorder.queue.maxsize if recorder is not None else 0)
+        if count != self.pool.count:
+            self.pool = FramePool(count)
+            self.frame_shape = None
+        if recorder is not None and self.running:
+            recorder.start()
+
+    def set_target_size(self, width, height):
+        """Set the size displayed frames should fit in (None or a non-positive size disables scaling)."""
+        if width is None or width <= 0 or height <= 0:
+            self.target_size = None
+        else:
+            self.target_size = (int(width), int(height))
+
+    def fit_size(self, shape, target):
+        """Return the (width, height) of a frame scaled to fit in target, keeping its aspect ratio."""
+        h, w = shape[:2]
+        scale = min(target[0] / w, target[1] / h)
+        return max(1, int(w * scale)), max(1, int(h * scale))
+
+    def make_display_frame(self, frame):
+        """
+        Return a new reference to the frame to display, resized to the target size.
+
+        :return: A Frame the caller owns, or None if no display buffer is free.
+        """
+        target = self.target_size
+        if target is None:
+            return frame.retain()
+        width, height = self.fit_size(frame.shape, target)
+        if (height, width) == frame.shape[:2]:
+            return frame.retain()
+
+        display = self.display_pool.acquire((height, width) + frame.shape[2:])
+        if display is None:
+            self.frames_dropped += 1
+            return None
+        start = time.perf_counter()
+        interpolation = cv2.INTER_AREA if width < frame.shape[1] else cv2.INTER_LINEAR
+        cv2.resize(frame.array, (width, height), dst=display.array, interpolation=interpolation)
+        self.scale_times.append(time.perf_counter() - start)
+        display.sequence = frame.sequence
+        display.timestamp = frame.timestamp
+        display.meta = dict(frame.meta)
+        # Display pixels per captured pixel, to place the detections on the scaled frame
+        display.meta['scale'] = width / frame.shape[1]
+        return display
+
+    def read_frame(self):
+        """Read the next camera image into a pooled buffer, or return None."""
+        if self.undistorter is not None:
+            return self.read_undistorted_frame()
+        if self.frame_shape is None:
+            # First frame: learn the camera resolution, then size the pool for it
+            ret, image = self.source.read()
+            if not ret:
+                return None
+            self.frame_shape = image.shape
+            frame = self.pool.acquire(self.frame_shape)
+            if frame is None:
+                # Same resolution as before a restart, and its buffers are still held downstream
+                self.frames_dropped += 1
+                return None
+            np.copyto(frame.array, image)
+            return frame
+
+        frame = self.pool.acquire(self.frame_shape)
+        if frame is None:
+            # Every buffer is still in use downstream: skip this image without decoding it
+            self.source.grab()
+            self.frames_dropped += 1
+            return None
+        ret, image = self.source.read(frame.array)
+        if not ret or image is not frame.array:
+            # Read failed, or the camera changed resolution and OpenCV allocated a new image
+            if ret:
+                self.frame_shape = image.shape
+            frame.release()
+            return None
+        return frame
+
+    def read_undistorted_frame(self):
+        """Read the next image into the scratch buffer and remap it into a pooled buffer."""
+        frame = None
+        if self.frame_shape is not None:
+            frame = self.pool.acquire(self.frame_shape)
+            if frame is None:
+                self.source.grab()
+                self.frames_dropped += 1
+                return None
+        ret, image = self.source.read(self.raw)
+        if not ret:
+            if frame is not None:
+                frame.release()
+            return None
+        self.raw = image
+        if frame is None or frame.shape != image.shape:
+            # First frame or new resolution: size the pool (and the remap tables) for it
+            if frame is not None:
+                frame.release()
+            self.frame_shape = image.shape
+            frame = self.pool.acquire(self.frame_shape)
+            if frame is None:
+                self.frames_dropped += 1
+                return None
+        self.undistorter.apply(image, frame.array)
+        return frame
+
+    def publish_shared(self, frame):
+        """Copy a frame into the shared memory ring, creating it on the first frame."""
+        if self.shared_writer is None or frame.array.nbytes > self.shared_writer.ring.slot_bytes:
+            # First frame, or a larger resolution: readers have to attach again
+            self.close_shared()
+            self.shared_writer = SharedFrameWriter(self.shared_name, frame.shape, self.shared_slots)
+        if self.shared_writer.write(frame.array, frame.timestamp) is not None:
+            self.frames_shared += 1
+
+    def close_shared(self):
+        """Remove the shared memory ring, if any."""
+        if self.shared_writer is not None:
+            self.shared_writer.close()
+            self.shared_writer = None
 
     def run(self):
-        """Capture frames from the camera and emit them."""
+        """Open the source, capture frames until stopped, then release the source."""
+        try:
+            if not self.source.open():
+                self.running = False
+                self.error_occurred.emit(f"Unable to access the {self.source.describe()}.")
+                return
+            self.capture_loop()
+        except Exception as e:
+            # Report the failure instead of letting the capture thread die silently
+            self.running = False
+            self.error_occurred.emit(f"Capture from the {self.source.describe()} stopped: {e}")
+        finally:
+            self.source.release()
+            self.close_shared()
+            self.worker_finished.emit(threading.current_thread())
+
+    def capture_loop(self):
+        """Capture frames from the source and publish them."""
         while self.running:
-            ret, frame = self.cap.read()
-            if ret:
-                # Convert the frame to RGB format
-                rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                h, w, ch = rgb_frame.shape
-                bytes_per_line = ch * w
-                qt_image = QImage(rgb_frame.data, w, h, bytes_per_line, QImage.Format.Format_RGB888)
-                self.frame_updated.emit(qt_image)
-            time.sleep(0.03)  # Approximately 30 FPS
+            frame = self.read_frame()
+            if frame is not None:
+                self.sequence += 1
+                self.frames_captured += 1
+                frame.sequence = self.sequence
+                frame.timestamp = time.monotonic()
+                display = None
+                try:
+                    if self.detector is not None:
+                        # Carried to the display frame with the rest of the metadata
+                        frame.meta['detections'] = self.detector.detect(frame.array, frame.timestamp)
+                    if self.shared_name is not None:
+                        self.publish_shared(frame)
+                    # The BGR pixels are shown as-is (QImage.Format_BGR888), no conversion needed
+                    display = self.make_display_frame(frame) if self.display_enabled else None
+                    if self.recorder is not None:
+                        # Never blocks: the recorder drops frames itself when its encoder is behind
+                        self.recorder.submit(frame)
+                    if display is not None:
+                        self.mailbox.put(display)
+                        display = None
+                finally:
+                    frame.release()
+                    if display is not None:
+                        # Never reached the mailbox: give the display buffer back
+                        display.release()
+            if not self.scheduler.wait():
+                break
+
+    def stats(self):
+        """Return capture throughput and buffer usage."""
+        elapsed = max(time.monotonic() - self.stats_started, 1e-9)
+        return {
+            'frames_captured': self.frames_captured,
+            'frames_dropped': self.frames_dropped,
+            'fps': self.frames_captured / elapsed,
+            'pool_allocations': self.pool.allocations + self.display_pool.allocations,
+            'pool_in_flight': self.pool.in_flight(),
+            'scale_ms': 1000 * sum(self.scale_times) / len(self.scale_times) if self.scale_times else 0.0,
+            'undistort_ms': self.undistorter.stats()['remap_ms'] if self.undistorter is not None else 0.0,
+            **{f"display_{key}": value for key, value in self.mailbox.stats().items()},
+            **({f"detect_{key}": value for key, value in self.detector.stats().items()}
+               if self.detector is not None else {}),
+            'frames_shared': self.frames_shared,
+            **({f"record_{key}": value for key, value in self.recorder.stats().items()}
+               if self.recorder is not None else {}),
+        }
+
+
+def benchmark_display(width=1920, height=1080, target=(640, 360), frames=200):
+    """Compare GUI-thread time per frame: scaling on the GUI thread vs blitting a worker-scaled frame."""
+    from PyQt6.QtCore import Qt
+    from PyQt6.QtGui import QGuiApplication, QImage, QPixmap
+
+    app = QGuiApplication.instance() or QGuiApplication([])
+    image = np.random.default_rng(0).integers(0, 255, (height, width, 3), dtype=np.uint8)
+    qimage = QImage(image.data, width, height, image.strides[0], QImage.Format.Format_BGR888)
+
+    start = time.perf_counter()
+    for _ in range(frames):
+        QPixmap.fromImage(qimage).scaled(target[0], target[1], Qt.AspectRatioMode.KeepAspectRatio,
+                                         Qt.TransformationMode.SmoothTransformation)
+    gui_scaling_ms = 1000 * (time.perf_counter() - start) / frames
+
+    handler = CameraStreamHandler()
+    small_w, small_h = handler.fit_size(image.shape, target)
+    small = np.empty((small_h, small_w, 3), dtype=np.uint8)
+    start = time.perf_counter()
+    for _ in range(frames):
+        cv2.resize(image, (small_w, small_h), dst=small, interpolation=cv2.INTER_AREA)
+    worker_scaling_ms = 1000 * (time.perf_counter() - start) / frames
+
+    small_qimage = QImage(small.data, small_w, small_h, small.strides[0], QImage.Format.Format_BGR888)
+    start = time.perf_counter()
+    for _ in range(frames):
+        QPixmap.fromImage(small_qimage)
+    gui_blit_ms = 1000 * (time.perf_counter() - start) / frames
+
+    return {'gui_ms_before': gui_scaling_ms, 'gui_ms_after': gui_blit_ms, 'worker_ms_after': worker_scaling_ms}
+
+
+def benchmark_pipeline(width=3840, height=2160, fps=120.0, target=(960, 540), seconds=3.0):
+    """Run the full capture -> scale -> mailbox path headless on a synthetic source."""
+    handler = CameraStreamHandler(fps=fps, source=SyntheticSource(width, height, fps))
+    handler.set_target_size(*target)
+    handler.start()
+    displayed = 0
+    end = time.monotonic() + seconds
+    while time.monotonic() < end:
+        frame = handler.mailbox.take()
+        if frame is None:
+            time.sleep(0.001)
+            continue
+        handler.mailbox.mark_displayed(frame)
+        frame.release()
+        displayed += 1
+    handler.stop()
+    handler.wait()
+    stats = handler.stats()
+    stats['displayed_fps'] = displayed / seconds
+    return stats
+
+
+def benchmark_recording(width=1920, height=1080, fps=60.0, seconds=3.0, directory=None):
+    """Compare capture FPS of a synthetic stream without and with background recording."""
+    import tempfile
+    from core.video_recorder import VideoRecorder
+
+    def run(recorder):
+        handler = CameraStreamHandler(fps=fps, source=SyntheticSource(width, height, fps))
+        handler.display_enabled = False
+        handler.set_recorder(recorder)
+        handler.start()
+        time.sleep(seconds)
+        handler.stop()
+        handler.wait()
+        return handler.stats()
+
+    with tempfile.TemporaryDirectory() as temp_directory:
+        baseline = run(None)
+        recording = run(VideoRecorder(directory or temp_directory, fps=fps, segment_seconds=1))
+    return {
+        'fps_without_recording': baseline['fps'],
+        'fps_with_recording': recording['fps'],
+        'frames_written': recording['record_frames_written'],
+        'frames_dropped_by_recorder': recording['record_frames_dropped'],
+        'encode_ms': recording['record_encode_ms'],
+        'segments': len(recording['record_segments']),
+    }
+
+
+if __name__ == "__main__":
+    for key, value in benchmark_display().items():
+        print(f"{key}: {value:.3f}")
+    for key, value in benchmark_pipeline().items():
+        print(f"{key}: {value:.3f}" if isinstance(value, float) else f"{key}: {value}")
+    for key, value in benchmark_recording().items():
+        print(f"{key}: {value:.3f}" if isinstance(value, float) else f"{key}: {value}")
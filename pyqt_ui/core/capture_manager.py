@@ -0,0 +1,96 @@
+# core/capture_manager.py
+
+from PyQt6.QtCore import QObject
+from core.camera_stream import CameraStreamHandler
+from core.frame_sources import create_frame_source
+from core.video_recorder import VideoRecorder
+from core.undistort import Undistorter
+from core.magnet_detector import MagnetDetector
+
+
+class CaptureManager(QObject):
+    def __init__(self, stream_settings, default_fps=30.0, recording=None, detection=None, shared_frames=None,
+                 parent=None):
+        """
+        Run several camera streams, each on its own worker thread with its own frame budget.
+
+        :param stream_settings: List of dictionaries with 'name', 'source' (see
+                                core.frame_sources.create_frame_source), and optional
+                                'fps', 'pool_size', 'calibration' (see core.undistort) and
+                                'detection' (see core.magnet_detector).
+        :param default_fps: Rate of the streams that do not set 'fps'.
+        :param recording: Keyword arguments of core.video_recorder.VideoRecorder, plus
+                          'enabled'; each stream records with its name as file prefix.
+        :param detection: Default 'detection' settings of the streams that do not set their own.
+        :param shared_frames: {'enabled', 'prefix', 'slots'}: publish each stream to a shared memory
+                              ring named prefix + stream name, for reader processes.
+        :param parent: Parent object (default None)
+        """
+        super().__init__(parent)
+        self.streams = {}
+        shared_frames = shared_frames or {}
+        shared_prefix = shared_frames.get('prefix', 'mbr_') if shared_frames.get('enabled', False) else None
+        for index, settings in enumerate(stream_settings):
+            name = settings.get('name', f"camera{index}")
+            if name in self.streams:
+                raise ValueError(f"Duplicate camera stream name: {name}.")
+            self.streams[name] = CameraStreamHandler(
+                fps=settings.get('fps', default_fps),
+                pool_size=settings.get('pool_size', 4),
+                source=create_frame_source(settings.get('source', {'type': 'device', 'index': index})),
+                undistorter=Undistorter.from_config(settings.get('calibration')),
+                detector=MagnetDetector.from_config(settings.get('detection', detection)),
+                shared_name=shared_prefix + name if shared_prefix is not None else None,
+                shared_slots=shared_frames.get('slots', 4),
+                parent=self
+            )
+        recording = dict(recording or {})
+        if recording.pop('enabled', False):
+            for name, handler in self.streams.items():
+                handler.set_recorder(VideoRecorder(prefix=name, fps=handler.scheduler.rate_hz, **recording))
+
+    @classmethod
+    def from_config(cls, config_manager, parent=None):
+        """Build the streams from the 'cameras' list of the config, or from the single 'camera' entry."""
+        default_fps = config_manager.get('camera', 'fps', default=30)
+        streams = config_manager.get('cameras', default=None)
+        if not streams:
+            streams = [{
+                'name': 'camera',
+                'source': config_manager.get('camera', 'source', default={'type': 'device', 'index': 0}),
+                'calibration': config_manager.get('camera', 'calibration', default=None),
+            }]
+        recording = config_manager.get('recording', default=None)
+        detection = config_manager.get('detection', default=None)
+        shared_frames = config_manager.get('shared_frames', default=None)
+        return cls(streams, default_fps, recording, detection, shared_frames, parent)
+
+    @property
+    def names(self):
+        return list(self.streams)
+
+    def handler(self, name):
+        """Return the CameraStreamHandler of a stream."""
+        return self.streams[name]
+
+    def start(self, name=None):
+        """Start one stream, or all of them."""
+        for stream_name in ([name] if name is not None else self.names):
+            self.streams[stream_name].start()
+
+    def stop(self, name=None):
+        """Stop one stream, or all of them."""
+        for stream_name in ([name] if name is not None else self.names):
+            self.streams[stream_name].stop()
+
+    def metrics(self):
+        """Return per-stream statistics and the aggregate throughput."""
+        per_stream = {name: handler.stats() for name, handler in self.streams.items()}
+        return {
+            'streams': per_stream,
+            'active_streams': sum(handler.running for handler in self.streams.values()),
+            'aggregate_fps': sum(stats['fps'] for stats in per_stream.values()),
+            'aggregate_frames': sum(stats['frames_captured'] for stats in per_stream.values()),
+            'aggregate_dropped': sum(stats['frames_dropped'] + stats['display_dropped']
+                                     for stats in per_stream.values()),
+        }
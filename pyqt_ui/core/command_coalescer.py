@@ -0,0 +1,67 @@
+# core/command_coalescer.py
+
+import time
+from PyQt6.QtCore import QObject, QTimer
+
+
+class CommandCoalescer(QObject):
+    def __init__(self, send, max_rate_hz=20.0, parent=None):
+        """
+        Collapse rapid setpoint updates into at most max_rate_hz sends per key.
+
+        Only the latest value per key (e.g. per slider and its motors) is kept
+        between sends. The first update after a quiet period is sent at once,
+        and the last update of a burst is always sent when the rate allows.
+
+        :param send: Callable(key, value) that issues the command.
+        :param max_rate_hz: Maximum number of flushes per second.
+        :param parent: Parent object (default None)
+        """
+        super().__init__(parent)
+        self.send = send
+        self.period = 1.0 / max_rate_hz
+        self.pending = {}
+        self.last_sent = {}
+        self.last_flush = None
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self.flush)
+        self.reset_stats()
+
+    def reset_stats(self):
+        """Reset the counters."""
+        self.requested = 0
+        self.sent = 0
+
+    def submit(self, key, value):
+        """Record the latest setpoint for a key; it is sent at the next allowed flush."""
+        self.requested += 1
+        self.pending[key] = value
+        if self.timer.isActive():
+            return
+        now = time.monotonic()
+        wait = 0.0 if self.last_flush is None else self.last_flush + self.period - now
+        if wait <= 0:
+            self.flush()
+        else:
+            self.timer.start(max(1, int(round(wait * 1000))))
+
+    def flush(self):
+        """Send the pending setpoints that differ from the last ones sent."""
+        self.timer.stop()
+        pending, self.pending = self.pending, {}
+        self.last_flush = time.monotonic()
+        for key, value in pending.items():
+            if self.last_sent.get(key) == value:
+                continue
+            self.send(key, value)
+            self.last_sent[key] = value
+            self.sent += 1
+
+    def stats(self):
+        """Return how many commands were requested and how many were actually sent."""
+        return {
+            'requested': self.requested,
+            'sent': self.sent,
+            'coalesced': self.requested - self.sent,
+        }
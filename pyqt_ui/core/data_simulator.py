@@ -1,41 +1,95 @@
-import time
 import threading
-import pandas as pd
-from PyQt6.QtCore import QObject, pyqtSignal
+from PyQt6.QtCore import QObject, Qt, pyqtSignal
+from core.replay_engine import ReplayEngine
+from core.tick_scheduler import TickScheduler
 
 class DataSimulator(QObject):
+    # Latest sample of each block, as a dict of floats
     data_updated = pyqtSignal(dict)
+    # Whole block of samples, as a dict of NumPy array views
+    block_updated = pyqtSignal(dict)
+    # Posted after each block; runs once the consumers' queued slots for that block have run
+    block_delivered = pyqtSignal()
 
-    def __init__(self, file_path=None, parent=None):
+    def __init__(self, file_path='config/HBsteel-M22-F.csv', block_size=1, rate_hz=10.0, realtime=True,
+                 max_pending=2, parent=None):
+        """
+        Initialize the DataSimulator.
+
+        :param file_path: Force measurement CSV to replay.
+        :param block_size: Number of samples emitted per update.
+        :param rate_hz: Updates (blocks) per second.
+        :param realtime: False replays on a virtual clock, as fast as the consumers allow.
+        :param max_pending: Blocks emitted but not yet handled by the GUI thread before the replay waits.
+        :param parent: Parent object (default None)
+        """
         super().__init__(parent)
         self.running = False
         self.file_path = file_path
-        self.data = pd.read_csv('config/HBsteel-M22-F.csv')  # Load the data from the file
+        self.block_size = block_size
+        self.scheduler = TickScheduler(rate_hz, virtual=not realtime)
+        self.engine = ReplayEngine.from_csv(self.file_path)  # Load the columns once
         self.index = 0  # Start reading from the first row
+        self.thread = None
+        # Credits returned by the GUI thread, so the replay never floods its event queue
+        self.max_pending = max_pending
+        self.credits = threading.BoundedSemaphore(max_pending)
+        self.block_delivered.connect(self.release_credit, Qt.ConnectionType.QueuedConnection)
+
+    @classmethod
+    def from_config(cls, settings, parent=None):
+        """Build a simulator from the 'simulator' config section."""
+        settings = settings or {}
+        return cls(
+            block_size=settings.get('block_size', 1),
+            rate_hz=settings.get('rate_hz', 10),
+            realtime=settings.get('realtime', True),
+            max_pending=settings.get('max_pending', 2),
+            parent=parent
+        )
+
+    def release_credit(self):
+        try:
+            self.credits.release()
+        except ValueError:
+            pass  # A block queued before a restart: its credit was already reset
+
+    def acquire_credit(self):
+        """Wait until the GUI thread has caught up; False if stopped meanwhile."""
+        while not self.credits.acquire(timeout=0.1):
+            if not self.running:
+                return False
+        return self.running
 
     def start(self):
         """Start the data simulation in a separate thread."""
+        # Credits of blocks still queued from a previous run are void
+        self.credits = threading.BoundedSemaphore(self.max_pending)
         self.running = True
-        self.data = pd.read_csv('config/HBsteel-M22-F.csv')  # Reload the data
-        threading.Thread(target=self.run, daemon=True).start()
+        self.scheduler.start()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
 
     def stop(self):
         """Stop the data simulation."""
         self.running = False
+        self.scheduler.stop()
+        if self.thread is not None and self.thread is not threading.current_thread():
+            self.thread.join(timeout=1.0)
+        self.thread = None
         self.index = 0
-        
+
 
     def run(self):
-        """Simulate sensor data updates by reading from the CSV file."""
-        while self.running and self.index < len(self.data):
-            # Extract data from the current row
-            row = self.data.iloc[self.index]
-            data = {
-                'Force_x': row["Force_M1.Force_x [newton]"],
-                'Force_y': row["Force_M1.Force_y [newton]"],
-                'Force_z': row["Force_M1.Force_z [newton]"],
-                'Distance': row["$dist_1 [mm]"]
-            }
-            self.data_updated.emit(data)
-            self.index += 1  # Move to the next row
-            time.sleep(0.1)  # Update every second
+        """Simulate sensor data updates by replaying blocks of the CSV file."""
+        for start, block in self.engine.blocks(self.block_size, self.index):
+            if not self.acquire_credit():
+                break
+            self.block_updated.emit(block)
+            if self.receivers(self.data_updated):
+                # Only build the per-sample dict when someone listens for it
+                self.data_updated.emit(self.engine.sample(start + len(block['Distance']) - 1))
+            self.block_delivered.emit()
+            self.index = start + self.block_size  # Move to the next block
+            if not self.scheduler.wait():
+                break
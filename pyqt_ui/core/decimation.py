@@ -0,0 +1,49 @@
+# core/decimation.py
+
+import numpy as np
+
+# Graph decimation modes: pyramid min/max per pixel, LTTB on the pyramid means, or every sample
+MODES = ('minmax', 'lttb', 'none')
+
+
+def lttb(x, y, n_out):
+    """
+    Largest-Triangle-Three-Buckets downsampling, vectorised over the buckets.
+
+    Classic LTTB anchors each bucket's triangle on the point chosen in the
+    previous bucket, which needs a Python loop over the buckets. Here the
+    anchor is the previous bucket's average, so all buckets are decided in one
+    NumPy pass; each bucket still keeps the point farthest from the line
+    between its neighbours, so peaks survive.
+
+    :param x: 1-D array of x values, in sample order.
+    :param y: 1-D array of y values.
+    :param n_out: Number of points to keep (at least 3).
+    :return: (x, y) with n_out points, in sample order.
+    """
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return x, y
+    # n_out - 2 buckets between the first and the last point, none of them empty
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.intp)
+    counts = np.diff(edges)
+    starts = edges[:-1] - 1
+    inner_x = x[1:n - 1]
+    inner_y = y[1:n - 1]
+    mean_x = np.add.reduceat(inner_x, starts) / counts
+    mean_y = np.add.reduceat(inner_y, starts) / counts
+    previous_x = np.concatenate(([x[0]], mean_x[:-1]))
+    previous_y = np.concatenate(([y[0]], mean_y[:-1]))
+    next_x = np.concatenate((mean_x[1:], [x[-1]]))
+    next_y = np.concatenate((mean_y[1:], [y[-1]]))
+
+    bucket = np.repeat(np.arange(n_out - 2), counts)
+    px, py = previous_x[bucket], previous_y[bucket]
+    area = np.abs((px - next_x[bucket]) * (inner_y - py) - (px - inner_x) * (next_y[bucket] - py))
+    # A NaN area would never equal its bucket's maximum and leave the bucket without a point
+    area = np.nan_to_num(area, nan=-1.0)
+    # First point with the largest area in each bucket
+    best = np.flatnonzero(area == np.maximum.reduceat(area, starts)[bucket])
+    best = best[np.concatenate(([True], bucket[best[1:]] != bucket[best[:-1]]))]
+    selected = np.concatenate(([0], best + 1, [n - 1]))
+    return x[selected], y[selected]
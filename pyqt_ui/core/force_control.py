@@ -0,0 +1,327 @@
+# core/force_control.py
+
+import sys
+import threading
+import time
+from collections import deque
+import numpy as np
+from core.force_model import ForceModel
+from core.tick_scheduler import TickScheduler
+
+
+class ForceLookup:
+    def __init__(self, model, channel='magnitude', resolution=4096):
+        """
+        Uniform-grid force tables so a query is one index computation, never a search.
+
+        The forward table maps distance -> force. The inverse table maps force ->
+        distance on the monotone envelope of the curve (force only grows towards
+        the plate), so measurement noise in the table cannot make it ambiguous.
+
+        :param model: core.force_model.ForceModel.
+        :param channel: A force column (e.g. 'Force_z') or 'magnitude'.
+        :param resolution: Number of grid points of each table.
+        """
+        lo, hi = model.distance_range
+        distances = np.linspace(lo, hi, resolution)
+        forces = model.forces(distances)
+        if channel == 'magnitude':
+            curve = np.linalg.norm(forces, axis=1)
+        elif channel in model.channels:
+            curve = forces[:, model.channels.index(channel)]
+        else:
+            raise ValueError(f"Unknown force channel: {channel}. Use 'magnitude' or one of {model.channels}.")
+        self.channel = channel
+
+        # Forward table
+        self.d0 = lo
+        self.d_scale = (resolution - 1) / (hi - lo)
+        self.forward = curve.tolist()
+
+        # The plate is at the end of the table with the larger force; walk the curve from far to near
+        plate_at_low = curve[0] >= curve[-1]
+        self.toward_plate = -1.0 if plate_at_low else 1.0
+        order = slice(None, None, -1) if plate_at_low else slice(None)
+        envelope = np.maximum.accumulate(curve[order])
+        # Farthest distance at which each force level is first reached
+        levels, first = np.unique(envelope, return_index=True)
+        if len(levels) < 2:
+            raise ValueError(f"Force channel {channel} is constant: it cannot be inverted.")
+        self.f0 = float(levels[0])
+        self.f_max = float(levels[-1])
+        self.f_scale = (resolution - 1) / (self.f_max - self.f0)
+        grid = np.linspace(self.f0, self.f_max, resolution)
+        self.inverse = np.interp(grid, levels, distances[order][first]).tolist()
+
+    @property
+    def force_range(self):
+        """Return the (min, max) force that can be held."""
+        return self.f0, self.f_max
+
+    @staticmethod
+    def interpolate(table, position):
+        """Linear interpolation in a table at a fractional index (clamped to its ends)."""
+        if position <= 0.0:
+            return table[0]
+        last = len(table) - 1
+        if position >= last:
+            return table[last]
+        i = int(position)
+        low = table[i]
+        return low + (position - i) * (table[i + 1] - low)
+
+    def force(self, distance):
+        """Return the force at a distance [mm]."""
+        return self.interpolate(self.forward, (distance - self.d0) * self.d_scale)
+
+    def distance(self, force):
+        """Return the distance [mm] at which a force is first reached when approaching the plate."""
+        return self.interpolate(self.inverse, (force - self.f0) * self.f_scale)
+
+
+class SimulatedGap:
+    def __init__(self, lookup, distance=None, gain=50.0, noise=0.0, seed=0):
+        """
+        Stand-in distance sensor: the gap moves at a speed proportional to the torque.
+
+        :param lookup: ForceLookup giving the distance range and the direction of the plate.
+        :param distance: Initial distance [mm] (default: the far end of the table).
+        :param gain: Speed per unit torque [mm/s].
+        :param noise: Standard deviation of the measurement noise [mm].
+        :param seed: Seed of the noise generator.
+        """
+        self.lookup = lookup
+        lo = lookup.d0
+        hi = lo + (len(lookup.forward) - 1) / lookup.d_scale
+        self.limits = (lo, hi)
+        self.distance = distance if distance is not None else (hi if lookup.toward_plate < 0 else lo)
+        self.gain = gain
+        self.noise = noise
+        self.rng = np.random.default_rng(seed)
+        self.last_update = None
+
+    def read(self):
+        """Return the measured distance."""
+        if self.noise:
+            return self.distance + self.noise * float(self.rng.standard_normal())
+        return self.distance
+
+    def write(self, torque):
+        """Apply a torque from now until the next write."""
+        now = time.monotonic()
+        if self.last_update is not None:
+            step = self.lookup.toward_plate * self.gain * torque * (now - self.last_update)
+            self.distance = min(max(self.distance + step, self.limits[0]), self.limits[1])
+        self.last_update = now
+
+
+class ForceController:
+    def __init__(self, lookup, read_distance, write_torque, rate_hz=1000.0, kp=0.5, ki=2.0,
+                 torque_limit=1.0, spin=0.0002, switch_interval=None, history=5000):
+        """
+        Hold a magnet-plate force by adjusting the motor torque, at a fixed rate on its own thread.
+
+        The target force is turned into a target distance through the inverse
+        table once, when it is set; each tick then reads the distance, looks up
+        the force and runs a PI law on the distance error. Positive torque moves
+        the magnet towards the plate.
+
+        :param lookup: ForceLookup with the precomputed tables.
+        :param read_distance: Callable() returning the measured distance [mm].
+        :param write_torque: Callable(torque) sending the setpoint (called from the loop thread).
+        :param rate_hz: Loop rate.
+        :param kp: Proportional gain [torque/mm].
+        :param ki: Integral gain [torque/(mm*s)].
+        :param torque_limit: Torque saturation (symmetric).
+        :param spin: Seconds before each deadline spent polling instead of sleeping.
+        :param switch_interval: If set, the interpreter thread switch interval [s] used while
+                                running, bounding how long another thread can hold the GIL.
+                                This is process-wide (sys.setswitchinterval): every thread,
+                                the GUI included, is preempted this often while the loop
+                                runs. The previous value is restored when the loop exits.
+        :param history: Number of recent ticks kept for the loop time statistics.
+        """
+        self.lookup = lookup
+        self.read_distance = read_distance
+        self.write_torque = write_torque
+        self.kp = kp
+        self.ki = ki
+        self.torque_limit = torque_limit
+        self.switch_interval = switch_interval
+        self.saved_switch_interval = None
+        self.scheduler = TickScheduler(rate_hz, history=history, spin=spin)
+        self.compute = deque(maxlen=history)
+        self.thread = None
+        # Called from the loop thread with a message when the loop stops on an error
+        self.on_error = None
+        self.error = None
+        self.integral = 0.0
+        self.distance = self.force = self.torque = 0.0
+        self.set_target(lookup.f0)
+
+    @classmethod
+    def from_config(cls, settings, read_distance, write_torque):
+        """Build a controller from the 'force_control' config section."""
+        model = ForceModel.from_csv(settings.get('table', 'config/HBsteel-M22-F.csv'), mode='pchip')
+        lookup = ForceLookup(model, settings.get('channel', 'magnitude'), settings.get('lut_size', 4096))
+        switch_ms = settings.get('switch_interval_ms')
+        controller = cls(
+            lookup, read_distance, write_torque,
+            rate_hz=settings.get('rate_hz', 1000),
+            kp=settings.get('kp', 0.5),
+            ki=settings.get('ki', 2.0),
+            torque_limit=settings.get('torque_limit', 1.0),
+            spin=settings.get('spin_ms', 0.2) / 1000.0,
+            switch_interval=switch_ms / 1000.0 if switch_ms else None,
+        )
+        controller.set_target(settings.get('target_n', lookup.f0))
+        return controller
+
+    @property
+    def running(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def set_target(self, force):
+        """Set the force to hold [newton], clamped to what the table can reach."""
+        force = min(max(float(force), self.lookup.f0), self.lookup.f_max)
+        # One tuple assignment, so the loop never sees a half-updated target
+        self.target = (force, self.lookup.distance(force))
+
+    def start(self):
+        """Start the loop thread."""
+        if self.running:
+            return
+        if self.switch_interval is not None and self.saved_switch_interval is None:
+            self.saved_switch_interval = sys.getswitchinterval()
+            sys.setswitchinterval(self.switch_interval)
+        self.error = None
+        self.integral = 0.0
+        self.compute.clear()
+        self.scheduler.start()
+        self.thread = threading.Thread(target=self.run, name='force-control', daemon=True)
+        self.thread.start()
+
+    def run(self):
+        """Run the loop until stopped; on an error, zero the torque and report it."""
+        try:
+            self.control_loop()
+        except Exception as e:
+            self.scheduler.stop()
+            self.error = f"Force control stopped: {e}"
+            try:
+                self.write_torque(0.0)
+                self.torque = 0.0
+            except Exception as zero_error:
+                self.error += f" (the torque could not be zeroed: {zero_error})"
+            if self.on_error is not None:
+                self.on_error(self.error)
+        finally:
+            self.restore_switch_interval()
+
+    def control_loop(self):
+        lookup = self.lookup
+        kp, ki, limit = self.kp, self.ki, self.torque_limit
+        dt = self.scheduler.period
+        clock = time.perf_counter
+        while self.scheduler.wait():
+            begin = clock()
+            distance = self.read_distance()
+            target_force, target_distance = self.target
+            # Distance still to travel towards the plate
+            error = (distance - target_distance) * -lookup.toward_plate
+            integral = self.integral + error * dt
+            torque = kp * error + ki * integral
+            if torque > limit:
+                torque = limit
+            elif torque < -limit:
+                torque = -limit
+            else:
+                # Only integrate while unsaturated, so the integral does not wind up
+                self.integral = integral
+            self.write_torque(torque)
+            self.distance = distance
+            self.force = lookup.force(distance)
+            self.torque = torque
+            self.compute.append(clock() - begin)
+
+    def stop(self, timeout=1.0):
+        """
+        Stop the loop and wait for the thread to finish.
+
+        :param timeout: Seconds to wait for a tick stuck in read_distance or write_torque.
+        :return: False if the thread is still running (it exits after its current tick).
+        """
+        self.scheduler.stop()
+        if self.thread is not None and self.thread is not threading.current_thread():
+            self.thread.join(timeout)
+            if self.thread.is_alive():
+                return False
+        self.thread = None
+        self.restore_switch_interval()
+        return True
+
+    def restore_switch_interval(self):
+        """Put back the switch interval start() replaced, unless someone changed it since."""
+        saved, self.saved_switch_interval = self.saved_switch_interval, None
+        if saved is not None and sys.getswitchinterval() == self.switch_interval:
+            sys.setswitchinterval(saved)
+
+    def stats(self):
+        """Return the loop period jitter and overruns, the loop body time and the latest state."""
+        stats = self.scheduler.stats()
+        samples = sorted(self.compute)
+        count = len(samples)
+        stats.update({
+            'compute_mean': sum(samples) / count if count else 0.0,
+            'compute_p99': samples[min(count - 1, int(count * 0.99))] if count else 0.0,
+            'compute_max': samples[-1] if count else 0.0,
+            'target_force': self.target[0],
+            'target_distance': self.target[1],
+            'force': self.force,
+            'distance': self.distance,
+            'torque': self.torque,
+        })
+        return stats
+
+
+def benchmark(seconds=2.0, rate_hz=1000.0, target=20.0, load=True):
+    """
+    Hold a force on a simulated gap, optionally with a thread standing in for GUI work.
+
+    :return: Loop statistics, jitter and compute times in milliseconds.
+    """
+    lookup = ForceLookup(ForceModel.from_csv(mode='pchip'))
+    gap = SimulatedGap(lookup)
+    controller = ForceController(lookup, gap.read, gap.write, rate_hz=rate_hz, switch_interval=0.0005)
+    controller.set_target(target)
+    done = threading.Event()
+
+    def busy():
+        # Python-level work in bursts, like slots handling a repaint
+        while not done.is_set():
+            sum(i * i for i in range(20000))
+            time.sleep(0.005)
+
+    worker = threading.Thread(target=busy, daemon=True) if load else None
+    if worker:
+        worker.start()
+    start = time.perf_counter()
+    lookups = 100000
+    for k in range(lookups):
+        lookup.distance(lookup.f0 + k * 1e-3)
+    lookup_us = 1e6 * (time.perf_counter() - start) / lookups
+    controller.start()
+    time.sleep(seconds)
+    controller.stop()
+    done.set()
+    stats = controller.stats()
+    for key in ('jitter_mean', 'jitter_p99', 'jitter_max', 'compute_mean', 'compute_p99', 'compute_max'):
+        stats[key + '_ms'] = 1000 * stats.pop(key)
+    stats['lookup_us'] = lookup_us
+    stats['force_error'] = stats['force'] - stats['target_force']
+    return stats
+
+
+if __name__ == "__main__":
+    for key, value in benchmark().items():
+        print(f"{key}: {value:.4f}" if isinstance(value, float) else f"{key}: {value}")
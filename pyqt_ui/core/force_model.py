@@ -0,0 +1,115 @@
+# core/force_model.py
+
+import numpy as np
+from core.replay_engine import load_columns
+
+FORCE_CHANNELS = ('Force_x', 'Force_y', 'Force_z')
+
+
+def pchip_slopes(x, y):
+    """Compute monotone (Fritsch-Carlson) cubic Hermite slopes for each column of y."""
+    h = np.diff(x)[:, None]
+    delta = np.diff(y, axis=0) / h
+    slopes = np.zeros_like(y)
+    if len(x) == 2:
+        slopes[:] = delta
+        return slopes
+
+    # Interior points: weighted harmonic mean where the secant slopes agree in sign
+    w1 = 2 * h[1:] + h[:-1]
+    w2 = h[1:] + 2 * h[:-1]
+    same_sign = (np.sign(delta[:-1]) * np.sign(delta[1:])) > 0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        harmonic = (w1 + w2) / (w1 / delta[:-1] + w2 / delta[1:])
+    slopes[1:-1] = np.where(same_sign, harmonic, 0.0)
+
+    # End points: one-sided three-point estimate, clipped to keep monotonicity
+    for end, d0, d1, h0, h1 in ((0, delta[0], delta[1], h[0], h[1]),
+                                (-1, delta[-1], delta[-2], h[-1], h[-2])):
+        slope = ((2 * h0 + h1) * d0 - h0 * d1) / (h0 + h1)
+        slope = np.where(np.sign(slope) != np.sign(d0), 0.0, slope)
+        slope = np.where((np.sign(d0) != np.sign(d1)) & (np.abs(slope) > np.abs(3 * d0)), 3 * d0, slope)
+        slopes[end] = slope
+    return slopes
+
+
+class ForceModel:
+    def __init__(self, distances, forces, mode='linear', channels=FORCE_CHANNELS):
+        """
+        Interpolate the measured force as a function of the magnet-plate distance.
+
+        :param distances: 1-D array of measured distances [mm].
+        :param forces: 2-D array (len(distances), len(channels)) of measured forces [newton].
+        :param mode: 'linear' or 'pchip' (monotone cubic).
+        :param channels: Names of the force columns, in order.
+        """
+        if mode not in ('linear', 'pchip'):
+            raise ValueError(f"Unknown interpolation mode: {mode}. Use 'linear' or 'pchip'.")
+        order = np.argsort(distances, kind='stable')
+        self.x = np.ascontiguousarray(np.asarray(distances, dtype=np.float64)[order])
+        self.y = np.ascontiguousarray(np.asarray(forces, dtype=np.float64)[order])
+        if len(self.x) < 2 or np.any(np.diff(self.x) <= 0):
+            raise ValueError("Force table needs at least two distinct, non-repeated distances.")
+        self.mode = mode
+        self.channels = tuple(channels)
+
+        # Precomputed per-interval terms so a query is a lookup plus a polynomial
+        self.h = np.diff(self.x)
+        self.slopes = pchip_slopes(self.x, self.y) if mode == 'pchip' else None
+        steps = self.h
+        self.uniform_step = steps[0] if np.allclose(steps, steps[0]) else None
+
+    @classmethod
+    def from_csv(cls, file_path='config/HBsteel-M22-F.csv', mode='linear'):
+        """Build the model from a force measurement CSV."""
+        columns = load_columns(file_path)
+        forces = np.column_stack([columns[name] for name in FORCE_CHANNELS])
+        return cls(columns['Distance'], forces, mode=mode)
+
+    @property
+    def distance_range(self):
+        """Return the (min, max) distance covered by the measurements."""
+        return float(self.x[0]), float(self.x[-1])
+
+    def interval_index(self, distance):
+        """Return the table interval index of each distance (clamped to the table)."""
+        if self.uniform_step is not None:
+            index = np.floor((distance - self.x[0]) / self.uniform_step).astype(np.intp)
+        else:
+            index = np.searchsorted(self.x, distance, side='right') - 1
+        return np.clip(index, 0, len(self.x) - 2)
+
+    def forces(self, distance):
+        """
+        Return the forces at the given distance(s).
+
+        Distances outside the measured range are clamped to its ends.
+
+        :param distance: A scalar or an array of distances [mm].
+        :return: Array of shape distance.shape + (len(channels),).
+        """
+        d = np.clip(np.asarray(distance, dtype=np.float64), self.x[0], self.x[-1])
+        i = self.interval_index(d)
+        h = self.h[i]
+        t = ((d - self.x[i]) / h)[..., None]
+        y0 = self.y[i]
+        y1 = self.y[i + 1]
+        if self.mode == 'linear':
+            return y0 + t * (y1 - y0)
+
+        # Cubic Hermite basis
+        h = h[..., None]
+        t2 = t * t
+        t3 = t2 * t
+        return ((2 * t3 - 3 * t2 + 1) * y0 + (t3 - 2 * t2 + t) * h * self.slopes[i]
+                + (-2 * t3 + 3 * t2) * y1 + (t3 - t2) * h * self.slopes[i + 1])
+
+    def query(self, distance):
+        """Return a dictionary of channel -> force (float for scalars, array otherwise)."""
+        values = self.forces(distance)
+        if values.ndim == 1:
+            return {name: float(values[k]) for k, name in enumerate(self.channels)}
+        return {name: values[..., k] for k, name in enumerate(self.channels)}
+
+    def __call__(self, distance):
+        return self.query(distance)
@@ -0,0 +1,79 @@
+# core/frame_mailbox.py
+
+import threading
+import time
+from collections import deque
+from PyQt6.QtCore import QObject, pyqtSignal
+
+
+class FrameMailbox(QObject):
+    # Emitted when the mailbox goes from empty to full, so at most one event is ever queued
+    frame_available = pyqtSignal()
+
+    def __init__(self, history=300, parent=None):
+        """
+        Single-slot, latest-frame-wins handoff between a capture thread and the GUI.
+
+        The producer put()s frames and overwrites (and releases) any frame the
+        consumer has not taken yet; the consumer take()s the newest one when it
+        is ready to paint. Frames are core.frame_pool.Frame objects.
+
+        :param history: Number of recent latencies kept for the statistics.
+        :param parent: Parent object (default None)
+        """
+        super().__init__(parent)
+        self.lock = threading.Lock()
+        self.frame = None
+        self.latencies = deque(maxlen=history)
+        self.reset_stats()
+
+    def reset_stats(self):
+        """Reset the counters."""
+        self.posted = 0
+        self.taken = 0
+        self.dropped = 0
+        self.latencies.clear()
+
+    def put(self, frame):
+        """Publish a frame; the mailbox takes over the caller's reference."""
+        with self.lock:
+            previous = self.frame
+            self.frame = frame
+            self.posted += 1
+            if previous is not None:
+                self.dropped += 1
+        if previous is not None:
+            previous.release()
+        else:
+            self.frame_available.emit()
+
+    def take(self):
+        """Return the newest frame (the caller owns its reference), or None."""
+        with self.lock:
+            frame, self.frame = self.frame, None
+            if frame is not None:
+                self.taken += 1
+        return frame
+
+    def clear(self):
+        """Release any pending frame."""
+        frame = self.take()
+        if frame is not None:
+            frame.release()
+
+    def mark_displayed(self, frame):
+        """Record the capture-to-display latency of a frame."""
+        self.latencies.append(time.monotonic() - frame.timestamp)
+
+    def stats(self):
+        """Return frame counters and capture-to-display latency statistics (seconds)."""
+        samples = sorted(self.latencies)
+        count = len(samples)
+        return {
+            'posted': self.posted,
+            'taken': self.taken,
+            'dropped': self.dropped,
+            'latency_mean': sum(samples) / count if count else 0.0,
+            'latency_p99': samples[min(count - 1, int(count * 0.99))] if count else 0.0,
+            'latency_max': samples[-1] if count else 0.0,
+        }
@@ -0,0 +1,231 @@
+# core/frame_sources.py
+
+import os
+from abc import ABC, abstractmethod
+import cv2
+import numpy as np
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.tif', '.tiff')
+
+
+class FrameSource(ABC):
+    """
+    Base class of the camera pipeline inputs.
+
+    read() follows cv2.VideoCapture: it returns (ok, image) and fills `out`
+    in place when it is given with the right shape.
+    """
+    # Native frame rate of the source, or None if unknown
+    fps = None
+
+    @abstractmethod
+    def open(self):
+        """Open the source; return False if it is not available."""
+
+    @abstractmethod
+    def read(self, out=None):
+        """Return (ok, image) for the next frame."""
+
+    def grab(self):
+        """Skip the next frame as cheaply as possible."""
+        ok, _ = self.read()
+        return ok
+
+    def release(self):
+        """Close the source."""
+
+    def describe(self):
+        """Return a short human readable description."""
+        return type(self).__name__
+
+
+class CameraSource(FrameSource):
+    def __init__(self, index=0, width=None, height=None):
+        """
+        A camera device opened through OpenCV.
+
+        :param index: Device index.
+        :param width: Requested capture width (None keeps the driver default).
+        :param height: Requested capture height.
+        """
+        self.index = index
+        self.width = width
+        self.height = height
+        self.cap = None
+
+    def open(self):
+        self.cap = cv2.VideoCapture(self.index)
+        if self.width and self.height:
+            self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.width)
+            self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.height)
+        fps = self.cap.get(cv2.CAP_PROP_FPS)
+        self.fps = fps if fps > 0 else None
+        return self.cap.isOpened()
+
+    def read(self, out=None):
+        return self.cap.read(out)
+
+    def grab(self):
+        return self.cap.grab()
+
+    def release(self):
+        if self.cap is not None:
+            self.cap.release()
+
+    def describe(self):
+        return f"camera {self.index}"
+
+
+class VideoFileSource(CameraSource):
+    def __init__(self, path, loop=True):
+        """
+        A local video file, optionally looped forever.
+
+        :param path: Path of the video file.
+        :param loop: Restart from the first frame at the end of the file.
+        """
+        super().__init__(index=path)
+        self.path = path
+        self.loop = loop
+
+    def read(self, out=None):
+        ok, image = self.cap.read(out)
+        if not ok and self.loop:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ok, image = self.cap.read(out)
+        return ok, image
+
+    def grab(self):
+        ok = self.cap.grab()
+        if not ok and self.loop:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ok = self.cap.grab()
+        return ok
+
+    def describe(self):
+        return f"video {self.path}"
+
+
+class ImageSequenceSource(FrameSource):
+    def __init__(self, directory, loop=True, preload=False, fps=None):
+        """
+        A directory of images played in file name order.
+
+        :param directory: Directory containing the images.
+        :param loop: Restart from the first image at the end.
+        :param preload: Decode every image once at open() so reads never touch the disk.
+        :param fps: Nominal frame rate of the sequence.
+        """
+        self.directory = directory
+        self.loop = loop
+        self.preload = preload
+        self.fps = fps
+        self.paths = []
+        self.images = []
+        self.position = 0
+
+    def open(self):
+        if not os.path.isdir(self.directory):
+            return False
+        self.paths = sorted(os.path.join(self.directory, name) for name in os.listdir(self.directory)
+                            if name.lower().endswith(IMAGE_EXTENSIONS))
+        if self.preload:
+            self.images = [image for image in map(cv2.imread, self.paths) if image is not None]
+        self.position = 0
+        return bool(self.images if self.preload else self.paths)
+
+    def next_position(self):
+        """Return the index of the next image, or None at the end of a non-looping sequence."""
+        count = len(self.images) if self.preload else len(self.paths)
+        if self.position >= count:
+            if not self.loop:
+                return None
+            self.position = 0
+        position = self.position
+        self.position += 1
+        return position
+
+    def read(self, out=None):
+        position = self.next_position()
+        if position is None:
+            return False, None
+        image = self.images[position] if self.preload else cv2.imread(self.paths[position])
+        if image is None:
+            return False, None
+        if out is not None and out.shape == image.shape:
+            np.copyto(out, image)
+            return True, out
+        return True, image.copy() if self.preload else image
+
+    def grab(self):
+        return self.next_position() is not None
+
+    def describe(self):
+        return f"images {self.directory}"
+
+
+class SyntheticSource(FrameSource):
+    def __init__(self, width=1920, height=1080, fps=60.0):
+        """
+        A generated test pattern: a static gradient with a moving bar and a frame counter.
+
+        Frames are drawn into the caller's buffer, so no device or file is needed
+        to load-test the capture -> display path.
+
+        :param width: Frame width.
+        :param height: Frame height.
+        :param fps: Nominal frame rate.
+        """
+        self.width = int(width)
+        self.height = int(height)
+        self.fps = fps
+        self.count = 0
+        self.background = None
+
+    def open(self):
+        x = np.linspace(0, 255, self.width, dtype=np.float32)
+        y = np.linspace(0, 255, self.height, dtype=np.float32)[:, None]
+        self.background = np.empty((self.height, self.width, 3), dtype=np.uint8)
+        self.background[..., 0] = x
+        self.background[..., 1] = y
+        self.background[..., 2] = 128
+        self.count = 0
+        return True
+
+    def read(self, out=None):
+        if out is None or out.shape != self.background.shape:
+            out = np.empty_like(self.background)
+        np.copyto(out, self.background)
+        bar = max(self.width // 20, 1)
+        left = (self.count * 8) % max(self.width - bar, 1)
+        out[:, left:left + bar] = 255
+        cv2.putText(out, str(self.count), (20, 60), cv2.FONT_HERSHEY_SIMPLEX, 2, (0, 0, 0), 3)
+        self.count += 1
+        return True, out
+
+    def grab(self):
+        self.count += 1
+        return True
+
+    def describe(self):
+        return f"synthetic {self.width}x{self.height}@{self.fps:g}"
+
+
+def create_frame_source(settings):
+    """
+    Build a frame source from a configuration dictionary.
+
+    {"type": "device", "index": 0}, {"type": "video", "path": ...},
+    {"type": "images", "directory": ...} or {"type": "synthetic", "width": ..., "height": ..., "fps": ...}.
+    """
+    settings = dict(settings or {})
+    kind = settings.pop('type', 'device')
+    if kind == 'device':
+        return CameraSource(**settings)
+    if kind == 'video':
+        return VideoFileSource(**settings)
+    if kind == 'images':
+        return ImageSequenceSource(**settings)
+    if kind == 'synthetic':
+        return SyntheticSource(**settings)
+    raise ValueError(f"Unknown frame source type: {kind}.")
@@ -0,0 +1,265 @@
+# core/gif_cache.py
+
+import queue
+import threading
+from collections import OrderedDict
+from PyQt6.QtCore import Qt, QObject, pyqtSignal
+from PyQt6.QtGui import QImageReader
+
+
+class GifClip:
+    def __init__(self, path, frames, delays):
+        """
+        Decoded frames of an animation.
+
+        :param path: File the clip was decoded from.
+        :param frames: List of QImage frames.
+        :param delays: Display time of each frame in milliseconds.
+        """
+        self.path = path
+        self.frames = frames
+        self.delays = delays
+        self.nbytes = sum(frame.sizeInBytes() for frame in frames)
+
+    def __len__(self):
+        return len(self.frames)
+
+
+def scale_clip(clip, width, height):
+    """Return a copy of a clip with every frame smoothly scaled to width x height."""
+    frames = [frame.scaled(width, height, Qt.AspectRatioMode.IgnoreAspectRatio,
+                           Qt.TransformationMode.SmoothTransformation) for frame in clip.frames]
+    return GifClip(clip.path, frames, clip.delays)
+
+
+def decode_gif(path, default_delay=100):
+    """Decode every frame of an animated image with its delay; return None if it cannot be read."""
+    reader = QImageReader(path)
+    frames, delays = [], []
+    while True:
+        image = reader.read()
+        if image.isNull():
+            break
+        frames.append(image)
+        delay = reader.nextImageDelay()
+        delays.append(delay if delay > 0 else default_delay)
+    return GifClip(path, frames, delays) if frames else None
+
+
+class GifCache(QObject):
+    # Emitted with the path of a clip once it is decoded and cached
+    clip_ready = pyqtSignal(str)
+    # Emitted with the path, width and height of a clip once it is scaled to that size
+    scaled_ready = pyqtSignal(str, int, int)
+
+    def __init__(self, memory_limit_mb=256, scaled_limit=3, scaled_memory_mb=256, parent=None):
+        """
+        Decoded animation frames kept in memory, decoded on a background thread.
+
+        Decoded clips and scaled copies have separate memory budgets, each
+        evicted least recently used first (the entry used last is always
+        kept), so resizing the window never evicts the decoded clips.
+
+        :param memory_limit_mb: Memory budget of the decoded clips, in MB.
+        :param scaled_limit: Number of sizes with scaled copies kept; the copies of every clip
+                             at the least recently used size are evicted first.
+        :param scaled_memory_mb: Memory budget of the scaled copies, in MB.
+        :param parent: Parent object (default None)
+        """
+        super().__init__(parent)
+        self.memory_limit = int(memory_limit_mb * 1024 * 1024)
+        self.scaled_memory_limit = int(scaled_memory_mb * 1024 * 1024)
+        self.lock = threading.Lock()
+        # path -> decoded clip and (path, width, height) -> scaled copy, least recently used first
+        self.clips = OrderedDict()
+        self.scaled = OrderedDict()
+        self.sizes = OrderedDict()
+        self.pending = set()
+        self.scaled_limit = scaled_limit
+        self.nbytes = 0
+        self.scaled_nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.scaled_hits = 0
+        self.scaled_misses = 0
+        self.scaled_evictions = 0
+        self.thread = None
+        self.start()
+
+    def start(self):
+        """Start the decoding thread (done on demand after stop())."""
+        if self.thread is not None:
+            return
+        # Each thread has its own queue, so requests made after stop() go to the next thread
+        self.requests = queue.Queue()
+        self.thread = threading.Thread(target=self.run, args=(self.requests,), name='gif-cache', daemon=True)
+        self.thread.start()
+
+    def preload(self, paths):
+        """Queue clips for background decoding."""
+        for path in paths:
+            self.request(path)
+
+    def request(self, path):
+        """Queue one clip for decoding, unless it is cached or already queued."""
+        with self.lock:
+            if path in self.clips or path in self.pending:
+                return
+            self.pending.add(path)
+        self.queue_request(path)
+
+    def queue_request(self, key):
+        self.start()
+        self.requests.put(key)
+
+    def get(self, path):
+        """
+        Return a cached clip and mark it as most recently used.
+
+        On a miss the clip is decoded in the background, clip_ready is emitted
+        when it is available, and None is returned.
+        """
+        with self.lock:
+            clip = self.clips.get(path)
+            if clip is not None:
+                self.clips.move_to_end(path)
+                self.hits += 1
+                return clip
+            self.misses += 1
+        self.request(path)
+        return None
+
+    def get_scaled(self, path, width, height):
+        """
+        Return a clip pre-scaled to width x height, or None.
+
+        On a miss the scaling is queued on the background thread (decoding the
+        clip first if needed) and scaled_ready is emitted when it is done.
+        """
+        key = (path, width, height)
+        with self.lock:
+            self.touch_size((width, height))
+            clip = self.scaled.get(key)
+            if clip is not None:
+                self.scaled.move_to_end(key)
+                self.scaled_hits += 1
+                return clip
+            self.scaled_misses += 1
+            if key in self.pending:
+                return None
+            self.pending.add(key)
+        self.queue_request(key)
+        return None
+
+    def touch_size(self, size):
+        """Mark a size as most recently used and drop the copies of sizes beyond scaled_limit (lock held)."""
+        self.sizes[size] = None
+        self.sizes.move_to_end(size)
+        while len(self.sizes) > self.scaled_limit:
+            old_size, _ = self.sizes.popitem(last=False)
+            for key in [key for key in self.scaled if key[1:] == old_size]:
+                self.scaled_nbytes -= self.scaled.pop(key).nbytes
+                self.scaled_evictions += 1
+
+    def scale(self, key):
+        """Scale a clip on the background thread and keep the result."""
+        path, width, height = key
+        with self.lock:
+            clip = self.clips.get(path)
+            # Decoding here: a queued request for the same clip must not decode it again
+            decode = clip is None and path not in self.pending
+            if decode:
+                self.pending.add(path)
+        if clip is None:
+            clip = decode_gif(path)
+            if decode:
+                with self.lock:
+                    self.pending.discard(path)
+            if clip is None:
+                return None
+            self.insert(path, clip)
+            self.clip_ready.emit(path)
+        scaled = scale_clip(clip, width, height)
+        with self.lock:
+            if (width, height) not in self.sizes:
+                # The size was dropped while scaling: do not keep copies nobody asked for anymore
+                return scaled
+        self.insert(key, scaled)
+        return scaled
+
+    def insert(self, key, clip):
+        """Add a decoded clip (path key) or scaled copy (tuple key) and evict within its own budget."""
+        scaled = isinstance(key, tuple)
+        entries = self.scaled if scaled else self.clips
+        limit = self.scaled_memory_limit if scaled else self.memory_limit
+        with self.lock:
+            previous = entries.pop(key, None)
+            entries[key] = clip
+            nbytes = (self.scaled_nbytes if scaled else self.nbytes) + clip.nbytes
+            if previous is not None:
+                nbytes -= previous.nbytes
+            evicted = 0
+            while nbytes > limit and len(entries) > 1:
+                _, old = entries.popitem(last=False)
+                nbytes -= old.nbytes
+                evicted += 1
+            if scaled:
+                self.scaled_nbytes = nbytes
+                self.scaled_evictions += evicted
+            else:
+                self.nbytes = nbytes
+                self.evictions += evicted
+
+    def run(self, requests):
+        """Decode or scale the queued clips one after the other."""
+        while True:
+            path = requests.get()
+            if path is None:
+                break
+            if isinstance(path, tuple):
+                scaled = self.scale(path)
+                with self.lock:
+                    self.pending.discard(path)
+                if scaled is not None:
+                    self.scaled_ready.emit(*path)
+                continue
+            with self.lock:
+                cached = path in self.clips
+            # A scale request may have decoded the clip since this request was queued
+            clip = None if cached else decode_gif(path)
+            with self.lock:
+                self.pending.discard(path)
+            if clip is not None:
+                self.insert(path, clip)
+            if cached or clip is not None:
+                self.clip_ready.emit(path)
+
+    def stop(self, timeout=1.0):
+        """
+        Stop the decoding thread once the requests already queued are done.
+
+        The cached frames are kept; the next request starts a new thread.
+        """
+        if self.thread is None:
+            return
+        self.requests.put(None)
+        self.thread.join(timeout)
+        self.thread = None
+
+    def stats(self):
+        """Return hit/miss counters and the memory used by the cached frames."""
+        with self.lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'clips': len(self.clips),
+                'scaled_clips': len(self.scaled),
+                'memory_mb': self.nbytes / (1024 * 1024),
+                'scaled_memory_mb': self.scaled_nbytes / (1024 * 1024),
+                'scaled_hits': self.scaled_hits,
+                'scaled_misses': self.scaled_misses,
+                'scaled_evictions': self.scaled_evictions,
+                'scaled_sizes': len(self.sizes),
+            }
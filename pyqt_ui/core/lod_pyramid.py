@@ -0,0 +1,202 @@
+# core/lod_pyramid.py
+
+import numpy as np
+from core.ring_buffer import RingBuffer, GrowableBuffer
+
+
+class LodPyramid:
+    def __init__(self, channels, levels=24, retention=262144, min_retention=4096):
+        """
+        Multi-resolution history of a multi-channel signal.
+
+        Level 0 keeps the raw samples. Level k (k >= 1) keeps one aggregate per
+        2**k raw samples, stored as rows [min of each channel, max of each
+        channel, mean of each channel]. Levels are updated incrementally as
+        samples arrive, so any range can be drawn from the coarsest level that
+        still fills the viewport, in O(viewport) instead of O(history).
+
+        :param channels: Number of channels.
+        :param levels: Number of levels, raw level included.
+        :param retention: Entries kept at level 0, or None to keep everything. Level k
+                          keeps retention >> k entries, but never fewer than min_retention.
+                          A list gives the retention of each level explicitly.
+        :param min_retention: Floor of the per-level retention.
+        """
+        self.channels = int(channels)
+        self.levels = int(levels)
+        if retention is None or isinstance(retention, (list, tuple)):
+            self.retention = list(retention) if retention is not None else [None] * self.levels
+            if len(self.retention) != self.levels:
+                raise ValueError("retention needs one entry per level.")
+        else:
+            self.retention = [max(int(retention) >> k, int(min_retention)) for k in range(self.levels)]
+
+        rows = [self.channels] + [3 * self.channels] * (self.levels - 1)
+        self.store = [RingBuffer(size, rows[k]) if size else GrowableBuffer(rows[k])
+                      for k, size in enumerate(self.retention)]
+        self.clear()
+
+    def clear(self):
+        """Forget all samples."""
+        for store in self.store:
+            store.clear()
+        # Leftover entry of the level below, waiting for its pair
+        self.pending = [np.empty((3 * self.channels, 0)) for _ in range(self.levels)]
+
+    def __len__(self):
+        return self.store[0].total
+
+    def nbytes(self):
+        """Return the memory used by all levels."""
+        return sum(store.data.nbytes for store in self.store)
+
+    def append(self, sample):
+        """Append one sample (a sequence with one value per channel)."""
+        self.extend(np.asarray(sample, dtype=np.float64).reshape(self.channels, 1))
+
+    def extend(self, block):
+        """Append a block of samples, shaped (channels, n)."""
+        block = np.asarray(block, dtype=np.float64)
+        if block.shape[1] == 0:
+            return
+        self.store[0].extend(block)
+
+        c = self.channels
+        entries = np.concatenate((block, block, block))  # Raw samples as (min, max, mean)
+        for k in range(1, self.levels):
+            merged = np.concatenate((self.pending[k], entries), axis=1)
+            pairs = merged.shape[1] // 2 * 2
+            self.pending[k] = merged[:, pairs:]
+            if pairs == 0:
+                break
+            left = merged[:, 0:pairs:2]
+            right = merged[:, 1:pairs:2]
+            entries = np.concatenate((
+                np.minimum(left[:c], right[:c]),
+                np.maximum(left[c:2 * c], right[c:2 * c]),
+                (left[2 * c:] + right[2 * c:]) * 0.5,
+            ))
+            self.store[k].extend(entries)
+
+    def span(self, level):
+        """Return the (first, end) absolute entry indices retained at a level."""
+        store = self.store[level]
+        return store.total - len(store), store.total
+
+    def entries(self, level, first, end):
+        """Return the retained entries [first, end) of a level as a view."""
+        oldest, _ = self.span(level)
+        return self.store[level].view()[:, first - oldest:end - oldest]
+
+    def choose_level(self, start, stop, max_entries):
+        """Return the finest level that covers raw samples [start, stop) in at most max_entries."""
+        for k in range(self.levels):
+            oldest, total = self.span(k)
+            first, end = start >> k, min(-(-stop // (1 << k)), total)
+            if first >= oldest and end - first <= max_entries:
+                return k, first, end
+        k = self.levels - 1
+        oldest, total = self.span(k)
+        return k, max(start >> k, oldest), total
+
+    def index_range(self, channel, x_min, x_max):
+        """
+        Return the raw sample range whose values of `channel` lie in [x_min, x_max].
+
+        Only valid when that channel is non-decreasing (e.g. a distance sweep).
+        Each level is searched with a binary search, finest first, until one
+        still retains the start of the range.
+        """
+        c = self.channels
+        for k in range(self.levels):
+            oldest, total = self.span(k)
+            if total == oldest:
+                continue
+            x = self.store[k].view()[channel if k == 0 else 2 * c + channel]
+            lo = int(np.searchsorted(x, x_min, side='left'))
+            if lo > 0 or oldest == 0 or k == self.levels - 1:
+                hi = int(np.searchsorted(x, x_max, side='right'))
+                return max(lo - 1 + oldest, 0) << k, min(hi + 1 + oldest, total) << k
+        return 0, 0
+
+    def overlapping(self, level, entries, channel, x_min, x_max):
+        """Return the entries of a level whose values of `channel` reach into [x_min, x_max]."""
+        data = self.entries_at(level, entries)
+        c = self.channels
+        low = data[channel]
+        high = data[channel if level == 0 else c + channel]
+        return entries[(low <= x_max) & (high >= x_min)]
+
+    def select(self, channel, x_min, x_max, max_entries):
+        """
+        Return the data of the samples whose `channel` lies in [x_min, x_max], in any order of that channel.
+
+        Unlike index_range, the channel need not be sorted. The search starts
+        at the coarsest level and splits only the entries overlapping the
+        range into their two children, down to the finest level that keeps
+        at most max_entries of them, so the cost follows the visible data and
+        zooming in reaches the raw samples.
+
+        :return: List of (level, view) segments in sample order: the entries of
+                 the chosen level, then the newest samples not yet aggregated into
+                 it (one entry at most per finer level).
+        """
+        levels = [k for k in range(self.levels) if self.span(k)[1] > self.span(k)[0]]
+        if not levels:
+            return []
+        level = levels[-1]
+        entries = self.overlapping(level, np.arange(*self.span(level)), channel, x_min, x_max)
+        while level > 0:
+            oldest, total = self.span(level - 1)
+            children = np.concatenate(((2 * entries[:, None] + np.arange(2)).ravel(),
+                                       np.arange(2 * self.span(level)[1], total)))
+            if children.size and children[0] < oldest:
+                break  # The finer level no longer holds these samples
+            children = self.overlapping(level - 1, children, channel, x_min, x_max)
+            if len(children) > max_entries:
+                break
+            level, entries = level - 1, children
+
+        segments = [(level, self.entries_at(level, entries))]
+        # Samples newer than the chosen level's last entry are still in the finer levels
+        for k in range(level - 1, -1, -1):
+            tail = np.arange(2 * self.span(k + 1)[1], self.span(k)[1])
+            tail = self.overlapping(k, tail, channel, x_min, x_max)
+            if len(tail):
+                segments.append((k, self.entries_at(k, tail)))
+        return segments
+
+    def entries_at(self, level, entries):
+        """Return the given retained entries (absolute indices) of a level."""
+        oldest, _ = self.span(level)
+        return self.store[level].view()[:, entries - oldest]
+
+    def query(self, start, stop, max_entries):
+        """
+        Return the data of raw samples [start, stop) at the finest fitting level.
+
+        :return: (level, view) where view is (channels, n) raw samples for level 0,
+                 or (3 * channels, n) aggregates for coarser levels.
+        """
+        level, first, end = self.choose_level(start, stop, max_entries)
+        return level, self.entries(level, first, end)
+
+    def curve(self, data, level, x_channel, y_channel, stat='minmax'):
+        """
+        Turn query() data into plottable (x, y) arrays.
+
+        With stat='minmax' aggregates become a min/max pair per entry at the
+        entry's mean x, so peaks stay visible at every zoom level. With
+        stat='mean' each entry gives its mean point.
+        """
+        if level == 0:
+            return data[x_channel], data[y_channel]
+        c = self.channels
+        if stat == 'mean':
+            return data[2 * c + x_channel], data[2 * c + y_channel]
+        n = data.shape[1]
+        x = np.repeat(data[2 * c + x_channel], 2)
+        y = np.empty(2 * n)
+        y[0::2] = data[y_channel]
+        y[1::2] = data[c + y_channel]
+        return x, y
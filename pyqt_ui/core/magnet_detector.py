@@ -0,0 +1,240 @@
+# core/magnet_detector.py
+
+import time
+from collections import deque
+import cv2
+import numpy as np
+
+
+class TargetTracker:
+    def __init__(self, name, lower, upper, min_area=30, max_area=None):
+        """
+        Track one colored object (a magnet or the gripper) between frames.
+
+        :param name: Name published with the detections.
+        :param lower: Lower HSV bound of the object's color.
+        :param upper: Upper HSV bound of the object's color.
+        :param min_area: Smallest contour area accepted, in pixels.
+        :param max_area: Largest contour area accepted (None for no limit).
+        """
+        self.name = name
+        self.lower = np.asarray(lower, dtype=np.uint8)
+        self.upper = np.asarray(upper, dtype=np.uint8)
+        self.min_area = min_area
+        self.max_area = max_area
+        self.reset()
+
+    def reset(self):
+        """Forget the last position, so the next search scans the full frame."""
+        self.position = None
+        self.velocity = np.zeros(2)
+        self.size = None
+        self.timestamp = None
+
+    @property
+    def locked(self):
+        return self.position is not None
+
+    def predict(self, timestamp):
+        """Return the expected position at a timestamp from the last position and velocity."""
+        if self.timestamp is None:
+            return self.position
+        return self.position + self.velocity * (timestamp - self.timestamp)
+
+    def search_window(self, shape, timestamp, margin):
+        """
+        Return the (x0, y0, x1, y1) region around the predicted position, clipped to the frame.
+
+        :return: The region, or None when the prediction has left the frame.
+        """
+        height, width = shape[:2]
+        center = self.predict(timestamp)
+        half = max(self.size) * margin / 2
+        x0 = int(np.clip(np.floor(center[0] - half), 0, width - 1))
+        y0 = int(np.clip(np.floor(center[1] - half), 0, height - 1))
+        x1 = int(np.clip(np.ceil(center[0] + half), 0, width))
+        y1 = int(np.clip(np.ceil(center[1] + half), 0, height))
+        if x1 <= x0 or y1 <= y0:
+            return None
+        return x0, y0, x1, y1
+
+    def find(self, hsv, offset=(0, 0)):
+        """
+        Return the centroid, bounding size and area of the largest matching contour, or None.
+
+        Only one object per tracker is located: several magnets of the same
+        color need one target each, with color or area ranges that tell them apart.
+
+        :param hsv: HSV image (or region of interest) to search.
+        :param offset: Position of the region in the full frame.
+        """
+        mask = cv2.inRange(hsv, self.lower, self.upper)
+        contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        best, best_area, best_moments = None, self.min_area, None
+        for contour in contours:
+            area = cv2.contourArea(contour)
+            if area >= best_area and (self.max_area is None or area <= self.max_area):
+                moments = cv2.moments(contour)
+                if moments['m00'] == 0:
+                    # Degenerate contour (a line or a single pixel): it has no centroid
+                    continue
+                best, best_area, best_moments = contour, area, moments
+        if best is None:
+            return None
+        moments = best_moments
+        x, y, w, h = cv2.boundingRect(best)
+        center = np.array([moments['m10'] / moments['m00'] + offset[0], moments['m01'] / moments['m00'] + offset[1]])
+        return center, (w, h), best_area
+
+    def update(self, center, size, timestamp):
+        """Record a new position and update the velocity estimate."""
+        if self.position is not None and self.timestamp is not None and timestamp > self.timestamp:
+            self.velocity = (center - self.position) / (timestamp - self.timestamp)
+        self.position = center
+        self.size = size
+        self.timestamp = timestamp
+
+
+class MagnetDetector:
+    def __init__(self, targets, roi_margin=3.0, homography=None, history=300):
+        """
+        Locate magnets and the gripper by color, searching near their predicted positions.
+
+        Once an object is locked, only a window around the position predicted
+        from its last position and velocity is searched. If the object is not
+        found there, the same frame is rescanned in full.
+
+        :param targets: Dictionary of name -> {'lower': [h, s, v], 'upper': [h, s, v],
+                        'min_area': ..., 'max_area': ...}. Each target locates one object:
+                        the largest contour in its color and area range.
+        :param roi_margin: Search window size as a multiple of the object's size.
+        :param homography: 3x3 matrix mapping pixel to bed coordinates (None to skip them).
+        :param history: Number of recent latencies kept for the statistics.
+        """
+        self.trackers = [TargetTracker(name, **settings) for name, settings in targets.items()]
+        self.roi_margin = roi_margin
+        self.homography = np.asarray(homography, dtype=np.float64) if homography is not None else None
+        self.latencies = deque(maxlen=history)
+        self.reset_stats()
+
+    @classmethod
+    def from_config(cls, settings):
+        """Build a detector from the 'detection' config section, or return None if disabled."""
+        if not settings or not settings.get('enabled', False):
+            return None
+        homography = settings.get('homography')
+        if homography is None and settings.get('pixel_points') and settings.get('bed_points'):
+            homography = bed_homography(settings['pixel_points'], settings['bed_points'])
+        return cls(settings.get('targets', {}), settings.get('roi_margin', 3.0), homography)
+
+    def reset_stats(self):
+        """Reset the counters."""
+        self.frames = 0
+        self.full_scans = 0
+        self.roi_scans = 0
+        self.losses = 0
+        self.latencies.clear()
+
+    def to_bed(self, pixel):
+        """Map a pixel position to bed coordinates with the homography."""
+        x, y, w = self.homography @ np.array([pixel[0], pixel[1], 1.0])
+        return float(x / w), float(y / w)
+
+    def detect(self, image, timestamp=None):
+        """
+        Locate every target in a BGR image.
+
+        :param image: BGR frame.
+        :param timestamp: Capture time in seconds, used for the motion prediction.
+        :return: List of {'name', 'pixel', 'bed', 'size', 'area', 'tracked'} dictionaries,
+                 one per target found ('bed' is None without a homography).
+        """
+        start = time.perf_counter()
+        timestamp = time.monotonic() if timestamp is None else timestamp
+        detections = []
+        full_hsv = None
+        for tracker in self.trackers:
+            found = None
+            tracked = tracker.locked
+            if tracked:
+                window = tracker.search_window(image.shape, timestamp, self.roi_margin)
+                if window is not None:
+                    x0, y0, x1, y1 = window
+                    # Only the window is converted, so the cost follows the object size, not the frame size
+                    found = tracker.find(cv2.cvtColor(image[y0:y1, x0:x1], cv2.COLOR_BGR2HSV), (x0, y0))
+                    self.roi_scans += 1
+                if found is None:
+                    self.losses += 1
+                    tracker.reset()
+                    tracked = False
+            if found is None:
+                if full_hsv is None:
+                    full_hsv = cv2.cvtColor(image, cv2.COLOR_BGR2HSV)
+                found = tracker.find(full_hsv)
+                self.full_scans += 1
+            if found is None:
+                continue
+            center, size, area = found
+            tracker.update(center, size, timestamp)
+            detections.append({
+                'name': tracker.name,
+                'pixel': (float(center[0]), float(center[1])),
+                'bed': self.to_bed(center) if self.homography is not None else None,
+                'size': size,
+                'area': area,
+                'tracked': tracked,
+            })
+        self.frames += 1
+        self.latencies.append(time.perf_counter() - start)
+        return detections
+
+    def stats(self):
+        """Return scan counters and detection latency statistics (milliseconds)."""
+        samples = sorted(self.latencies)
+        count = len(samples)
+        return {
+            'frames': self.frames,
+            'full_scans': self.full_scans,
+            'roi_scans': self.roi_scans,
+            'losses': self.losses,
+            'latency_ms_mean': 1000 * sum(samples) / count if count else 0.0,
+            'latency_ms_p99': 1000 * samples[min(count - 1, int(count * 0.99))] if count else 0.0,
+            'latency_ms_max': 1000 * samples[-1] if count else 0.0,
+        }
+
+
+def bed_homography(pixel_points, bed_points):
+    """Return the homography mapping image pixels to bed coordinates from 4+ point pairs."""
+    matrix, _ = cv2.findHomography(np.asarray(pixel_points, dtype=np.float64),
+                                   np.asarray(bed_points, dtype=np.float64))
+    if matrix is None:
+        raise ValueError("Could not compute the bed homography from the given points.")
+    return matrix
+
+
+def benchmark(width=1920, height=1080, frames=300):
+    """Compare full-frame detection with ROI tracking on a synthetic moving magnet."""
+    targets = {'magnet': {'lower': [0, 150, 100], 'upper': [10, 255, 255], 'min_area': 50}}
+    background = np.full((height, width, 3), 90, dtype=np.uint8)
+
+    def frame(index):
+        image = background.copy()
+        cv2.circle(image, (200 + 4 * index, 300 + 2 * index), 25, (0, 0, 255), -1)
+        return image
+
+    images = [frame(index) for index in range(frames)]
+    results = {}
+    for name, margin in (('full', None), ('roi', 3.0)):
+        detector = MagnetDetector(targets, margin or 3.0)
+        for index, image in enumerate(images):
+            if margin is None:
+                detector.trackers[0].reset()
+            detector.detect(image, index / 60)
+        results[f"{name}_ms"] = detector.stats()['latency_ms_mean']
+    results['roi_full_scans'] = detector.full_scans
+    return results
+
+
+if __name__ == "__main__":
+    for key, value in benchmark().items():
+        print(f"{key}: {value:.3f}" if isinstance(value, float) else f"{key}: {value}")
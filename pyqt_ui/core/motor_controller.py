@@ -1,23 +1,87 @@
 # core/motor_controller.py
 
+import re
+import numpy as np
+import yaml
 from PyQt6.QtCore import QObject, pyqtSignal
 
 class MotorController(QObject):
-    # Signal to indicate motor torque has been updated: motor_index, torque_value
-    motor_updated = pyqtSignal(int, float)
+    # Signal to indicate motor torques have been updated: array of motor indices, array of torque values
+    motors_updated = pyqtSignal(object, object)
 
-    def __init__(self, motor_mapping=None, sync_mode='independent', parent=None):
+    def __init__(self, motor_mapping=None, sync_mode='independent', transport=None, motor_count=None, parent=None):
         """
         Initialize the MotorController.
 
         :param motor_mapping: A dictionary where keys are slider numbers and values are lists of motor indices.
         :param sync_mode: 'synchronized' for setting all motors the same, 'independent' for individual control.
+        :param transport: Optional core.motor_transport.MotorTransport the torque commands are sent through.
+        :param motor_count: Number of motors (default: the highest motor index in the mapping, at least 4).
         :param parent: Parent object (default None)
         """
         super().__init__(parent)
         self.sync_mode = sync_mode
-        self.motor_torques = [0.0, 0.0, 0.0, 0.0]  # Assuming 4 motors for now
         self.motor_mapping = motor_mapping if motor_mapping else {}
+        self.transport = transport
+        mapped = [motor for motors in self.motor_mapping.values() for motor in motors]
+        self.motor_count = motor_count if motor_count is not None else max(mapped + [4])
+        self.motor_torques = np.zeros(self.motor_count)
+        self.motor_positions = np.zeros(self.motor_count)
+        # Which kind of command drives each motor (zero-based index -> owner name)
+        self.owners = {}
+        # Compile the mapping once: slider number -> zero-based motor indices
+        self.slider_indices = {}
+        for slider_number, motors in self.motor_mapping.items():
+            self.slider_indices[slider_number] = self.reserve('sliders', motors)
+        self.all_indices = np.arange(self.motor_count)
+
+    @classmethod
+    def from_yaml(cls, filename, sync_mode='independent', transport=None, parent=None):
+        """
+        Build a controller from a motor mapping file.
+
+        The file maps 'slider<N>' keys to lists of motor numbers and may set
+        'motors' to the total number of motors.
+        """
+        with open(filename, "r") as file:
+            data = yaml.safe_load(file) or {}
+        motor_mapping = {
+            int(key[len('slider'):]): motors for key, motors in data.items()
+            if re.fullmatch(r"slider\d+", key)
+        }
+        return cls(motor_mapping, sync_mode, transport, data.get('motors'), parent)
+
+    @classmethod
+    def from_config(cls, config_manager, transport=None, parent=None):
+        """Build the controller from param_motors_control.yaml and the configured sync mode."""
+        return cls.from_yaml(
+            "config/param_motors_control.yaml",
+            config_manager.get('motor_slider_synchronization', 'sync_mode', default='independent'),
+            transport,
+            parent
+        )
+
+    def reserve(self, owner, motors):
+        """
+        Reserve motors for one kind of command (sliders, jog axes, force loop).
+
+        A motor may be reserved again by the same owner, never by another one,
+        so two command streams cannot fight over the same drive.
+
+        :param owner: Name of the command stream, used in the error message.
+        :param motors: Motor numbers, starting at 1.
+        :return: The zero-based motor indices.
+        """
+        indices = np.asarray(motors, dtype=np.intp) - 1  # motor_index starts at 1, arrays start at 0
+        if indices.size and (indices.min() < 0 or indices.max() >= self.motor_count):
+            raise ValueError(f"{owner} use motors outside 1..{self.motor_count}: {list(motors)}")
+        # Check every motor before taking any, so a refused reservation leaves nothing behind
+        for index in indices:
+            current = self.owners.get(int(index), owner)
+            if current != owner:
+                raise ValueError(f"Motor {index + 1} is used by both {current} and {owner}")
+        self.owners.update((int(index), owner) for index in indices)
+        return indices
 
     def set_torque(self, slider_number, torque):
         """
@@ -26,18 +90,62 @@ class MotorController(QObject):
         :param slider_number: The slider number (e.g., 1 for slider 1)
         :param torque: The torque value to set for the motors
         """
-        if slider_number in self.motor_mapping:
-            motors_to_update = self.motor_mapping[slider_number]
-            for motor_index in motors_to_update:
-                self.motor_torques[motor_index - 1] = torque  # motor_index starts at 1, list starts at 0
-                self.motor_updated.emit(motor_index - 1, torque)  # Emit the signal for each motor
-
+        if slider_number in self.slider_indices:
+            indices = self.slider_indices[slider_number]
         elif self.sync_mode == 'synchronized':
-            # If synchronized, set all motors to the same torque
-            for i in range(4):
-                self.motor_torques[i] = torque
-                self.motor_updated.emit(i, torque)
+            # If synchronized, set every motor the sliders may drive to the same torque,
+            # leaving the ones reserved by jog axes or the force loop alone
+            indices = self.all_indices[[self.owners.get(int(index), 'sliders') == 'sliders'
+                                        for index in self.all_indices]]
         else:
             raise ValueError(f"No motors mapped to slider {slider_number}")
+        self.set_torques(indices, torque)
+
+    def set_torques(self, indices, torques, notify=True, latest=False):
+        """
+        Set the torque of several motors in one update.
+
+        :param indices: Zero-based motor indices (array-like).
+        :param torques: One torque per index, or a single value for all of them.
+        :param notify: Emit motors_updated; pass False from high-rate control threads.
+        :param latest: Only keep the newest torque for these motors until the transport can send
+                       it (for control loops running faster than the drive acknowledges).
+        """
+        indices = np.asarray(indices, dtype=np.intp)
+        self.motor_torques[indices] = torques
+        values = self.motor_torques[indices]
+        # One emit and one command for the whole batch, however many motors it touches
+        if notify:
+            # A copy: indices may be one of the compiled slider_indices arrays
+            self.motors_updated.emit(indices.copy(), values)
+        self.send_values('TORQUE', indices, values, latest)
+
+    def set_positions(self, indices, positions):
+        """
+        Send position setpoints (e.g. sampled trajectories) to several motors in one command.
+
+        Safe to call from a streaming thread: no signal is emitted.
+
+        :param indices: Zero-based motor indices (array-like).
+        :param positions: One position per index.
+        """
+        indices = np.asarray(indices, dtype=np.intp)
+        self.motor_positions[indices] = positions
+        self.send_values('POSITION', indices, self.motor_positions[indices])
+
+    def send_values(self, command, indices, values, latest=False):
+        """Queue one command for a batch of motors (returns at once; the drive acks asynchronously)."""
+        if self.transport is None or not indices.size:
+            return
+        if indices.size == 1:
+            args = (command, int(indices[0]) + 1, float(values[0]))
+        else:
+            args = (f"{command}S", *(f"{index + 1}={value:g}" for index, value in zip(indices, values)))
+        if latest:
+            self.transport.send_latest((command, tuple(indices.tolist())), *args)
+        else:
+            self.transport.send(*args)
 
-        # TODO: Integrate actual motor control commands here
+    def torques(self):
+        """Return a copy of the current torque of every motor."""
+        return self.motor_torques.copy()
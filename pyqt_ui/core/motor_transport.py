@@ -0,0 +1,472 @@
+# core/motor_transport.py
+
+import asyncio
+import bisect
+import math
+import socket
+import threading
+import time
+from abc import ABC, abstractmethod
+from PyQt6.QtCore import QObject, pyqtSignal
+
+try:
+    import serial  # pyserial, only needed for the serial backend
+except ImportError:
+    serial = None
+
+
+class LatencyHistogram:
+    def __init__(self, min_s=1e-4, max_s=10.0, buckets_per_decade=10):
+        """
+        Round-trip latencies counted in log-spaced buckets.
+
+        :param min_s: Upper edge of the first bucket, in seconds.
+        :param max_s: Upper edge of the last bucket (slower samples go in an overflow bucket).
+        :param buckets_per_decade: Resolution of the buckets.
+        """
+        buckets = round(buckets_per_decade * math.log10(max_s / min_s))
+        self.edges = [min_s * 10 ** (index / buckets_per_decade) for index in range(buckets + 1)]
+        self.counts = [0] * (len(self.edges) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, latency):
+        self.counts[bisect.bisect_left(self.edges, latency)] += 1
+        self.count += 1
+        self.total += latency
+        self.max = max(self.max, latency)
+
+    def percentile(self, fraction):
+        """Return the upper bucket edge below which the given fraction of the samples falls."""
+        if not self.count:
+            return 0.0
+        target = fraction * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= target:
+                return min(self.edges[index], self.max) if index < len(self.edges) else self.max
+        return self.max
+
+    def stats(self):
+        """Return the mean, p50, p99 and max latency in milliseconds."""
+        return {
+            'latency_ms_mean': 1000 * self.total / self.count if self.count else 0.0,
+            'latency_ms_p50': 1000 * self.percentile(0.5),
+            'latency_ms_p99': 1000 * self.percentile(0.99),
+            'latency_ms_max': 1000 * self.max,
+        }
+
+
+class StreamBackend(ABC):
+    """Backend over asyncio streams; subclasses provide connect()."""
+
+    @abstractmethod
+    async def connect(self):
+        """Return the (reader, writer) stream pair of the connection."""
+
+    async def open(self):
+        self.reader, self.writer = await self.connect()
+
+    async def readline(self):
+        return await self.reader.readline()
+
+    async def write(self, data):
+        self.writer.write(data)
+        await self.writer.drain()
+
+    def close(self):
+        if getattr(self, 'writer', None) is not None:
+            self.writer.close()
+
+    def describe(self):
+        return type(self).__name__
+
+
+class LoopbackBackend(StreamBackend):
+    def __init__(self, response_delay=0.002):
+        """
+        A socket pair connected to a SimulatedDrive, for running without hardware.
+
+        :param response_delay: Time the simulated drive takes to execute a command, in seconds.
+        """
+        self.response_delay = response_delay
+        self.drive = None
+
+    async def connect(self):
+        host_end, drive_end = socket.socketpair()
+        self.drive = SimulatedDrive(drive_end, self.response_delay)
+        self.drive.start()
+        return await asyncio.open_connection(sock=host_end)
+
+    def close(self):
+        super().close()
+        if self.drive is not None:
+            self.drive.stop()
+
+    def describe(self):
+        return "simulated drive (loopback)"
+
+
+class SerialBackend:
+    def __init__(self, port, baudrate=115200):
+        """
+        A drive on a serial port (requires pyserial).
+
+        The blocking port is read and written on executor threads, so the
+        transport's event loop never waits on it.
+
+        :param port: Serial device, e.g. /dev/ttyUSB0 or COM3.
+        :param baudrate: Line speed.
+        """
+        if serial is None:
+            raise ImportError("The serial motor backend requires pyserial (pip install pyserial).")
+        self.port = port
+        self.baudrate = baudrate
+        self.connection = None
+
+    async def open(self):
+        loop = asyncio.get_running_loop()
+        self.connection = await loop.run_in_executor(
+            None, lambda: serial.Serial(self.port, self.baudrate, timeout=0.1))
+
+    async def readline(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            line = await loop.run_in_executor(None, self.connection.readline)
+            if line:
+                return line
+            if not self.connection.is_open:
+                return b''
+
+    async def write(self, data):
+        await asyncio.get_running_loop().run_in_executor(None, self.connection.write, data)
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+
+    def describe(self):
+        return f"serial {self.port}"
+
+
+class SimulatedDrive:
+    def __init__(self, sock, response_delay=0.002):
+        """
+        Stand-in motor drive speaking the transport's line protocol on a socket.
+
+        Requests are "<seq> TORQUE <motor> <value>", "<seq> TORQUES <motor>=<value> ...",
+        the same with POSITION/POSITIONS, or "<seq> PING"; replies are "<seq> OK"
+        or "<seq> ERR <reason>".
+        """
+        self.sock = sock
+        self.response_delay = response_delay
+        self.torques = {}
+        self.positions = {}
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.sock.close()
+
+    def execute(self, fields):
+        """Apply one request and return the reply text."""
+        if fields[1] == 'PING':
+            return 'OK'
+        targets = {'TORQUE': self.torques, 'POSITION': self.positions}
+        if fields[1] in targets and len(fields) == 4:
+            targets[fields[1]][int(fields[2])] = float(fields[3])
+            return 'OK'
+        if fields[1].rstrip('S') in targets and fields[1].endswith('S') and len(fields) > 2:
+            for pair in fields[2:]:
+                motor, value = pair.split('=')
+                targets[fields[1][:-1]][int(motor)] = float(value)
+            return 'OK'
+        return f"ERR unknown command {' '.join(fields[1:])}"
+
+    def run(self):
+        buffer = b''
+        try:
+            while True:
+                data = self.sock.recv(4096)
+                if not data:
+                    break
+                buffer += data
+                *lines, buffer = buffer.split(b'\n')
+                for line in lines:
+                    fields = line.decode().split()
+                    if not fields:
+                        continue
+                    time.sleep(self.response_delay)
+                    self.sock.sendall(f"{fields[0]} {self.execute(fields)}\n".encode())
+        except OSError:
+            pass
+
+
+class MotorTransport(QObject):
+    # Emitted with the sequence number and reason of a command the drive rejected or never acknowledged
+    command_failed = pyqtSignal(int, str)
+    # Emitted with a message when the backend cannot be opened or the connection is lost
+    connection_failed = pyqtSignal(str)
+
+    def __init__(self, backend, window=8, timeout=0.5, queue_size=256, parent=None):
+        """
+        Send motor commands on a dedicated asyncio loop without blocking the caller.
+
+        Up to `window` commands are in flight at once; each carries a sequence
+        number that the drive echoes in its acknowledgement, and round-trip
+        latencies are collected in a histogram.
+
+        :param backend: LoopbackBackend, SerialBackend or another object with
+                        open(), readline(), write() and close().
+        :param window: Maximum number of unacknowledged commands.
+        :param timeout: Seconds before an unacknowledged command counts as lost.
+        :param queue_size: Commands buffered before new ones are dropped.
+        :param parent: Parent object (default None)
+        """
+        super().__init__(parent)
+        self.backend = backend
+        self.window = window
+        self.timeout = timeout
+        self.queue_size = queue_size
+        self.loop = None
+        self.thread = None
+        self.queue = None
+        self.inflight = {}
+        self.histogram = LatencyHistogram()
+        self.sequence = 0
+        self.sent = 0
+        self.acked = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.dropped = 0
+        self.superseded = 0
+        # Latest-value slots: key -> (command, args) not yet sent, see send_latest()
+        self.latest = {}
+        self.latest_lock = threading.Lock()
+        self.connected = threading.Event()
+        # Message of the connection failure; commands are dropped while it is set
+        self.error = None
+
+    def start(self):
+        """Start the event loop thread and connect the backend."""
+        if self.thread is not None:
+            return
+        self.error = None
+        self.latest = {}
+        self.loop = asyncio.new_event_loop()
+        # Created here so send() can be used before the backend is connected
+        self.queue = asyncio.Queue(self.queue_size)
+        self.slots = asyncio.Semaphore(self.window)
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+        self.task = asyncio.run_coroutine_threadsafe(self.run(), self.loop)
+
+    def stop(self):
+        """Cancel the pending work, close the backend and stop the event loop."""
+        if self.thread is None:
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(self.shutdown(), self.loop).result(timeout=1.0)
+        except (TimeoutError, asyncio.TimeoutError, asyncio.CancelledError):
+            pass
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(timeout=1.0)
+        if not self.thread.is_alive():
+            self.loop.close()
+        self.thread = None
+        # send() and send_latest() refuse commands again until the next start()
+        self.loop = None
+
+    async def shutdown(self):
+        """Cancel the transport tasks on the loop thread."""
+        tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self.backend.close()
+
+    def send(self, command, *args):
+        """Queue a command from any thread; returns immediately."""
+        if self.loop is None:
+            raise RuntimeError("MotorTransport.start() must be called before sending.")
+        self.loop.call_soon_threadsafe(self.enqueue, (command, args))
+
+    def send_latest(self, key, command, *args):
+        """
+        Send a setpoint that supersedes the previous one with the same key, from any thread.
+
+        At most one entry per key waits in the queue, and the newest value is
+        sent when its turn comes: a control loop faster than the drive's
+        acknowledgements is thinned to the rate the drive keeps up with,
+        instead of filling the queue and losing its newest setpoints.
+        """
+        if self.loop is None:
+            raise RuntimeError("MotorTransport.start() must be called before sending.")
+        with self.latest_lock:
+            waiting = key in self.latest
+            self.latest[key] = (command, args)
+            if waiting:
+                self.superseded += 1
+                return
+        self.loop.call_soon_threadsafe(self.enqueue, (None, key))
+
+    def enqueue(self, item):
+        if self.error is not None or self.queue.full():
+            self.dropped += 1
+            if item[0] is None:
+                # Free the slot, so the key's next setpoint is queued again
+                with self.latest_lock:
+                    self.latest.pop(item[1], None)
+            return
+        self.queue.put_nowait(item)
+
+    async def run(self):
+        """Connect, then pipeline queued commands and match their acknowledgements."""
+        try:
+            await self.backend.open()
+        except Exception as e:
+            self.fail(f"Unable to open the {self.backend.describe()}: {e}")
+            return
+        self.connected.set()
+        tasks = [asyncio.create_task(loop()) for loop in (self.write_loop, self.read_loop, self.expire_loop)]
+        try:
+            # The loops only end by raising: as soon as one does, the others must not run on
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+            error = next(iter(done)).exception()
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        self.fail(f"Lost the connection to the {self.backend.describe()}: {error}")
+
+    def fail(self, message):
+        """Stop accepting commands, drop the queued ones and report why (on the loop thread)."""
+        self.error = message
+        self.connected.clear()
+        while not self.queue.empty():
+            self.queue.get_nowait()
+            self.dropped += 1
+        with self.latest_lock:
+            self.latest.clear()
+        self.connection_failed.emit(message)
+
+    async def write_loop(self):
+        while True:
+            command, args = await self.queue.get()
+            await self.slots.acquire()
+            if command is None:
+                # Latest-value slot: take the newest setpoint only now that it can be written
+                with self.latest_lock:
+                    entry = self.latest.pop(args, None)
+                if entry is None:
+                    self.slots.release()  # Cleared by a connection failure
+                    continue
+                command, args = entry
+            self.sequence += 1
+            self.inflight[self.sequence] = time.perf_counter()
+            line = " ".join([str(self.sequence), command] + [str(arg) for arg in args]) + "\n"
+            await self.backend.write(line.encode())
+            self.sent += 1
+
+    async def read_loop(self):
+        while True:
+            line = await self.backend.readline()
+            if not line:
+                raise ConnectionError("the drive closed the connection")
+            fields = line.decode(errors='replace').split(maxsplit=2)
+            if not fields or not fields[0].isdigit():
+                continue
+            sequence = int(fields[0])
+            sent_at = self.inflight.pop(sequence, None)
+            if sent_at is None:
+                continue  # Late reply to a command already counted as timed out
+            self.histogram.add(time.perf_counter() - sent_at)
+            self.slots.release()
+            if len(fields) > 1 and fields[1] == 'OK':
+                self.acked += 1
+            else:
+                self.errors += 1
+                self.command_failed.emit(sequence, fields[2] if len(fields) > 2 else "error")
+
+    async def expire_loop(self):
+        """Count commands never acknowledged and free their window slots."""
+        while True:
+            await asyncio.sleep(self.timeout / 2)
+            deadline = time.perf_counter() - self.timeout
+            for sequence in [seq for seq, sent_at in self.inflight.items() if sent_at < deadline]:
+                del self.inflight[sequence]
+                self.timeouts += 1
+                self.slots.release()
+                self.command_failed.emit(sequence, "timeout")
+
+    def stats(self):
+        """Return command counters and the acknowledgement latency histogram summary."""
+        return {
+            'sent': self.sent,
+            'acked': self.acked,
+            'errors': self.errors,
+            'timeouts': self.timeouts,
+            'dropped': self.dropped,
+            'superseded': self.superseded,
+            'in_flight': len(self.inflight),
+            'connected': self.connected.is_set(),
+            **self.histogram.stats(),
+        }
+
+
+def create_transport(settings, parent=None):
+    """
+    Build a started MotorTransport from the 'motor_transport' config section, or return None.
+
+    Create one per application: a serial port can only be opened once.
+
+    {"backend": "loopback"}, {"backend": "serial", "port": ..., "baudrate": ...} or {"backend": "none"},
+    plus optional "window" and "timeout_s".
+    """
+    settings = settings or {}
+    kind = settings.get('backend', 'loopback')
+    if kind == 'none':
+        return None
+    if kind == 'loopback':
+        backend = LoopbackBackend(settings.get('response_delay_s', 0.002))
+    elif kind == 'serial':
+        backend = SerialBackend(settings['port'], settings.get('baudrate', 115200))
+    else:
+        raise ValueError(f"Unknown motor transport backend: {kind}.")
+    transport = MotorTransport(backend, settings.get('window', 8), settings.get('timeout_s', 0.5), parent=parent)
+    transport.start()
+    return transport
+
+
+def benchmark(commands=2000, windows=(1, 8)):
+    """Measure command throughput and ack latency against the simulated drive for several windows."""
+    results = {}
+    for window in windows:
+        transport = MotorTransport(LoopbackBackend(response_delay=0.0005), window=window, queue_size=commands)
+        transport.start()
+        transport.connected.wait(2.0)
+        start = time.perf_counter()
+        for index in range(commands):
+            transport.send('TORQUE', index % 4 + 1, 0.5)
+        while transport.acked + transport.errors + transport.timeouts + transport.dropped < commands:
+            time.sleep(0.001)
+        elapsed = time.perf_counter() - start
+        stats = transport.stats()
+        transport.stop()
+        results[f"window{window}_commands_per_s"] = commands / elapsed
+        results[f"window{window}_latency_ms_p50"] = stats['latency_ms_p50']
+        results[f"window{window}_dropped"] = stats['dropped']
+    return results
+
+
+if __name__ == "__main__":
+    for key, value in benchmark().items():
+        print(f"{key}: {value:.3f}" if isinstance(value, float) else f"{key}: {value}")
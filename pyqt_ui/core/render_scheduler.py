@@ -0,0 +1,70 @@
+# core/render_scheduler.py
+
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+
+
+class RenderScheduler(QObject):
+    # Emitted at most once per display frame when new data arrived since the last one
+    render = pyqtSignal()
+
+    def __init__(self, fps=30, parent=None):
+        """
+        Coalesce data updates into at most one redraw per display frame.
+
+        :param fps: Maximum redraws per second.
+        :param parent: Parent object (default None)
+        """
+        super().__init__(parent)
+        self.dirty = False
+        self.samples_received = 0
+        self.frames_drawn = 0
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.on_frame)
+        self.set_fps(fps)
+
+    def set_fps(self, fps):
+        """Change the maximum redraw rate."""
+        if fps <= 0:
+            raise ValueError("fps must be positive.")
+        self.fps = fps
+        self.timer.setInterval(max(1, round(1000 / fps)))
+
+    def mark_dirty(self, samples=1):
+        """Record that new samples arrived; the redraw happens on the next frame."""
+        self.samples_received += samples
+        self.dirty = True
+        if not self.timer.isActive():
+            # The timer only runs while data keeps arriving
+            self.timer.start()
+
+    def on_frame(self):
+        """Redraw if anything changed, otherwise go idle."""
+        if not self.dirty:
+            self.timer.stop()
+            return
+        self.dirty = False
+        self.frames_drawn += 1
+        self.render.emit()
+
+    def flush(self):
+        """Redraw immediately if there is pending data."""
+        if self.dirty:
+            self.on_frame()
+
+    def stop(self):
+        """Drop any pending redraw and stop the timer."""
+        self.dirty = False
+        self.timer.stop()
+
+    def reset_stats(self):
+        """Reset the sample and frame counters."""
+        self.samples_received = 0
+        self.frames_drawn = 0
+
+    def stats(self):
+        """Return samples received versus frames drawn."""
+        return {
+            'samples_received': self.samples_received,
+            'frames_drawn': self.frames_drawn,
+            'samples_per_frame': self.samples_received / self.frames_drawn if self.frames_drawn else 0.0,
+        }
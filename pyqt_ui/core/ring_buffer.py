@@ -0,0 +1,127 @@
+# core/ring_buffer.py
+
+import numpy as np
+
+
+class RingBuffer:
+    def __init__(self, capacity, channels, dtype=np.float64):
+        """
+        Fixed-size multi-channel ring buffer with contiguous views.
+
+        Every sample is written twice, at `i` and `i + capacity`, so the last
+        `capacity` samples always form one contiguous slice of the storage and
+        view() never has to copy or unwrap.
+
+        :param capacity: Number of samples kept per channel.
+        :param channels: Number of channels.
+        :param dtype: Storage dtype.
+        """
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1.")
+        self.capacity = int(capacity)
+        self.channels = int(channels)
+        self.data = np.zeros((self.channels, 2 * self.capacity), dtype=dtype)
+        self.clear()
+
+    def clear(self):
+        """Forget all stored samples (the storage is kept)."""
+        self.head = 0     # Next write position in [0, capacity)
+        self.count = 0    # Number of valid samples
+        self.total = 0    # Samples ever appended
+
+    def __len__(self):
+        return self.count
+
+    def append(self, sample):
+        """Append one sample (a sequence with one value per channel)."""
+        self.data[:, self.head] = sample
+        self.data[:, self.head + self.capacity] = sample
+        self.head = (self.head + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+        self.total += 1
+
+    def extend(self, block):
+        """Append a block of samples, shaped (channels, n)."""
+        block = np.asarray(block)
+        n = block.shape[1]
+        if n == 0:
+            return
+        if n >= self.capacity:
+            # Only the newest `capacity` samples survive
+            block = block[:, n - self.capacity:]
+            self.data[:, :self.capacity] = block
+            self.data[:, self.capacity:] = block
+            self.head = 0
+            self.count = self.capacity
+            self.total += n
+            return
+
+        first = min(n, self.capacity - self.head)
+        for offset in (0, self.capacity):
+            self.data[:, self.head + offset:self.head + offset + first] = block[:, :first]
+            if first < n:
+                self.data[:, offset:offset + n - first] = block[:, first:]
+        self.head = (self.head + n) % self.capacity
+        self.count = min(self.count + n, self.capacity)
+        self.total += n
+
+    def view(self):
+        """Return the stored samples, oldest first, as a (channels, len) view."""
+        start = self.head + self.capacity - self.count
+        return self.data[:, start:start + self.count]
+
+
+class GrowableBuffer:
+    def __init__(self, channels, initial_capacity=4096, dtype=np.float64):
+        """
+        Unbounded multi-channel buffer keeping every sample of a session.
+
+        Same interface as RingBuffer. The storage doubles when full, so appends
+        are amortized O(1) and view() is always a contiguous slice.
+
+        :param channels: Number of channels.
+        :param initial_capacity: Samples allocated up front.
+        :param dtype: Storage dtype.
+        """
+        self.channels = int(channels)
+        self.data = np.zeros((self.channels, max(int(initial_capacity), 1)), dtype=dtype)
+        self.clear()
+
+    def clear(self):
+        """Forget all stored samples (the storage is kept)."""
+        self.count = 0
+        self.total = 0
+
+    def __len__(self):
+        return self.count
+
+    def reserve(self, size):
+        """Make room for at least `size` samples."""
+        capacity = self.data.shape[1]
+        if size <= capacity:
+            return
+        while capacity < size:
+            capacity *= 2
+        data = np.zeros((self.channels, capacity), dtype=self.data.dtype)
+        data[:, :self.count] = self.data[:, :self.count]
+        self.data = data
+
+    def append(self, sample):
+        """Append one sample (a sequence with one value per channel)."""
+        self.reserve(self.count + 1)
+        self.data[:, self.count] = sample
+        self.count += 1
+        self.total += 1
+
+    def extend(self, block):
+        """Append a block of samples, shaped (channels, n)."""
+        block = np.asarray(block)
+        n = block.shape[1]
+        self.reserve(self.count + n)
+        self.data[:, self.count:self.count + n] = block
+        self.count += n
+        self.total += n
+
+    def view(self):
+        """Return the stored samples, oldest first, as a (channels, len) view."""
+        return self.data[:, :self.count]
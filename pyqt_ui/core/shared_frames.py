@@ -0,0 +1,407 @@
+# core/shared_frames.py
+
+import os
+import socket
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from multiprocessing import resource_tracker, shared_memory
+import numpy as np
+
+try:
+    import fcntl  # POSIX file locks, to serialise subscriptions across processes
+except ImportError:
+    fcntl = None
+
+MAGIC = 0x4D42524652414D45  # "MBRFRAME"
+MAX_SUBSCRIBERS = 16
+# Header words: magic, height, width, channels (of the largest frame), slots, slot_bytes,
+# latest sequence, writer pid, then subscriber ports, then the pid of each subscriber
+HEADER_WORDS = 8 + 2 * MAX_SUBSCRIBERS
+PORTS = 8
+PIDS = PORTS + MAX_SUBSCRIBERS
+ALIGNMENT = 64
+# Serialises attach() calls that stub out resource_tracker.register (before Python 3.13)
+_register_lock = threading.Lock()
+
+
+def layout(slots, slot_bytes):
+    """
+    Return the byte offsets of the slot sequences, timestamps, shapes and data,
+    the slot stride and the total size.
+    """
+    sequences = HEADER_WORDS * 8
+    timestamps = sequences + slots * 8
+    shapes = timestamps + slots * 8
+    data = -(-(shapes + slots * 3 * 8) // ALIGNMENT) * ALIGNMENT
+    slot_stride = -(-slot_bytes // ALIGNMENT) * ALIGNMENT
+    return sequences, timestamps, shapes, data, slot_stride, data + slots * slot_stride
+
+
+def attach(name):
+    """Open an existing segment without letting this process's resource tracker unlink it on exit."""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)  # Python >= 3.13
+    except TypeError:
+        pass
+    # Older versions always register the segment, and the tracker would remove it
+    # when the reader exits: skip the registration instead. The stub is module-wide,
+    # so it is only in place for this one call and under a lock; segments other
+    # code opens in another thread meanwhile are not tracked either.
+    with _register_lock:
+        register = resource_tracker.register
+        resource_tracker.register = lambda *args: None
+        try:
+            return shared_memory.SharedMemory(name=name)
+        finally:
+            resource_tracker.register = register
+
+
+def lock_path(name):
+    """Return the path of a ring's lock file."""
+    return os.path.join(tempfile.gettempdir(), f"{name}.lock")
+
+
+def remove_lock(name):
+    """Delete a ring's lock file, if any."""
+    try:
+        os.remove(lock_path(name))
+    except FileNotFoundError:
+        pass
+
+
+@contextmanager
+def header_lock(name):
+    """
+    Hold an exclusive lock on a ring's subscriber table, across processes.
+
+    The lock is a file lock in the temporary directory, released even if the
+    holder dies; the writer deletes the file when it removes the ring.
+    """
+    if fcntl is None:
+        yield
+        return
+    with open(lock_path(name), 'a') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def process_alive(pid):
+    """Return True if a process with this pid exists."""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class SharedFrameRing:
+    def __init__(self, segment):
+        """Views over a shared frame ring segment (see SharedFrameWriter for the layout)."""
+        self.segment = segment
+        self.header = np.ndarray((HEADER_WORDS,), dtype=np.uint64, buffer=segment.buf)
+        slots, slot_bytes = int(self.header[4]), int(self.header[5])
+        offsets = layout(slots, slot_bytes)
+        self.slots = slots
+        self.slot_bytes = slot_bytes
+        # Seqlock per slot: odd while the writer is filling it, 2 * sequence + 2 once complete.
+        # It covers the slot's timestamp, shape and data.
+        self.sequences = np.ndarray((slots,), dtype=np.uint64, buffer=segment.buf, offset=offsets[0])
+        self.timestamps = np.ndarray((slots,), dtype=np.float64, buffer=segment.buf, offset=offsets[1])
+        self.shapes = np.ndarray((slots, 3), dtype=np.uint64, buffer=segment.buf, offset=offsets[2])
+        self.data = [np.ndarray((slot_bytes,), dtype=np.uint8, buffer=segment.buf,
+                                offset=offsets[3] + slot * offsets[4]) for slot in range(slots)]
+
+    @property
+    def shape(self):
+        """(height, width, channels) of the largest frame the ring was sized for."""
+        return int(self.header[1]), int(self.header[2]), int(self.header[3])
+
+    @property
+    def latest(self):
+        """Sequence number of the newest complete frame (0 if none yet)."""
+        return int(self.header[6])
+
+    def subscribers(self):
+        """Return the notification ports of the attached readers."""
+        return [int(port) for port in self.header[PORTS:PIDS] if port]
+
+
+class SharedFrameWriter:
+    def __init__(self, name, shape, slots=4):
+        """
+        Publish frames to a shared-memory ring that any local process can read.
+
+        Each frame is copied once into the next slot; readers map the same
+        memory and get zero-copy views (SharedFrameReader). Readers are
+        notified of new frames by a UDP datagram on the loopback interface.
+
+        :param name: Name of the shared memory segment.
+        :param shape: (height, width, channels) of the largest frame to publish.
+        :param slots: Number of frames kept; a reader has slots - 1 frame periods to use a view.
+        """
+        slot_bytes = int(np.prod(shape))
+        size = layout(slots, slot_bytes)[-1]
+        try:
+            self.segment = shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            # Only reclaim a ring left over by a writer that did not exit cleanly
+            self.reclaim(name)
+            self.segment = shared_memory.SharedMemory(name=name, create=True, size=size)
+        header = np.ndarray((HEADER_WORDS,), dtype=np.uint64, buffer=self.segment.buf)
+        header[:] = 0
+        header[1:6] = list(shape) + [slots, slot_bytes]
+        header[7] = os.getpid()
+        header[0] = MAGIC
+        self.ring = SharedFrameRing(self.segment)
+        self.ring.sequences[:] = 0
+        self.name = name
+        self.sequence = 0
+        self.frames_written = 0
+        self.frames_oversize = 0
+        self.notifier = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.notifier.setblocking(False)
+
+    @staticmethod
+    def reclaim(name):
+        """
+        Remove an existing segment if its writer is gone.
+
+        :raises FileExistsError: if the segment is not a frame ring or its writer is still running.
+        """
+        segment = attach(name)
+        try:
+            if segment.size < HEADER_WORDS * 8:
+                raise FileExistsError(f"Shared memory segment {name} exists and is not a frame ring.")
+            header = np.ndarray((HEADER_WORDS,), dtype=np.uint64, buffer=segment.buf)
+            magic, pid = int(header[0]), int(header[7])
+            del header  # Release the buffer so the segment can be closed
+            if magic != MAGIC:
+                raise FileExistsError(f"Shared memory segment {name} exists and is not a frame ring.")
+            if pid and process_alive(pid):
+                raise FileExistsError(f"Shared frame ring {name} is in use by process {pid}.")
+        finally:
+            segment.close()
+        stale = attach(name)
+        stale.close()
+        stale.unlink()
+        remove_lock(name)
+
+    def write(self, image, timestamp=None):
+        """
+        Copy a frame into the next slot and notify the readers.
+
+        :return: The frame's sequence number, or None if it is larger than a slot.
+        """
+        if image.nbytes > self.ring.slot_bytes:
+            self.frames_oversize += 1
+            return None
+        ring = self.ring
+        sequence = self.sequence + 1
+        slot = sequence % ring.slots
+        ring.sequences[slot] = 2 * sequence + 1
+        np.copyto(ring.data[slot][:image.nbytes].reshape(image.shape), image)
+        ring.timestamps[slot] = time.monotonic() if timestamp is None else timestamp
+        ring.shapes[slot] = image.shape[0], image.shape[1], image.shape[2] if image.ndim > 2 else 1
+        ring.sequences[slot] = 2 * sequence + 2
+        ring.header[6] = sequence
+        self.sequence = sequence
+        self.frames_written += 1
+        self.notify(sequence)
+        return sequence
+
+    def notify(self, sequence):
+        """Send the new sequence number to every subscribed reader, never blocking."""
+        message = sequence.to_bytes(8, 'little')
+        for port in self.ring.subscribers():
+            try:
+                self.notifier.sendto(message, ('127.0.0.1', port))
+            except OSError:
+                pass
+
+    def close(self):
+        """Remove the segment and its lock file; readers keep their mapping until they close."""
+        self.notifier.close()
+        # Tell the readers still mapping it that the ring is gone (see SharedFrameReader.close)
+        self.ring.header[0] = 0
+        self.ring = None
+        self.segment.close()
+        self.segment.unlink()
+        remove_lock(self.name)
+
+    def stats(self):
+        return {'frames_written': self.frames_written, 'frames_oversize': self.frames_oversize}
+
+
+class SharedFrameReader:
+    def __init__(self, name, notify=True):
+        """
+        Read the newest frames of a SharedFrameWriter from another process.
+
+        :param name: Name of the shared memory segment.
+        :param notify: Subscribe to new-frame notifications, so wait() blocks instead of polling.
+        """
+        self.name = name
+        self.segment = attach(name)
+        self.ring = SharedFrameRing(self.segment)
+        if int(self.ring.header[0]) != MAGIC:
+            self.segment.close()
+            raise ValueError(f"Shared memory segment {name} is not a frame ring.")
+        self.last_sequence = 0
+        self.torn_reads = 0
+        self.listener = None
+        self.subscriber_slot = None
+        if notify:
+            self.subscribe()
+
+    def subscribe(self):
+        """Register a loopback UDP port in the ring header to receive notifications."""
+        self.listener = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.listener.bind(('127.0.0.1', 0))
+        port = self.listener.getsockname()[1]
+        header = self.ring.header
+        # Readers attaching at the same time would otherwise claim the same free entry
+        with header_lock(self.name):
+            for slot in range(MAX_SUBSCRIBERS):
+                # Also take over the entries of readers that exited without closing
+                if header[PORTS + slot] == 0 or not process_alive(int(header[PIDS + slot])):
+                    header[PIDS + slot] = os.getpid()
+                    header[PORTS + slot] = port
+                    self.subscriber_slot = slot
+                    return
+        self.listener.close()
+        self.listener = None
+
+    def latest(self):
+        """
+        Return (sequence, timestamp, view) of the newest complete frame, or None.
+
+        The view maps the shared slot directly. It stays valid until the writer
+        wraps around the ring; check is_current(sequence) after using it, or
+        use copy_latest() when the data must be stable.
+        """
+        ring = self.ring
+        sequence = ring.latest
+        if sequence == 0:
+            return None
+        slot = sequence % ring.slots
+        if int(ring.sequences[slot]) != 2 * sequence + 2:
+            self.torn_reads += 1
+            return None
+        height, width, channels = (int(size) for size in ring.shapes[slot])
+        timestamp = float(ring.timestamps[slot])
+        if not self.is_current(sequence):
+            # The shape or timestamp may belong to the next frame of the slot
+            self.torn_reads += 1
+            return None
+        view = ring.data[slot][:height * width * channels].reshape(
+            (height, width, channels) if channels > 1 else (height, width))
+        self.last_sequence = sequence
+        return sequence, timestamp, view
+
+    def is_current(self, sequence):
+        """Return True if the slot of a frame has not been overwritten since it was read."""
+        return int(self.ring.sequences[sequence % self.ring.slots]) == 2 * sequence + 2
+
+    def copy_latest(self, out=None, retries=3):
+        """Copy the newest frame out of the ring, retrying if the writer overwrote it meanwhile."""
+        for _ in range(retries):
+            result = self.latest()
+            if result is None:
+                return None
+            sequence, timestamp, view = result
+            if out is None or out.shape != view.shape:
+                out = np.empty_like(view)
+            np.copyto(out, view)
+            if self.is_current(sequence):
+                return sequence, timestamp, out
+            self.torn_reads += 1
+        return None
+
+    def wait(self, timeout=1.0):
+        """Block until a frame newer than the last one read is published; return False on timeout."""
+        deadline = time.monotonic() + timeout
+        while self.ring.latest <= self.last_sequence:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            if self.listener is None:
+                time.sleep(min(remaining, 0.001))
+                continue
+            self.listener.settimeout(remaining)
+            try:
+                self.listener.recv(8)
+            except socket.timeout:
+                return False
+        return True
+
+    def close(self):
+        """Unsubscribe and unmap the segment."""
+        if self.listener is not None:
+            # Once the writer has removed the ring there is no entry (nor lock file) left to clear
+            if self.subscriber_slot is not None and int(self.ring.header[0]) == MAGIC:
+                with header_lock(self.name):
+                    self.ring.header[PORTS + self.subscriber_slot] = 0
+            self.listener.close()
+            self.listener = None
+        self.ring = None
+        self.segment.close()
+
+
+def reader_process(name, seconds, results):
+    """Consume frames in another process and report how many were seen (used by benchmark())."""
+    reader = SharedFrameReader(name)
+    seen, latencies = 0, []
+    end = time.monotonic() + seconds
+    while time.monotonic() < end:
+        if not reader.wait(0.1):
+            continue
+        result = reader.latest()
+        if result is None:
+            continue
+        sequence, timestamp, view = result
+        int(view[0, 0, 0])  # Touch the pixels without copying them
+        latencies.append(time.monotonic() - timestamp)
+        seen += 1
+    reader.close()
+    results.put({'frames_seen': seen,
+                 'latency_ms_mean': 1000 * sum(latencies) / len(latencies) if latencies else 0.0})
+
+
+def benchmark(width=1920, height=1080, fps=60.0, readers=2, seconds=2.0):
+    """Publish synthetic frames and read them from several processes without pickling."""
+    import multiprocessing
+
+    name = f"mbr_bench_{int(time.time())}"
+    writer = SharedFrameWriter(name, (height, width, 3))
+    results = multiprocessing.Queue()
+    processes = [multiprocessing.Process(target=reader_process, args=(name, seconds, results))
+                 for _ in range(readers)]
+    for process in processes:
+        process.start()
+    time.sleep(0.5)  # Let the readers attach
+    image = np.zeros((height, width, 3), dtype=np.uint8)
+    start = time.perf_counter()
+    frames = int(seconds * fps)
+    for index in range(frames):
+        image[:, :, 0] = index % 256
+        writer.write(image)
+        time.sleep(max(0.0, start + (index + 1) / fps - time.perf_counter()))
+    write_ms = 1000 * (time.perf_counter() - start) / frames
+    stats = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    writer.close()
+    return {'frames_written': frames, 'period_ms': write_ms,
+            **{f"reader{index}_{key}": value for index, item in enumerate(stats) for key, value in item.items()}}
+
+
+if __name__ == "__main__":
+    for key, value in benchmark().items():
+        print(f"{key}: {value:.3f}" if isinstance(value, float) else f"{key}: {value}")
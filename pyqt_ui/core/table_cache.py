@@ -0,0 +1,185 @@
+# core/table_cache.py
+
+import csv
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import numpy as np
+
+CACHE_VERSION = 1
+
+
+def cache_paths(file_path):
+    """Return the (data, metadata) cache paths kept next to a table file."""
+    return f"{file_path}.cache.npy", f"{file_path}.cache.json"
+
+
+def file_digest(file_path):
+    """Return the SHA-256 hex digest of a file."""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as file:
+        for chunk in iter(lambda: file.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def read_headers(file_path):
+    """Return the distinct column headers of a CSV table, in file order."""
+    with open(file_path, 'r', newline='') as file:
+        return list(dict.fromkeys(next(csv.reader(file))))
+
+
+def parse_csv(file_path, headers=None):
+    """
+    Parse columns of a CSV table into (headers, array of shape (columns, rows)).
+
+    Only the wanted columns are converted, in one vectorised pass, so other
+    (e.g. text) columns of the file are never parsed.
+
+    :param headers: Headers of the columns to read (default: all of them).
+    """
+    with open(file_path, 'r', newline='') as file:
+        file_headers = next(csv.reader(file))
+    headers = list(dict.fromkeys(file_headers if headers is None else headers))
+    missing = [header for header in headers if header not in file_headers]
+    if missing:
+        raise ValueError(f"Columns {missing} not found in {file_path}.")
+    values = np.loadtxt(file_path, delimiter=',', quotechar='"', skiprows=1, ndmin=2, dtype=np.float64,
+                        usecols=[file_headers.index(header) for header in headers])
+    return headers, np.ascontiguousarray(values.T)
+
+
+def write_json(path, data):
+    """Write a JSON file through a temporary file, so a reader never sees it half-written."""
+    with open(path + '.tmp', 'w') as file:
+        json.dump(data, file)
+    os.replace(path + '.tmp', path)
+
+
+def write_cache(file_path, headers, table, stat, digest):
+    """Write the compiled table and its metadata next to the source file."""
+    data_path, meta_path = cache_paths(file_path)
+    meta = {
+        'version': CACHE_VERSION,
+        'mtime_ns': stat.st_mtime_ns,
+        'size': stat.st_size,
+        'sha256': digest,
+        'headers': headers,
+    }
+    # Write to temporary files first so a reader never sees a half-written cache
+    with open(data_path + '.tmp', 'wb') as file:
+        np.save(file, table)
+    os.replace(data_path + '.tmp', data_path)
+    write_json(meta_path, meta)
+
+
+def read_meta(meta_path):
+    """Read the cache metadata, or return None if it is missing or unreadable."""
+    try:
+        with open(meta_path, 'r') as file:
+            meta = json.load(file)
+    except (OSError, json.JSONDecodeError):
+        return None
+    return meta if meta.get('version') == CACHE_VERSION else None
+
+
+def load_table(file_path, headers=None, use_cache=True):
+    """
+    Load columns of a CSV table, going through the binary cache when possible.
+
+    The cache is valid while the source file keeps the same mtime and size.
+    If either changed the file is hashed, and the cache is only rebuilt when
+    the content really differs. A cache missing some of the wanted columns
+    is rebuilt with the columns it had plus the new ones.
+
+    :param file_path: Path of the CSV table.
+    :param headers: Headers of the columns to load (default: all of them).
+    :param use_cache: Set to False to always parse the CSV.
+    :return: (headers, array of shape (columns, rows)); the array is memory-mapped on a cache hit.
+    """
+    if not use_cache:
+        return parse_csv(file_path, headers)
+
+    headers = list(dict.fromkeys(read_headers(file_path) if headers is None else headers))
+    data_path, meta_path = cache_paths(file_path)
+    stat = os.stat(file_path)
+    meta = read_meta(meta_path)
+    digest = None
+    if meta is not None and os.path.exists(data_path):
+        if meta['mtime_ns'] != stat.st_mtime_ns or meta['size'] != stat.st_size:
+            digest = file_digest(file_path)
+            if meta['sha256'] == digest:
+                # Same content with a new timestamp (e.g. a fresh checkout): refresh the key only
+                meta['mtime_ns'] = stat.st_mtime_ns
+                meta['size'] = stat.st_size
+                try:
+                    write_json(meta_path, meta)
+                except OSError as e:
+                    print(f"Could not refresh the cache key of {file_path}: {e}")
+            else:
+                meta = None
+        if meta is not None:
+            if all(header in meta['headers'] for header in headers):
+                return meta['headers'], np.load(data_path, mmap_mode='r')
+            headers = meta['headers'] + [header for header in headers if header not in meta['headers']]
+    if digest is None:
+        digest = file_digest(file_path)
+
+    headers, table = parse_csv(file_path, headers)
+    try:
+        write_cache(file_path, headers, table, stat, digest)
+    except OSError as e:
+        # Read-only location: keep working from the parsed table
+        print(f"Could not write the cache of {file_path}: {e}")
+    return headers, table
+
+
+def load_columns(file_path, columns, use_cache=True):
+    """Return a dictionary of name -> column array for the given {name: header} mapping."""
+    headers, table = load_table(file_path, list(columns.values()), use_cache)
+    return {name: table[headers.index(header)] for name, header in columns.items()}
+
+
+def clear_cache(file_path):
+    """Remove the cache files of a table, if any."""
+    for path in cache_paths(file_path):
+        if os.path.exists(path):
+            os.remove(path)
+
+
+_FIRST_SAMPLE_SNIPPETS = {
+    'pandas': (
+        "import pandas as pd\n"
+        "data = pd.read_csv(path)\n"
+        "row = data.iloc[0]\n"
+        "sample = row['$dist_1 [mm]']\n"
+    ),
+    'cache': (
+        "from core.replay_engine import ReplayEngine\n"
+        "engine = ReplayEngine.from_csv(path)\n"
+        "sample = engine.sample(0)\n"
+    ),
+}
+
+
+def time_to_first_sample(file_path, method):
+    """Measure, in a fresh interpreter, the seconds from start-up to the first replayed sample."""
+    code = (
+        "import time\n"
+        "start = time.perf_counter()\n"
+        f"path = {file_path!r}\n"
+        + _FIRST_SAMPLE_SNIPPETS[method] +
+        "print(time.perf_counter() - start)\n"
+    )
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+    return float(result.stdout.strip())
+
+
+if __name__ == "__main__":
+    path = sys.argv[1] if len(sys.argv) > 1 else 'config/HBsteel-M22-F.csv'
+    clear_cache(path)
+    print(f"pandas read_csv:   {time_to_first_sample(path, 'pandas') * 1000:8.1f} ms")
+    print(f"cache miss (build):{time_to_first_sample(path, 'cache') * 1000:8.1f} ms")
+    print(f"cache hit (mmap):  {time_to_first_sample(path, 'cache') * 1000:8.1f} ms")
@@ -0,0 +1,117 @@
+# core/tick_scheduler.py
+
+import math
+import threading
+import time
+from collections import deque
+
+
+class TickScheduler:
+    def __init__(self, rate_hz, virtual=False, history=1000, spin=0.0):
+        """
+        Pace a loop on absolute deadlines so the rate does not drift with the loop body.
+
+        :param rate_hz: Ticks per second.
+        :param virtual: If True, time is simulated and wait() never sleeps, so the
+                        loop runs as fast as its body allows while now() still
+                        advances by one period per tick.
+        :param history: Number of recent ticks kept for the jitter statistics.
+        :param spin: Seconds before each deadline spent polling the clock instead
+                     of sleeping, for sub-millisecond precision at high rates.
+        """
+        self.virtual = virtual
+        self.spin = spin
+        self.stop_event = threading.Event()
+        self.lateness = deque(maxlen=history)
+        self.set_rate(rate_hz)
+        self.start()
+
+    def set_rate(self, rate_hz):
+        """Change the tick rate; the schedule is re-anchored at the current tick."""
+        if rate_hz <= 0:
+            raise ValueError("rate_hz must be positive.")
+        if hasattr(self, 'tick'):
+            self.origin = self.deadline()
+            self.origin_tick = self.tick
+        self.rate_hz = float(rate_hz)
+        self.period = 1.0 / self.rate_hz
+
+    def start(self):
+        """Reset the schedule so the first tick is one period from now."""
+        self.stop_event.clear()
+        self.tick = 0
+        self.origin_tick = 0
+        self.skipped = 0
+        self.overruns = 0
+        self.lateness.clear()
+        self.virtual_time = 0.0
+        self.origin = 0.0 if self.virtual else time.monotonic()
+        self.started_at = self.origin
+
+    def stop(self):
+        """Wake up a pending wait() and make it return False."""
+        self.stop_event.set()
+
+    @property
+    def stopped(self):
+        return self.stop_event.is_set()
+
+    def deadline(self, tick=None):
+        """Return the absolute deadline of a tick (the current one by default)."""
+        tick = self.tick if tick is None else tick
+        return self.origin + (tick - self.origin_tick) * self.period
+
+    def now(self):
+        """Return the scheduler time in seconds since start()."""
+        if self.virtual:
+            return self.virtual_time
+        return time.monotonic() - self.started_at
+
+    def wait(self):
+        """
+        Block until the next tick's deadline.
+
+        When the loop body overran by more than one period the missed ticks are
+        skipped rather than replayed in a burst, and counted in `skipped`.
+
+        :return: False once stop() was called, True otherwise.
+        """
+        if self.stop_event.is_set():
+            return False
+        self.tick += 1
+        if self.virtual:
+            self.virtual_time += self.period
+            return True
+
+        deadline = self.deadline()
+        now = time.monotonic()
+        if now < deadline - self.spin:
+            if self.stop_event.wait(deadline - self.spin - now):
+                return False
+            now = time.monotonic()
+        while now < deadline:
+            # sleep(0) gives the GIL away so the spin does not starve other threads
+            time.sleep(0)
+            now = time.monotonic()
+        late = now - deadline
+        self.lateness.append(late)
+        if late > self.period:
+            self.overruns += 1
+            missed = math.floor(late / self.period)
+            self.tick += missed
+            self.skipped += missed
+        return True
+
+    def stats(self):
+        """Return tick count, overruns and jitter (lateness in seconds) statistics."""
+        samples = sorted(self.lateness)
+        count = len(samples)
+        return {
+            'rate_hz': self.rate_hz,
+            'ticks': self.tick,
+            'overruns': self.overruns,
+            'skipped': self.skipped,
+            'jitter_mean': sum(samples) / count if count else 0.0,
+            'jitter_p99': samples[min(count - 1, int(count * 0.99))] if count else 0.0,
+            'jitter_max': samples[-1] if count else 0.0,
+        }
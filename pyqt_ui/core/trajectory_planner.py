@@ -0,0 +1,272 @@
+# core/trajectory_planner.py
+
+import threading
+import time
+import numpy as np
+from core.tick_scheduler import TickScheduler
+
+PROFILES = ('trapezoid', 'scurve')
+
+
+def path_limits(directions, axis_limits):
+    """
+    Return the limit along each straight-line move given per-axis limits.
+
+    :param directions: (moves, axes) unit direction of each move.
+    :param axis_limits: (axes,) limit of each axis (velocity, acceleration or jerk).
+    :return: (moves,) largest path value that keeps every axis within its limit.
+    """
+    with np.errstate(divide='ignore'):
+        ratios = np.asarray(axis_limits, dtype=np.float64) / np.abs(directions)
+    return ratios.min(axis=1)
+
+
+def scurve_timing(lengths, v_max, a_max, j_max):
+    """
+    Vectorised timing of rest-to-rest jerk-limited (7-segment) profiles.
+
+    :param lengths: (moves,) path lengths.
+    :param v_max: (moves,) velocity limits.
+    :param a_max: (moves,) acceleration limits.
+    :param j_max: (moves,) jerk limits (np.inf gives trapezoidal profiles).
+    :return: Jerk time Tj, acceleration time Ta, cruise time Tv and peak acceleration, each (moves,).
+    """
+    # Peak acceleration reachable before the velocity limit
+    a_peak = np.minimum(a_max, np.sqrt(v_max * j_max))
+    tj = a_peak / j_max
+    ta = tj + v_max / a_peak
+    tv = lengths / v_max - ta
+
+    # Velocity limit not reached: shorten the acceleration phase
+    short = tv < 0
+    if np.any(short):
+        length, a, j = lengths[short], a_max[short], j_max[short]
+        tj_s = a / j
+        ta_s = (a * a / j + np.sqrt((a * a / j) ** 2 + 4 * length * a)) / (2 * a)
+        # Acceleration limit not reached either: pure jerk phases
+        tiny = ta_s < 2 * tj_s
+        tj_s[tiny] = np.cbrt(length[tiny] / (2 * j[tiny]))
+        ta_s[tiny] = 2 * tj_s[tiny]
+        a_s = a.copy()
+        a_s[tiny] = j[tiny] * tj_s[tiny]
+        tj[short], ta[short], tv[short], a_peak[short] = tj_s, ta_s, 0.0, a_s
+    tj = np.where(np.isfinite(j_max), tj, 0.0)
+    return tj, ta, tv, a_peak
+
+
+class Trajectory:
+    def __init__(self, starts, ends, durations, tj, ta, tv, a_peak):
+        """
+        A batch of planned straight-line moves, executed one after the other.
+
+        :param starts: (moves, axes) start points.
+        :param ends: (moves, axes) end points.
+        :param durations: (moves,) duration of each move.
+        :param tj: (moves,) jerk time of the profiles.
+        :param ta: (moves,) acceleration time.
+        :param tv: (moves,) cruise time.
+        :param a_peak: (moves,) peak path acceleration.
+        """
+        self.starts = starts
+        self.ends = ends
+        self.durations = durations
+        self.tj = tj
+        self.ta = ta
+        self.tv = tv
+        self.a_peak = a_peak
+        self.start_times = np.concatenate(([0.0], np.cumsum(durations)[:-1]))
+
+    @property
+    def duration(self):
+        return float(self.durations.sum())
+
+    def __len__(self):
+        return len(self.durations)
+
+    def path_position(self, t, index):
+        """
+        Return the distance travelled along the given moves at local times t, shape (moves, samples).
+
+        Closed form of the profile: jerk phases of length tj around a constant
+        acceleration a_peak during the acceleration time ta, a cruise of tv,
+        then the mirrored deceleration.
+        """
+        tj, ta, tv = self.tj[index, None], self.ta[index, None], self.tv[index, None]
+        a = self.a_peak[index, None]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            jerk = np.where(tj > 0, a / tj, 0.0)
+        v_peak = a * (ta - tj)
+        accel_length = v_peak * ta / 2
+
+        def accelerating(local):
+            # Distance after `local` seconds of the acceleration phase, 0 <= local <= ta
+            t1 = np.minimum(local, tj)
+            t2 = np.clip(local - tj, 0.0, np.maximum(ta - 2 * tj, 0.0))
+            t3 = np.clip(local - (ta - tj), 0.0, tj)
+            v1 = jerk * t1 * t1 / 2
+            v2 = v1 + a * t2
+            return (jerk * t1 ** 3 / 6
+                    + v1 * t2 + a * t2 * t2 / 2
+                    + v2 * t3 + a * t3 * t3 / 2 - jerk * t3 ** 3 / 6)
+
+        duration = 2 * ta + tv
+        t = np.clip(t, 0.0, duration)
+        cruise = accel_length + v_peak * (t - ta)
+        decelerating = 2 * accel_length + v_peak * tv - accelerating(np.clip(duration - t, 0.0, ta))
+        return np.where(t < ta, accelerating(np.minimum(t, ta)), np.where(t <= ta + tv, cruise, decelerating))
+
+    def sample_moves(self, index, dt):
+        """
+        Sample some of the moves, all at once on a shared local time grid.
+
+        Each move is stretched to a whole number of periods, so it ends exactly
+        on a sample (and never runs faster than planned).
+
+        :param index: Array of move indices.
+        :param dt: Sample period in seconds.
+        :return: (samples, axes) positions, from the first move's start up to (excluding) the last move's end.
+        """
+        steps = np.maximum(np.ceil(self.durations[index] / dt - 1e-9).astype(int), 1)
+        scale = (self.durations[index] / (steps * dt))[:, None]
+        columns = np.arange(steps.max() + 1)[None, :]
+        distance = self.path_position(columns * dt * scale, index)
+        # Normalise by the profile's own length, so rounding never moves the end off the target
+        end = self.path_position(self.durations[index, None], index)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            progress = np.clip(np.where(end > 0, distance / end, 1.0), 0.0, 1.0)
+
+        # Concatenate the moves: a move's last sample is the next move's first one
+        rows, cols = np.nonzero(columns < steps[:, None])
+        moves = index[rows]
+        return self.starts[moves] + progress[rows, cols][:, None] * (self.ends[moves] - self.starts[moves])
+
+    def blocks(self, dt, moves_per_block=256):
+        """Yield the sampled setpoints move chunk by move chunk, so long sequences stream in bounded memory."""
+        for start in range(0, len(self), moves_per_block):
+            positions = self.sample_moves(np.arange(start, min(start + moves_per_block, len(self))), dt)
+            if start + moves_per_block >= len(self):
+                positions = np.vstack((positions, self.ends[-1:]))
+            yield positions
+
+    def sample(self, dt):
+        """
+        Sample the whole sequence on a uniform time grid.
+
+        :param dt: Sample period in seconds.
+        :return: (times, positions) with shapes (samples,) and (samples, axes).
+        """
+        positions = np.vstack(list(self.blocks(dt)))
+        return np.arange(len(positions)) * dt, positions
+
+
+def plan_moves(starts, ends, v_max, a_max, j_max=None, profile='scurve'):
+    """
+    Plan many straight-line, rest-to-rest moves at once.
+
+    Every axis of a move starts and stops together; the per-axis limits are
+    projected on the move direction so no axis exceeds its own limit.
+
+    :param starts: (moves, axes) start points.
+    :param ends: (moves, axes) end points.
+    :param v_max: Per-axis velocity limits, (axes,).
+    :param a_max: Per-axis acceleration limits, (axes,).
+    :param j_max: Per-axis jerk limits, (axes,), required for 'scurve'.
+    :param profile: 'trapezoid' or 'scurve' (jerk-limited).
+    :return: A Trajectory.
+    """
+    if profile not in PROFILES:
+        raise ValueError(f"Unknown profile: {profile}. Use one of {PROFILES}.")
+    starts = np.atleast_2d(np.asarray(starts, dtype=np.float64))
+    ends = np.atleast_2d(np.asarray(ends, dtype=np.float64))
+    if starts.shape != ends.shape:
+        raise ValueError("starts and ends must have the same shape.")
+    deltas = ends - starts
+    lengths = np.linalg.norm(deltas, axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        directions = np.where(lengths[:, None] > 0, deltas / lengths[:, None], 0.0)
+
+    v = path_limits(directions, v_max)
+    a = path_limits(directions, a_max)
+    if profile == 'scurve':
+        if j_max is None:
+            raise ValueError("The 'scurve' profile needs jerk limits (j_max).")
+        j = path_limits(directions, j_max)
+    else:
+        j = np.full(len(lengths), np.inf)
+
+    # Zero-length moves get finite dummy limits and a zero duration
+    still = lengths == 0
+    v[still], a[still], j[still] = 1.0, 1.0, np.inf if profile == 'trapezoid' else 1.0
+    tj, ta, tv, a_peak = scurve_timing(lengths, v, a, j)
+    durations = np.where(still, 0.0, 2 * ta + tv)
+    return Trajectory(starts, ends, durations, tj, ta, tv, a_peak)
+
+
+def plan_path(waypoints, v_max, a_max, j_max=None, profile='scurve'):
+    """Plan rest-to-rest moves through consecutive waypoints, shape (points, axes)."""
+    waypoints = np.asarray(waypoints, dtype=np.float64)
+    return plan_moves(waypoints[:-1], waypoints[1:], v_max, a_max, j_max, profile)
+
+
+class TrajectoryStreamer:
+    def __init__(self, sink, rate_hz=100.0):
+        """
+        Play sampled setpoints at a fixed rate on a worker thread.
+
+        :param sink: Callable(positions) receiving one (axes,) setpoint per tick.
+        :param rate_hz: Setpoint rate.
+        """
+        self.sink = sink
+        self.rate_hz = rate_hz
+        self.scheduler = TickScheduler(rate_hz)
+        self.thread = None
+        self.last_position = None
+
+    @property
+    def running(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def play(self, trajectory):
+        """Stop any trajectory in progress and start streaming a new one."""
+        self.stop()
+        _, positions = trajectory.sample(1.0 / self.rate_hz)
+        self.scheduler.start()
+        self.thread = threading.Thread(target=self.run, args=(positions,), daemon=True)
+        self.thread.start()
+
+    def run(self, positions):
+        for position in positions:
+            self.sink(position)
+            self.last_position = position
+            if not self.scheduler.wait():
+                break
+
+    def stop(self):
+        """Stop streaming; last_position holds the last setpoint sent."""
+        self.scheduler.stop()
+        if self.thread is not None and self.thread is not threading.current_thread():
+            self.thread.join()
+        self.thread = None
+
+    def stats(self):
+        return self.scheduler.stats()
+
+
+def benchmark(moves=2000, axes=3, dt=0.001):
+    """Plan and sample a bed-sized placement sequence."""
+    rng = np.random.default_rng(0)
+    waypoints = rng.uniform(0, 300, (moves + 1, axes))
+    v_max, a_max, j_max = [200.0] * axes, [1000.0] * axes, [10000.0] * axes
+    start = time.perf_counter()
+    trajectory = plan_path(waypoints, v_max, a_max, j_max)
+    plan_ms = 1000 * (time.perf_counter() - start)
+    start = time.perf_counter()
+    times, positions = trajectory.sample(dt)
+    sample_ms = 1000 * (time.perf_counter() - start)
+    return {'moves': moves, 'plan_ms': plan_ms, 'sample_ms': sample_ms,
+            'duration_s': trajectory.duration, 'setpoints': len(positions)}
+
+
+if __name__ == "__main__":
+    for key, value in benchmark().items():
+        print(f"{key}: {value:.3f}" if isinstance(value, float) else f"{key}: {value}")
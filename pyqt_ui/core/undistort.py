@@ -0,0 +1,258 @@
+# core/undistort.py
+
+import argparse
+import json
+import os
+import time
+from collections import deque
+import cv2
+import numpy as np
+from core.frame_sources import IMAGE_EXTENSIONS
+
+
+def calibrate(directory, pattern=(9, 6), square_size=1.0):
+    """
+    Calibrate a camera from a folder of checkerboard images.
+
+    :param directory: Directory containing the checkerboard images.
+    :param pattern: Inner corners per checkerboard row and column.
+    :param square_size: Side of a checkerboard square (any unit; only scales the extrinsics).
+    :return: Dictionary with 'camera_matrix', 'dist_coeffs', 'image_size' [width, height],
+             'rms' reprojection error and the number of 'images' used, ready to store in config.
+    """
+    paths = sorted(os.path.join(directory, name) for name in os.listdir(directory)
+                   if name.lower().endswith(IMAGE_EXTENSIONS))
+    board = np.zeros((pattern[0] * pattern[1], 3), np.float32)
+    board[:, :2] = np.mgrid[0:pattern[0], 0:pattern[1]].T.reshape(-1, 2) * square_size
+    criteria = (cv2.TERM_CRITERIA_EPS + cv2.TERM_CRITERIA_MAX_ITER, 30, 0.001)
+
+    object_points, image_points, image_size = [], [], None
+    for path in paths:
+        image = cv2.imread(path, cv2.IMREAD_GRAYSCALE)
+        if image is None:
+            continue
+        if image_size is None:
+            image_size = image.shape[::-1]
+        elif image.shape[::-1] != image_size:
+            raise ValueError(f"{path} is {image.shape[1]}x{image.shape[0]}, expected {image_size[0]}x{image_size[1]}.")
+        found, corners = cv2.findChessboardCorners(image, pattern)
+        if not found:
+            continue
+        corners = cv2.cornerSubPix(image, corners, (11, 11), (-1, -1), criteria)
+        object_points.append(board)
+        image_points.append(corners)
+
+    if len(image_points) < 3:
+        raise ValueError(f"Found the checkerboard in {len(image_points)} images of {directory}; at least 3 are needed.")
+    rms, camera_matrix, dist_coeffs, _, _ = cv2.calibrateCamera(object_points, image_points, image_size, None, None)
+    return {
+        'camera_matrix': camera_matrix.tolist(),
+        'dist_coeffs': dist_coeffs.ravel().tolist(),
+        'image_size': list(image_size),
+        'rms': float(rms),
+        'images': len(image_points),
+    }
+
+
+def skip_space(text, index):
+    """Return the index of the first non-whitespace character from index on."""
+    while text[index] in ' \t\r\n':
+        index += 1
+    return index
+
+
+def object_members(text, start):
+    """
+    Locate the members of the JSON object whose '{' is at text[start].
+
+    :return: ({key: (key start, value start, value end)}, index of the closing '}').
+    """
+    decoder = json.JSONDecoder()
+    members = {}
+    index = skip_space(text, start + 1)
+    while text[index] != '}':
+        key_start = index
+        key, index = decoder.raw_decode(text, index)
+        value_start = skip_space(text, skip_space(text, index) + 1)  # Past the ':'
+        _, value_end = decoder.raw_decode(text, value_start)
+        members[key] = (key_start, value_start, value_end)
+        index = skip_space(text, value_end)
+        if text[index] == ',':
+            index = skip_space(text, index + 1)
+    return members, index
+
+
+def array_items(text, start):
+    """Return the (start, end) of each item of the JSON array whose '[' is at text[start]."""
+    decoder = json.JSONDecoder()
+    items = []
+    index = skip_space(text, start + 1)
+    while text[index] != ']':
+        _, end = decoder.raw_decode(text, index)
+        items.append((index, end))
+        index = skip_space(text, end)
+        if text[index] == ',':
+            index = skip_space(text, index + 1)
+    return items
+
+
+def set_member(text, start, key, value):
+    """Return the JSON text with key set to value in the object at text[start], leaving the rest untouched."""
+    members, end = object_members(text, start)
+    value_text = json.dumps(value)
+    if key in members:
+        _, value_start, value_end = members[key]
+        return text[:value_start] + value_text + text[value_end:]
+    member = f"{json.dumps(key)}: {value_text}"
+    if not members:
+        return text[:start + 1] + member + text[end:]
+    # Append after the last member, on its own line with the same indentation
+    last_key_start, _, last_end = max(members.values(), key=lambda span: span[2])
+    indent = text[text.rfind('\n', 0, last_key_start) + 1:last_key_start]
+    separator = f",\n{indent}" if not indent.strip() else ", "
+    return text[:last_end] + separator + member + text[last_end:]
+
+
+def save_calibration(calibration, config_file='config/config.json', camera=None):
+    """
+    Store a calibration where CaptureManager.from_config reads it, keeping the file's formatting.
+
+    With a 'cameras' list it goes in the entry of the calibrated stream,
+    otherwise under camera.calibration. Only that value is rewritten.
+
+    :param calibration: Dictionary returned by calibrate().
+    :param config_file: Path of the JSON config.
+    :param camera: Name of the stream in the 'cameras' list (may be omitted if it has one entry).
+    :return: Where the calibration was stored, e.g. 'cameras[1].calibration'.
+    """
+    with open(config_file, 'r') as file:
+        text = file.read()
+    config = json.loads(text)
+    root = skip_space(text, 0)
+    members, _ = object_members(text, root)
+    cameras = config.get('cameras')
+    if cameras:
+        names = [entry.get('name', f"camera{index}") for index, entry in enumerate(cameras)]
+        if camera is None and len(names) == 1:
+            camera = names[0]
+        if camera not in names:
+            raise ValueError(f"Choose the camera stream to calibrate, one of {names}.")
+        index = names.index(camera)
+        start = array_items(text, members['cameras'][1])[index][0]
+        text, location = set_member(text, start, 'calibration', calibration), f"cameras[{index}].calibration"
+    elif isinstance(config.get('camera'), dict):
+        text, location = set_member(text, members['camera'][1], 'calibration', calibration), "camera.calibration"
+    else:
+        text, location = set_member(text, root, 'camera', {'calibration': calibration}), "camera.calibration"
+    # Write to a temporary file first so a crash never leaves a truncated config
+    with open(config_file + '.tmp', 'w') as file:
+        file.write(text)
+    os.replace(config_file + '.tmp', config_file)
+    return location
+
+
+class Undistorter:
+    def __init__(self, camera_matrix, dist_coeffs, image_size=None, alpha=0.0, history=300):
+        """
+        Remove lens distortion with remap tables computed once per frame size.
+
+        :param camera_matrix: 3x3 intrinsic matrix.
+        :param dist_coeffs: Distortion coefficients (k1, k2, p1, p2[, k3...]).
+        :param image_size: [width, height] the calibration was made at; frames of another
+                           size use intrinsics scaled to it.
+        :param alpha: 0 crops to valid pixels only, 1 keeps every source pixel.
+        :param history: Number of recent per-frame costs kept for the statistics.
+        """
+        self.camera_matrix = np.asarray(camera_matrix, dtype=np.float64)
+        self.dist_coeffs = np.asarray(dist_coeffs, dtype=np.float64)
+        self.image_size = tuple(image_size) if image_size is not None else None
+        self.alpha = alpha
+        self.shape = None
+        self.maps = None
+        self.remap_times = deque(maxlen=history)
+        self.map_time = 0.0
+
+    @classmethod
+    def from_config(cls, calibration):
+        """Build an Undistorter from a stored calibration, or return None if there is none."""
+        if not calibration:
+            return None
+        return cls(calibration['camera_matrix'], calibration['dist_coeffs'], calibration.get('image_size'),
+                   calibration.get('alpha', 0.0))
+
+    def prepare(self, shape):
+        """Compute the remap tables for a frame shape (done once, again only if the shape changes)."""
+        start = time.perf_counter()
+        height, width = shape[:2]
+        matrix = self.camera_matrix.copy()
+        if self.image_size is not None and self.image_size != (width, height):
+            matrix[0] *= width / self.image_size[0]
+            matrix[1] *= height / self.image_size[1]
+        new_matrix, _ = cv2.getOptimalNewCameraMatrix(matrix, self.dist_coeffs, (width, height), self.alpha)
+        # Fixed-point maps make cv2.remap noticeably faster than float maps
+        self.maps = cv2.initUndistortRectifyMap(matrix, self.dist_coeffs, None, new_matrix,
+                                                (width, height), cv2.CV_16SC2)
+        self.shape = tuple(shape)
+        self.map_time = time.perf_counter() - start
+
+    def apply(self, src, dst=None):
+        """
+        Undistort src into dst with the cached tables.
+
+        :param src: Distorted image.
+        :param dst: Preallocated output with src's shape (allocated if None).
+        :return: The undistorted image (dst).
+        """
+        if self.shape != src.shape:
+            self.prepare(src.shape)
+        start = time.perf_counter()
+        dst = cv2.remap(src, self.maps[0], self.maps[1], cv2.INTER_LINEAR, dst=dst)
+        self.remap_times.append(time.perf_counter() - start)
+        return dst
+
+    def stats(self):
+        """Return the one-off map cost and the mean per-frame remap cost, in milliseconds."""
+        return {
+            'map_ms': 1000 * self.map_time,
+            'remap_ms': 1000 * sum(self.remap_times) / len(self.remap_times) if self.remap_times else 0.0,
+        }
+
+
+def benchmark(width=1920, height=1080, frames=200):
+    """Compare per-frame cv2.undistort (tables rebuilt every call) with the cached remap."""
+    matrix = [[width, 0, width / 2], [0, width, height / 2], [0, 0, 1]]
+    coeffs = [-0.3, 0.1, 0.0, 0.0, 0.0]
+    image = np.random.default_rng(0).integers(0, 255, (height, width, 3), dtype=np.uint8)
+
+    start = time.perf_counter()
+    for _ in range(frames):
+        cv2.undistort(image, np.asarray(matrix, dtype=np.float64), np.asarray(coeffs))
+    undistort_ms = 1000 * (time.perf_counter() - start) / frames
+
+    undistorter = Undistorter(matrix, coeffs, (width, height))
+    out = np.empty_like(image)
+    for _ in range(frames):
+        undistorter.apply(image, out)
+    return {'undistort_ms': undistort_ms, **undistorter.stats()}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Calibrate the camera from checkerboard images.")
+    parser.add_argument('directory', nargs='?', help="Folder of checkerboard images (omit to run the benchmark).")
+    parser.add_argument('--columns', type=int, default=9, help="Inner corners per checkerboard row.")
+    parser.add_argument('--rows', type=int, default=6, help="Inner corners per checkerboard column.")
+    parser.add_argument('--square-size', type=float, default=1.0, help="Side of a checkerboard square.")
+    parser.add_argument('--config', default='config/config.json', help="Config file to store the calibration in.")
+    parser.add_argument('--camera', help="Name of the stream in the config's 'cameras' list, if there are several.")
+    parser.add_argument('--dry-run', action='store_true', help="Print the calibration without saving it.")
+    args = parser.parse_args()
+
+    if args.directory is None:
+        for key, value in benchmark().items():
+            print(f"{key}: {value:.3f}")
+    else:
+        result = calibrate(args.directory, (args.columns, args.rows), args.square_size)
+        print(json.dumps(result, indent=4))
+        if not args.dry_run:
+            location = save_calibration(result, args.config, args.camera)
+            print(f"Saved to {location} in {args.config}")
@@ -0,0 +1,226 @@
+# core/video_recorder.py
+
+import os
+import queue
+import threading
+import time
+import cv2
+
+DROP_POLICIES = ('drop_newest', 'drop_oldest')
+# Codec and container tried when the configured ones cannot be opened (built into every OpenCV)
+FALLBACK_FORMAT = ('MJPG', '.avi')
+
+
+class VideoRecorder:
+    def __init__(self, directory='recordings', prefix='camera', fps=30.0, codec='MJPG',
+                 extension='.avi', segment_seconds=300, max_segments=12, queue_size=8,
+                 drop_policy='drop_newest'):
+        """
+        Record frames to segmented video files on a background encoder thread.
+
+        The capture thread only enqueues frames (a reference, no copy); encoding
+        happens on the recorder's own thread. When the encoder falls behind and
+        the queue is full, frames are dropped according to `drop_policy` and
+        counted, so capture never waits for the disk.
+
+        :param directory: Output directory.
+        :param prefix: File name prefix of the segments.
+        :param fps: Frame rate written in the files.
+        :param codec: FourCC of the encoder.
+        :param extension: File extension of the segments.
+        :param segment_seconds: Length of a segment before a new file is started.
+        :param max_segments: Number of segments kept on disk, oldest deleted first (0 keeps all).
+        :param queue_size: Frames buffered between capture and encoder.
+        :param drop_policy: 'drop_newest' discards the incoming frame, 'drop_oldest' the oldest queued one.
+        """
+        if drop_policy not in DROP_POLICIES:
+            raise ValueError(f"Unknown drop policy: {drop_policy}. Use one of {DROP_POLICIES}.")
+        self.directory = directory
+        self.prefix = prefix
+        self.fps = fps
+        self.codec = codec
+        self.extension = extension
+        self.segment_seconds = segment_seconds
+        self.max_segments = max_segments
+        self.drop_policy = drop_policy
+        self.queue = queue.Queue(maxsize=queue_size)
+        # Guards running, thread and the queue puts, so no frame is queued once stopping
+        self.lock = threading.Lock()
+        self.running = False
+        self.thread = None
+        self.writer = None
+        self.segments = []
+        # Increases with every segment, so file names never repeat even after rotation
+        self.segment_count = 0
+        # Called from the encoder thread with a message when recording stops on an error
+        self.on_error = None
+        self.error = None
+        self.reset_stats()
+
+    def reset_stats(self):
+        """Reset the counters."""
+        self.frames_submitted = 0
+        self.frames_written = 0
+        self.frames_dropped = 0
+        self.encode_time = 0.0
+        self.max_queue_depth = 0
+
+    def start(self):
+        """Start the encoder thread (or keep the one still draining a previous recording)."""
+        os.makedirs(self.directory, exist_ok=True)
+        with self.lock:
+            if self.running:
+                return
+            self.running = True
+            self.error = None
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run, daemon=True)
+                self.thread.start()
+
+    def stop(self):
+        """
+        Stop accepting frames and return at once.
+
+        The encoder writes what is still queued, closes the segment and exits;
+        use wait() to block until it has.
+        """
+        with self.lock:
+            self.running = False
+
+    def wait(self, timeout=None):
+        """Block until the encoder thread has exited (not for the GUI thread)."""
+        thread = self.thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout)
+        return self.thread is None
+
+    def submit(self, frame):
+        """
+        Queue a core.frame_pool.Frame for recording, without blocking.
+
+        The recorder takes its own reference and releases it once encoded or dropped.
+
+        :return: False if the frame was not queued (stopped, or the encoder is behind).
+        """
+        with self.lock:
+            if not self.running:
+                return False
+            self.frames_submitted += 1
+            frame.retain()
+            try:
+                self.queue.put_nowait(frame)
+            except queue.Full:
+                self.frames_dropped += 1
+                if self.drop_policy == 'drop_newest':
+                    frame.release()
+                    return False
+                try:
+                    self.queue.get_nowait().release()
+                except queue.Empty:
+                    pass
+                try:
+                    self.queue.put_nowait(frame)
+                except queue.Full:
+                    frame.release()
+                return False
+            self.max_queue_depth = max(self.max_queue_depth, self.queue.qsize())
+            return True
+
+    def create_writer(self, size):
+        """Return (path, VideoWriter) of the next segment, or (path, None) if it cannot be opened."""
+        stamp = time.strftime('%Y%m%d-%H%M%S')
+        path = os.path.join(self.directory, f"{self.prefix}-{stamp}-{self.segment_count:04d}{self.extension}")
+        writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*self.codec), self.fps, size)
+        if writer.isOpened():
+            return path, writer
+        writer.release()
+        if os.path.exists(path):
+            os.remove(path)
+        return path, None
+
+    def open_segment(self, shape):
+        """
+        Start a new segment file and delete the oldest ones beyond max_segments.
+
+        A codec or container the OpenCV build cannot write falls back to
+        FALLBACK_FORMAT for the rest of the recording.
+
+        :raises OSError: If no segment file can be opened at all.
+        """
+        self.close_segment()
+        height, width = shape[:2]
+        path, self.writer = self.create_writer((width, height))
+        if self.writer is None and (self.codec, self.extension) != FALLBACK_FORMAT:
+            print(f"Cannot record {path} with codec {self.codec}, falling back to "
+                  f"{FALLBACK_FORMAT[0]}{FALLBACK_FORMAT[1]}.")
+            self.codec, self.extension = FALLBACK_FORMAT
+            path, self.writer = self.create_writer((width, height))
+        if self.writer is None:
+            raise OSError(f"Cannot open {path} for recording with codec {self.codec}.")
+        self.segment_count += 1
+        self.segment_shape = shape
+        self.segment_started = time.monotonic()
+        self.segments.append(path)
+        while self.max_segments and len(self.segments) > self.max_segments:
+            oldest = self.segments.pop(0)
+            if os.path.exists(oldest):
+                os.remove(oldest)
+
+    def close_segment(self):
+        """Close the current segment file, if any."""
+        if self.writer is not None:
+            self.writer.release()
+            self.writer = None
+
+    def run(self):
+        """Encoder loop: write queued frames, rotating segments by duration or frame size."""
+        try:
+            while True:
+                try:
+                    frame = self.queue.get(timeout=0.1)
+                except queue.Empty:
+                    if self.running:
+                        continue
+                    self.close_segment()
+                    with self.lock:
+                        # Nothing can be queued while stopped: exit unless start() was called meanwhile
+                        if not self.running and self.queue.empty():
+                            self.thread = None
+                            return
+                    continue
+                try:
+                    if (self.writer is None or frame.shape != self.segment_shape
+                            or time.monotonic() - self.segment_started >= self.segment_seconds):
+                        self.open_segment(frame.shape)
+                    start = time.perf_counter()
+                    self.writer.write(frame.array)
+                    self.encode_time += time.perf_counter() - start
+                    self.frames_written += 1
+                finally:
+                    frame.release()
+        except BaseException as e:
+            # Encoding failed: stop recording and give the queued buffers back to their pool
+            self.close_segment()
+            with self.lock:
+                self.running = False
+                self.thread = None
+                while not self.queue.empty():
+                    self.queue.get_nowait().release()
+            if not isinstance(e, Exception):
+                raise
+            self.error = f"Recording stopped: {e}"
+            if self.on_error is not None:
+                self.on_error(self.error)
+
+    def stats(self):
+        """Return the recording counters."""
+        return {
+            'frames_submitted': self.frames_submitted,
+            'frames_written': self.frames_written,
+            'frames_dropped': self.frames_dropped,
+            'queue_depth': self.queue.qsize(),
+            'max_queue_depth': self.max_queue_depth,
+            'encode_ms': 1000 * self.encode_time / self.frames_written if self.frames_written else 0.0,
+            'segments': list(self.segments),
+            'error': self.error,
+        }
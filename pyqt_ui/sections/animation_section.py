@@ -39,6 +39,12 @@ class AnimationSection(QWidget):
         self.animation_label.setText(self.states[self.current_state])
         self.current_state = (self.current_state + 1) % len(self.states)
 
+    def showEvent(self, event):
+        """Resume the animation when the section becomes visible again."""
+        super().showEvent(event)
+        if not self.timer.isActive():
+            self.timer.start(1000)
+
     def stop_animation(self):
         """Stop the animation timer."""
         self.timer.stop()
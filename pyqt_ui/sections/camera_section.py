@@ -1,16 +1,21 @@
 # sections/camera_section.py
 
-from PyQt6.QtWidgets import QWidget, QLabel, QVBoxLayout
-from PyQt6.QtGui import QPixmap
-from PyQt6.QtCore import Qt, pyqtSlot
-from core.camera_stream import CameraStreamHandler
+import math
+import time
+from collections import deque
+from PyQt6.QtWidgets import QWidget, QLabel, QVBoxLayout, QGridLayout, QSizePolicy, QMessageBox, QComboBox
+from PyQt6.QtGui import QPixmap, QPainter, QPen, QColor
+from PyQt6.QtCore import Qt, QEvent, pyqtSlot
+from core.capture_manager import CaptureManager
+
+TILE_MODE = "All cameras"
 
 class CameraSection(QWidget):
     def __init__(self, config_manager, parent=None):
         super().__init__(parent)
         self.config = config_manager
-        self.init_ui()
         self.init_camera()
+        self.init_ui()
 
     def init_ui(self):
         """Initialize the Camera Stream Section."""
@@ -23,24 +28,128 @@ class CameraSection(QWidget):
         title.setStyleSheet("font-weight: bold; font-size: 16px;")
         layout.addWidget(title)
 
-        # Camera Label
-        self.camera_label = QLabel("Initializing Camera...")
-        self.camera_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        layout.addWidget(self.camera_label)
+        # Drop-down to tile all cameras or show a single one
+        self.view_selector = QComboBox()
+        self.view_selector.addItems([TILE_MODE] + self.capture_manager.names)
+        self.view_selector.currentTextChanged.connect(self.change_view)
+        self.view_selector.setVisible(len(self.capture_manager.names) > 1)
+        layout.addWidget(self.view_selector)
+
+        # One camera label per stream, tiled in a grid
+        self.grid_layout = QGridLayout()
+        layout.addLayout(self.grid_layout)
+        self.camera_labels = {}
+        columns = math.ceil(math.sqrt(len(self.capture_manager.names)))
+        for index, name in enumerate(self.capture_manager.names):
+            label = QLabel("Initializing Camera...")
+            label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+            # Let the layout decide the label size, so the frames follow it rather than drive it
+            label.setSizePolicy(QSizePolicy.Policy.Ignored, QSizePolicy.Policy.Ignored)
+            label.installEventFilter(self)
+            self.grid_layout.addWidget(label, index // columns, index % columns)
+            self.camera_labels[name] = label
+
+        # GUI-thread time spent per displayed frame
+        self.gui_times = deque(maxlen=300)
 
     def init_camera(self):
-        """Initialize the camera stream handler."""
-        self.camera_handler = CameraStreamHandler()
-        self.camera_handler.frame_updated.connect(self.update_camera_stream)
-        self.camera_handler.start()
-
-    # @pyqtSlot(QImage)
-    def update_camera_stream(self, qt_image):
-        """Update the camera stream with new frames."""
-        pixmap = QPixmap.fromImage(qt_image)
-        self.camera_label.setPixmap(pixmap.scaled(
-            self.camera_label.size(), Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation))
+        """Initialize the camera streams."""
+        self.capture_manager = CaptureManager.from_config(self.config, self)
+        for name in self.capture_manager.names:
+            handler = self.capture_manager.handler(name)
+            handler.mailbox.frame_available.connect(lambda name=name: self.update_camera_stream(name))
+            handler.error_occurred.connect(lambda message, name=name: self.show_camera_error(name, message))
+        # The streams are started and released with the section's visibility (showEvent / hideEvent)
+
+    def show_camera_error(self, name, message):
+        """Report a frame source that could not be opened."""
+        self.camera_labels[name].setText(message)
+        QMessageBox.warning(self, "Camera Error", message)
+
+    def showEvent(self, event):
+        """Start capturing when the section becomes visible."""
+        super().showEvent(event)
+        # Spontaneous events come from the window being minimized or restored, not from a view switch
+        if not event.spontaneous():
+            self.start_camera()
+
+    def hideEvent(self, event):
+        """Release the cameras when the section is hidden (view switch or window closed)."""
+        super().hideEvent(event)
+        if not event.spontaneous():
+            self.stop_camera()
+
+    def eventFilter(self, watched, event):
+        """Publish a label's new size so its capture worker scales frames to it."""
+        if event.type() == QEvent.Type.Resize:
+            for name, label in self.camera_labels.items():
+                if label is watched:
+                    self.capture_manager.handler(name).set_target_size(label.width(), label.height())
+        return super().eventFilter(watched, event)
+
+    @pyqtSlot(str)
+    def change_view(self, text):
+        """Tile every camera, or show only the selected one."""
+        for name, label in self.camera_labels.items():
+            shown = text == TILE_MODE or text == name
+            label.setVisible(shown)
+            # Hidden streams keep capturing but skip the display path
+            self.capture_manager.handler(name).display_enabled = shown
+
+    def update_camera_stream(self, name):
+        """Show the newest frame waiting in a camera's mailbox."""
+        mailbox = self.capture_manager.handler(name).mailbox
+        frame = mailbox.take()
+        if frame is None:
+            return
+        start = time.perf_counter()
+        try:
+            # The frame is already label-sized: fromImage copies it, then the buffer is recycled
+            pixmap = QPixmap.fromImage(frame.to_qimage())
+            mailbox.mark_displayed(frame)
+            detections = frame.meta.get('detections')
+            scale = frame.meta.get('scale', 1.0)
+        finally:
+            frame.release()
+        if detections:
+            self.draw_detections(pixmap, detections, scale)
+        self.camera_labels[name].setPixmap(pixmap)
+        self.gui_times.append(time.perf_counter() - start)
+
+    def draw_detections(self, pixmap, detections, scale):
+        """Mark the magnets and gripper found by the capture worker (see core.magnet_detector)."""
+        painter = QPainter(pixmap)
+        painter.setPen(QPen(QColor('yellow'), 2))
+        for detection in detections:
+            x, y = detection['pixel'][0] * scale, detection['pixel'][1] * scale
+            w, h = detection['size'][0] * scale, detection['size'][1] * scale
+            painter.drawEllipse(int(x - w / 2), int(y - h / 2), max(int(w), 4), max(int(h), 4))
+            label = detection['name']
+            if detection['bed'] is not None:
+                label += f" ({detection['bed'][0]:.1f}, {detection['bed'][1]:.1f})"
+            painter.drawText(int(x + w / 2) + 4, int(y), label)
+        painter.end()
+
+    def gui_stats(self):
+        """Return the mean and max GUI-thread time per frame, in milliseconds."""
+        if not self.gui_times:
+            return {'gui_ms_mean': 0.0, 'gui_ms_max': 0.0}
+        return {'gui_ms_mean': 1000 * sum(self.gui_times) / len(self.gui_times),
+                'gui_ms_max': 1000 * max(self.gui_times)}
+
+    def metrics(self):
+        """Return the capture metrics of every stream plus the GUI cost."""
+        return {**self.capture_manager.metrics(), **self.gui_stats()}
+
+    def start_camera(self):
+        """Start (or restart) the camera streams."""
+        for name, label in self.camera_labels.items():
+            handler = self.capture_manager.handler(name)
+            if not handler.running:
+                label.setText("Initializing Camera...")
+                handler.set_target_size(label.width(), label.height())
+                handler.start()
 
     def stop_camera(self):
-        """Stop the camera stream."""
-        self.camera_handler.stop()
+        """Stop the camera streams."""
+        self.capture_manager.stop()
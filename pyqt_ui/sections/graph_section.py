@@ -8,6 +8,10 @@ import matplotlib.pyplot as plt
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas, NavigationToolbar2QT as NavigationToolbar
 import pandas as pd
 import yaml
+import numpy as np
+from core.lod_pyramid import LodPyramid
+from core.decimation import MODES, lttb
+from core.render_scheduler import RenderScheduler
 
 class GraphSection(QWidget):
     def __init__(self, config_manager, parent=None):
@@ -65,12 +69,28 @@ class GraphSection(QWidget):
         #set legend 
         
 
-        # Data storage
-        self.distances = []
-        self.force_x = []
-        self.force_y = []
-        self.force_z = []
-        self.max_points = 100
+        # Data storage: one pyramid channel per plotted channel, with min/max/mean
+        # aggregates at 2^k decimation so zooming out only reads a coarse level
+        self.channels = ['Distance', 'Force_x', 'Force_y'] + (['Force_z'] if self.num_axes == 3 else [])
+        self.history = LodPyramid(
+            len(self.channels),
+            levels=self.config.get('graph', 'lod_levels', default=24),
+            retention=self.config.get('graph', 'retention', default=262144),
+            min_retention=self.config.get('graph', 'min_retention', default=4096)
+        )
+        self.decimation = self.config.get('graph', 'decimation', default='minmax')
+        if self.decimation not in MODES:
+            raise ValueError(f"Unknown graph decimation: {self.decimation}. Use one of {MODES}.")
+        self.distance_monotonic = True
+        self.last_distance = None
+        self.curves = [self.force_x_plot, self.force_y_plot] + ([self.force_z_plot] if self.num_axes == 3 else [])
+
+        # Redraw at most once per display frame, however fast samples arrive
+        self.render_scheduler = RenderScheduler(self.config.get('graph', 'fps', default=30), self)
+        self.render_scheduler.render.connect(self.redraw)
+
+        # Recompute the displayed subset when the user zooms or pans
+        self.plot_widget.getViewBox().sigXRangeChanged.connect(self.on_x_range_changed)
 
         """Initialize the Graph Data Section."""
         # layout = QVBoxLayout()
@@ -136,47 +156,67 @@ class GraphSection(QWidget):
 
     def clear_graph_data(self):
         """Clear the graph data."""
-        self.distances = []
-        self.force_x = []
-        self.force_y = []
-        self.force_z = []
+        self.history.clear()
+        self.distance_monotonic = True
+        self.last_distance = None
+        self.render_scheduler.stop()
+        self.render_scheduler.reset_stats()
 
         # Clear the plot
-        self.force_x_plot.setData([], [])
-        self.force_y_plot.setData([], [])
-        if self.num_axes == 3:
-            self.force_z_plot.setData([], [])
-
-        # Set graph labels
-        self.plot_widget.setLabel('left', 'Force (newton)')
-        self.plot_widget.setLabel('bottom', 'Distance (mm)', units='mm')
+        for curve in self.curves:
+            curve.setData([], [])
+
+    def track_monotonic(self, distances):
+        """Keep track of whether the stored distances are still non-decreasing."""
+        if not len(distances):
+            return
+        if self.distance_monotonic:
+            last = distances[0] if self.last_distance is None else self.last_distance
+            self.distance_monotonic = distances[0] >= last and bool(np.all(np.diff(distances) >= 0))
+        self.last_distance = distances[-1]
 
     def update_graph_data(self, data):
         """Update the graph with new data."""
-        # Append new data points
-        self.distances.append(data['Distance'])
-        self.force_x.append(data['Force_x'])
-        self.force_y.append(data['Force_y'])
-        if self.num_axes == 3:
-            self.force_z.append(data['Force_z'])
-
-        # Keep only the last `max_points` points
-        if len(self.distances) > self.max_points:
-            self.distances = self.distances[-self.max_points:]
-            self.force_x = self.force_x[-self.max_points:]
-            self.force_y = self.force_y[-self.max_points:]
-            if self.num_axes == 3:
-                self.force_z = self.force_z[-self.max_points:]
-
-        # Update the plot with the new data
-        self.force_x_plot.setData(self.distances, self.force_x)
-        self.force_y_plot.setData(self.distances, self.force_y)
-        if self.num_axes == 3:
-            self.force_z_plot.setData(self.distances, self.force_z)
-
-        # Set graph labels
-        self.plot_widget.setLabel('left', 'Force (newton)')
-        self.plot_widget.setLabel('bottom', 'Distance (mm)', units='mm')
+        self.track_monotonic([data['Distance']])
+        self.history.append([data[name] for name in self.channels])
+        self.render_scheduler.mark_dirty()
+
+    def update_graph_block(self, block):
+        """Update the graph with a block of samples (dict of arrays)."""
+        self.track_monotonic(block['Distance'])
+        self.history.extend([block[name] for name in self.channels])
+        self.render_scheduler.mark_dirty(len(block['Distance']))
+
+    def on_x_range_changed(self, view_box, x_range):
+        """Redraw for a new visible range when the user zoomed or panned."""
+        if not view_box.autoRangeEnabled()[0]:
+            self.render_scheduler.mark_dirty(0)
+
+    def redraw(self):
+        """Push the visible, decimated data to the plot curves."""
+        view_box = self.plot_widget.getViewBox()
+        width = max(int(view_box.width()), 100)
+        # Read the coarsest level that still fills the viewport
+        max_entries = max({'none': len(self.history), 'lttb': 4 * width}.get(self.decimation, width), 1)
+        if not view_box.autoRangeEnabled()[0] and len(self.history):
+            x_min, x_max = view_box.viewRange()[0]
+            if self.distance_monotonic:
+                start, stop = self.history.index_range(0, x_min, x_max)
+                segments = [self.history.query(start, stop, max_entries)]
+            else:
+                # Distances are not sorted: refine only the entries inside the visible range
+                segments = self.history.select(0, x_min, x_max, max_entries)
+        else:
+            segments = [self.history.query(0, len(self.history), max_entries)]
+
+        stat = 'mean' if self.decimation == 'lttb' else 'minmax'
+        for k, curve in enumerate(self.curves, start=1):
+            parts = [self.history.curve(data, level, 0, k, stat) for level, data in segments]
+            x = np.concatenate([part[0] for part in parts]) if parts else np.empty(0)
+            y = np.concatenate([part[1] for part in parts]) if parts else np.empty(0)
+            if self.decimation == 'lttb':
+                x, y = lttb(x, y, 2 * width)
+            curve.setData(x, y)
         """Update the graph with new data."""
 
         # if(self.num_axes == 2):
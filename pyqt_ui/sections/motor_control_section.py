@@ -7,21 +7,137 @@ from PyQt6.QtCore import Qt, pyqtSlot, pyqtSignal
 from PyQt6.QtGui import QFont
 import yaml
 import re
+import numpy as np
 from core.motor_controller import MotorController
+from core.trajectory_planner import plan_moves, TrajectoryStreamer
+from core.command_coalescer import CommandCoalescer
+from core.motor_transport import create_transport
+from core.force_control import ForceController, SimulatedGap
 
 
 class MotorControlSection(QWidget):
 
     next_video = pyqtSignal()
     previous_video = pyqtSignal()
+    # Emitted from the force loop thread with a message when the loop stops on an error
+    force_control_failed = pyqtSignal(str)
     
 
-    def __init__(self, config_manager, parent=None):
+    def __init__(self, config_manager, motor_controller=None, parent=None):
+        """
+        :param config_manager: Application configuration.
+        :param motor_controller: The application's MotorController, shared by every view so the
+                                 drives are driven through one transport (default: a controller
+                                 and transport of its own, for a standalone section).
+        :param parent: Parent widget (default None)
+        """
         super().__init__(parent)
         self.config = config_manager
         self.motor_torque_mapping = self.load_motor_mapping("config/param_motors_control.yaml")
         self.num_axes = self.load_axes("config/param_set_axes.yaml")
+        self.init_motor_controller(motor_controller)
+        self.init_trajectory()
+        self.init_force_control()
         self.init_ui()
+
+    def init_motor_controller(self, motor_controller):
+        """Use the motor controller and put a rate limiter between the sliders and it."""
+        if motor_controller is None:
+            # Commands go to the drive from the transport's own thread, never blocking the GUI
+            transport = create_transport(self.config.get('motor_transport', default=None), self)
+            motor_controller = MotorController.from_config(self.config, transport, self)
+        self.motor_controller = motor_controller
+        self.motor_transport = motor_controller.transport
+        self.motor_controller.motors_updated.connect(self.update_motor_display)
+        # A drag fires valueChanged hundreds of times: only the latest torque per slider is sent
+        self.command_coalescer = CommandCoalescer(
+            self.motor_controller.set_torque,
+            self.config.get('motor_commands', 'max_rate_hz', default=20),
+            self
+        )
+
+    def init_trajectory(self):
+        """Set up jerk-limited jog moves streamed to the axis motors."""
+        settings = self.config.get('trajectory', default=None) or {}
+        axes = slice(0, self.num_axes)
+        self.axis_indices = self.motor_controller.reserve('trajectory axes', settings.get('axis_motors', [5, 6, 7])[axes])
+        self.axis_limits = {
+            'v_max': settings.get('v_max', [50.0, 50.0, 20.0])[axes],
+            'a_max': settings.get('a_max', [200.0, 200.0, 100.0])[axes],
+            'j_max': settings.get('j_max', [2000.0, 2000.0, 1000.0])[axes],
+        }
+        self.trajectory_profile = settings.get('profile', 'scurve')
+        self.jog_step = settings.get('jog_step', 10.0)
+        self.arm_position = np.zeros(self.num_axes)
+        self.trajectory_streamer = TrajectoryStreamer(
+            lambda position: self.motor_controller.set_positions(self.axis_indices, position),
+            settings.get('rate_hz', 100)
+        )
+
+    def init_force_control(self):
+        """Set up the fixed-rate force loop when enabled in the config; it runs while the section is shown."""
+        self.force_controller = None
+        settings = self.config.get('force_control', default=None) or {}
+        if not settings.get('enabled', False):
+            return
+        self.force_indices = self.motor_controller.reserve('force control', settings.get('motors', [4]))
+        self.force_controller = ForceController.from_config(settings, self.read_force_distance, self.write_force_torque)
+        self.force_controller.on_error = self.force_control_failed.emit
+        self.force_control_failed.connect(self.show_force_control_error)
+        # No distance sensor is wired in yet: the gap is simulated from the torque
+        self.force_gap = SimulatedGap(self.force_controller.lookup)
+
+    def showEvent(self, event):
+        """Run the force loop only in the view on screen, so one loop drives the motors at a time."""
+        super().showEvent(event)
+        # Spontaneous events come from the window being minimized or restored, not from a view switch
+        if self.force_controller is not None and not event.spontaneous():
+            self.force_controller.start()
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        if self.force_controller is not None and not event.spontaneous():
+            self.force_controller.stop()
+
+    @pyqtSlot(str)
+    def show_force_control_error(self, message):
+        """Report a force loop that stopped on an error (its torque was set to zero)."""
+        QMessageBox.warning(self, "Force Control Error", message)
+
+    def read_force_distance(self):
+        """Return the measured magnet-plate distance for the force loop."""
+        return self.force_gap.read()
+
+    def write_force_torque(self, torque):
+        """
+        Send a force loop torque (loop thread: no signal, the GUI is not repainted at the loop rate).
+
+        The loop runs faster than the drive acknowledges commands: only the newest torque waits
+        to be sent, so the queue never fills up with stale setpoints.
+        """
+        self.motor_controller.set_torques(self.force_indices, torque, notify=False, latest=True)
+        self.force_gap.write(torque)
+
+    def force_control_stats(self):
+        """Return the force loop jitter, overrun and state statistics, or None when it is disabled."""
+        return self.force_controller.stats() if self.force_controller is not None else None
+
+    def stop_motion(self):
+        """Stop the trajectory streamer and the force loop threads."""
+        self.trajectory_streamer.stop()
+        if self.force_controller is not None:
+            self.force_controller.stop()
+
+    def jog(self, *direction):
+        """Move the arm one jog step along the given axis direction."""
+        # Continue from wherever the previous jog got to if it is still running
+        self.trajectory_streamer.stop()
+        start = self.trajectory_streamer.last_position
+        start = self.arm_position if start is None else start
+        target = start + self.jog_step * np.asarray(direction[:self.num_axes], dtype=np.float64)
+        trajectory = plan_moves(start, target, profile=self.trajectory_profile, **self.axis_limits)
+        self.trajectory_streamer.play(trajectory)
+        self.arm_position = target
     
     def load_axes(self, filename):
         """Load the number of axes to plot from .yaml file"""
@@ -93,6 +209,7 @@ class MotorControlSection(QWidget):
         self.up_button.setFont(button_font)
         self.up_button.setStyleSheet(self.get_arrow_button_style())
         arm_layout.addWidget(self.up_button, alignment=Qt.AlignmentFlag.AlignCenter)
+        self.up_button.clicked.connect(lambda: self.jog(0, 1, 0))
 
         # Left, Right, and Down buttons in an HBox
         left_right_layout = QHBoxLayout()
@@ -120,6 +237,7 @@ class MotorControlSection(QWidget):
         self.down_button.setFont(button_font)
         self.down_button.setStyleSheet(self.get_arrow_button_style())
         arm_layout.addWidget(self.down_button, alignment=Qt.AlignmentFlag.AlignCenter)
+        self.down_button.clicked.connect(lambda: self.jog(0, -1, 0))
 
         # Check if there are 3 axes, and add Z+ and Z- buttons if so
         if self.num_axes == 3:
@@ -130,12 +248,14 @@ class MotorControlSection(QWidget):
             self.z_plus_button.setFont(button_font)
             self.z_plus_button.setStyleSheet(self.get_arrow_button_style())
             z_button_layout.addWidget(self.z_plus_button, alignment=Qt.AlignmentFlag.AlignCenter)
+            self.z_plus_button.clicked.connect(lambda: self.jog(0, 0, 1))
 
             # Z- Button (Z-)
             self.z_minus_button = QPushButton("Z-")
             self.z_minus_button.setFont(button_font)
             self.z_minus_button.setStyleSheet(self.get_arrow_button_style())
             z_button_layout.addWidget(self.z_minus_button, alignment=Qt.AlignmentFlag.AlignCenter)
+            self.z_minus_button.clicked.connect(lambda: self.jog(0, 0, -1))
 
             arm_layout.addLayout(z_button_layout)
 
@@ -194,6 +314,16 @@ class MotorControlSection(QWidget):
         elif slider_number == 2:
             torque_value = self.slider2.value()
             self.slider2_value_label.setText(f"Torque value: {torque_value} {self.slider2_unit}")
+        else:
+            return
+        self.command_coalescer.submit(slider_number, float(torque_value))
+
+    def command_stats(self):
+        """Return the motor commands requested by the sliders versus those sent, and the transport statistics."""
+        stats = self.command_coalescer.stats()
+        if self.motor_transport is not None:
+            stats.update({f"transport_{key}": value for key, value in self.motor_transport.stats().items()})
+        return stats
 
     def get_arrow_button_style(self):
         """Get the consistent style for the arrow buttons."""
@@ -218,8 +348,8 @@ class MotorControlSection(QWidget):
     def on_left_button_clicked(self):
         """Handle the left button click event."""
         try:
-            # In a real application, move the robotic arm left here
             print("Moving the robotic arm left")
+            self.jog(-1, 0, 0)
             self.next_video.emit()
 
         except Exception as e:
@@ -230,18 +360,19 @@ class MotorControlSection(QWidget):
     def on_right_button_clicked(self):
         """Handle the right button click event."""
         try:
-            # In a real application, move the robotic arm right here
             print("Moving the robotic arm right")
+            self.jog(1, 0, 0)
             self.previous_video.emit()
         except Exception as e:
             QMessageBox.critical(self, "Right Button Error", f"Failed to move the robotic arm right: {e}")
 
 
-    @pyqtSlot(int, float)
-    def update_motor_display(self, motor_index, torque):
+    @pyqtSlot(object, object)
+    def update_motor_display(self, motor_indices, torques):
         """Update the motor display based on torque changes."""
         try:
             # In a real application, update the motor status display here
-            print(f"Motor {motor_index + 1} torque set to {torque}")
+            motors = ", ".join(f"{index + 1}: {torque:g}" for index, torque in zip(motor_indices, torques))
+            print(f"Motor torques set to {motors}")
         except Exception as e:
             QMessageBox.critical(self, "Motor Display Error", f"Failed to update motor display: {e}")
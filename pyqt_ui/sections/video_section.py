@@ -1,19 +1,31 @@
 # sections/animation_section.py
 
 from PyQt6.QtWidgets import QWidget, QLabel, QVBoxLayout
-from PyQt6.QtCore import Qt, QSize, pyqtSignal, pyqtSlot
-from PyQt6.QtGui import QMovie
+from PyQt6.QtCore import Qt, QSize, QTimer, pyqtSignal, pyqtSlot
+from PyQt6.QtGui import QPixmap
+from core.gif_cache import GifCache
 
 class AnimationSection(QWidget):
     next_video_signal = pyqtSignal()
     video_number = 0
 
 
-    def __init__(self, parent=None):
+    def __init__(self, config_manager=None, parent=None):
         super().__init__(parent)
+        self.video_list = ["assets/m2.gif", "assets/m3.gif", "assets/m4.gif", "assets/m5.gif", "assets/m6.gif"]
+        settings = (config_manager.get('gif_cache', default=None) if config_manager else None) or {}
+        # Decode every clip once in the background, so switching clips never touches the disk
+        self.cache = GifCache(
+            settings.get('memory_mb', 256),
+            settings.get('scaled_sizes', 3),
+            settings.get('scaled_memory_mb', 256),
+            self
+        )
+        self.cache.clip_ready.connect(self.on_clip_ready)
+        self.cache.scaled_ready.connect(self.on_scaled_ready)
+        self.cache.preload(self.video_list)
         self.init_ui()
         self.init_animation()
-        self.video_list = ["assets/m2.gif", "assets/m3.gif", "assets/m4.gif", "assets/m5.gif", "assets/m6.gif"]
 
     def init_ui(self):
         """Initialize the Animation Data Section."""
@@ -26,19 +38,95 @@ class AnimationSection(QWidget):
         layout.addWidget(self.animation_label)
 
     def init_animation(self):
-        """Initialize animation using a GIF."""
-        # Load GIF
-        self.gif = QMovie("assets/m2.gif")  # Replace with the actual path to your GIF
-        self.animation_label.setMovie(self.gif)
-        self.gif.start()
+        """Initialize the animation playback from the decoded-frame cache."""
+        self.clip = None
+        self.current_path = None
+        self.frame_index = 0
+        self.scaled_size = None
+        # Pixmaps of the clip being played at the current size, converted once on first display
+        self.frames = None
+        self.pixmaps = []
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)  # Re-armed with each frame's own delay
+        self.timer.timeout.connect(self.advance_frame)
+        self.update_gif(self.video_list[self.video_number])
 
     @pyqtSlot()
     def update_gif(self, gif_path):
-        """Update the GIF with the given path."""
-        self.gif = QMovie(gif_path)
-        self.animation_label.setMovie(self.gif)
-        self.update_gif_size(self.animation_label.size())
-        self.gif.start()
+        """Play the GIF with the given path from the cache."""
+        self.current_path = gif_path
+        clip = None
+        if self.scaled_size is not None:
+            # A copy at the current size plays just as well, without the decoded clip
+            clip = self.cache.get_scaled(gif_path, self.scaled_size.width(), self.scaled_size.height())
+        if clip is None:
+            clip = self.cache.get(gif_path)
+        if clip is None:
+            # Still decoding: on_clip_ready or on_scaled_ready starts it
+            self.timer.stop()
+            self.animation_label.setText("Loading...")
+            return
+        self.play(clip)
+
+    @pyqtSlot(str)
+    def on_clip_ready(self, gif_path):
+        """Start a clip that was requested before it finished decoding."""
+        if gif_path == self.current_path and (self.clip is None or self.clip.path != gif_path):
+            self.update_gif(gif_path)
+
+    @pyqtSlot(str, int, int)
+    def on_scaled_ready(self, gif_path, width, height):
+        """Switch to the frames pre-scaled for the current size once the worker has made them."""
+        if self.scaled_size != QSize(width, height):
+            return
+        if self.clip is not None and gif_path == self.clip.path:
+            self.select_frames()
+        elif gif_path == self.current_path:
+            # Requested while loading: the copy is ready before (or instead of) the decoded clip
+            self.update_gif(gif_path)
+
+    def play(self, clip):
+        """Play a decoded clip from its first frame."""
+        self.clip = clip
+        self.frame_index = 0
+        self.frames = None
+        self.select_frames()
+        self.show_frame()
+
+    def select_frames(self):
+        """
+        Use the frames of the current clip pre-scaled to the current size.
+
+        Until the worker has scaled them, the frames of the previous size keep
+        playing (or, for a clip never shown yet, the native-size frames).
+        """
+        if self.scaled_size is None:
+            frames = self.clip
+        else:
+            frames = self.cache.get_scaled(self.clip.path, self.scaled_size.width(), self.scaled_size.height())
+            if frames is None:
+                if self.frames is not None and self.frames.path == self.clip.path:
+                    return
+                frames = self.clip
+        if frames is not self.frames:
+            self.frames = frames
+            self.pixmaps = [None] * len(frames)
+
+    def show_frame(self):
+        """Show the current frame and schedule the next one."""
+        pixmap = self.pixmaps[self.frame_index]
+        if pixmap is None:
+            pixmap = self.pixmaps[self.frame_index] = QPixmap.fromImage(self.frames.frames[self.frame_index])
+        # Frames are already at the label size, so playback is a plain blit
+        self.animation_label.setPixmap(pixmap)
+        self.timer.start(self.clip.delays[self.frame_index])
+
+    def advance_frame(self):
+        """Move to the next frame, looping at the end of the clip."""
+        if self.clip is None:
+            return
+        self.frame_index = (self.frame_index + 1) % len(self.clip)
+        self.show_frame()
 
     @pyqtSlot()
     def next_video(self):
@@ -53,11 +141,33 @@ class AnimationSection(QWidget):
         self.update_gif(self.video_list[self.video_number])
 
     def update_gif_size(self, new_size):
-        """Adjust the GIF size based on the given size."""
-        if self.gif is not None:
-            self.gif.setScaledSize(QSize(new_size.width(), new_size.height()))
+        """Adjust the GIF size based on the given size; the frames are re-scaled once, in the background."""
+        size = QSize(new_size.width(), new_size.height())
+        if size == self.scaled_size or size.isEmpty():
+            return
+        self.scaled_size = size
+        if self.clip is not None:
+            self.select_frames()
+        # Scale the other clips too, so switching clips stays instant at this size
+        for path in self.video_list:
+            self.cache.get_scaled(path, size.width(), size.height())
+
+    def cache_stats(self):
+        """Return the hit/miss statistics of the decoded-frame cache."""
+        return self.cache.stats()
+
+    def showEvent(self, event):
+        """Resume playback when the section becomes visible again."""
+        super().showEvent(event)
+        if self.clip is not None and not self.timer.isActive():
+            self.show_frame()
+
+    def hideEvent(self, event):
+        """Pause playback while the section is hidden."""
+        super().hideEvent(event)
+        self.timer.stop()
 
     def stop_animation(self):
-        """Stop the GIF animation."""
-        if self.gif is not None:
-            self.gif.stop()
\ No newline at end of file
+        """Stop the GIF animation and the decoding thread (restarted by the next request)."""
+        self.timer.stop()
+        self.cache.stop()
@@ -0,0 +1,72 @@
+# tests/test_camera_stream.py
+
+import threading
+from core.camera_stream import CameraStreamHandler
+from core.frame_sources import SyntheticSource
+
+
+class FailingDetector:
+    def detect(self, image, timestamp):
+        raise RuntimeError("detector failed")
+
+
+def test_capture_failure_is_reported_and_frees_the_frame():
+    handler = CameraStreamHandler(fps=1000, source=SyntheticSource(64, 48, 1000), detector=FailingDetector())
+    errors = []
+    handler.error_occurred.connect(errors.append)
+    handler.running = True
+    handler.scheduler.start()
+    # Run the worker body on this thread, so the signal is delivered directly
+    handler.run()
+    assert not handler.running
+    assert len(errors) == 1 and "detector failed" in errors[0]
+    assert handler.pool.in_flight() == 0
+
+
+def test_restart_is_not_lost_when_the_worker_is_reaped_before_it_exits():
+    handler = CameraStreamHandler(fps=1000, source=SyntheticSource(64, 48, 1000))
+    exiting = threading.Event()
+    # A worker that already sent worker_finished but has not returned from run() yet
+    worker = threading.Thread(target=exiting.wait, daemon=True)
+    worker.start()
+    handler.thread = worker
+    handler.start()
+    assert handler.restart_pending and not handler.running
+    handler.reap_worker(worker)
+    assert handler.running and handler.thread is not worker
+    handler.stop()
+    exiting.set()
+    assert handler.wait(2.0)
+
+
+class FailingRecorder:
+    def submit(self, frame):
+        raise RuntimeError("recorder failed")
+
+
+def test_recorder_failure_frees_the_display_frame():
+    handler = CameraStreamHandler(fps=1000, source=SyntheticSource(64, 48, 1000))
+    handler.set_target_size(32, 24)
+    handler.recorder = FailingRecorder()
+    errors = []
+    handler.error_occurred.connect(errors.append)
+    handler.running = True
+    handler.scheduler.start()
+    handler.run()
+    assert len(errors) == 1 and "recorder failed" in errors[0]
+    assert handler.pool.in_flight() == 0
+    assert handler.display_pool.in_flight() == 0
+
+
+def test_first_frame_is_dropped_when_every_buffer_is_still_held():
+    handler = CameraStreamHandler(fps=1000, pool_size=2, source=SyntheticSource(64, 48, 1000))
+    handler.source.open()
+    held = [handler.read_frame() for _ in range(2)]
+    # A restart forgets the resolution while the previous frames are still displayed
+    handler.frame_shape = None
+    assert handler.read_frame() is None
+    assert handler.frames_dropped == 1
+    for frame in held:
+        frame.release()
+    assert handler.read_frame() is not None
+    handler.source.release()
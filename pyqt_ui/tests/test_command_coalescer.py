@@ -0,0 +1,48 @@
+# tests/test_command_coalescer.py
+
+import time
+import pytest
+from PyQt6.QtCore import QCoreApplication
+from core.command_coalescer import CommandCoalescer
+
+
+@pytest.fixture(scope='module')
+def app():
+    return QCoreApplication.instance() or QCoreApplication([])
+
+
+def process_events(app, seconds):
+    end = time.monotonic() + seconds
+    while time.monotonic() < end:
+        app.processEvents()
+        time.sleep(0.002)
+
+
+def test_first_update_is_sent_at_once(app):
+    sent = []
+    coalescer = CommandCoalescer(lambda key, value: sent.append((key, value)), max_rate_hz=20)
+    coalescer.submit(1, 0.5)
+    assert sent == [(1, 0.5)]
+
+
+def test_burst_sends_only_the_latest_value_per_key(app):
+    sent = []
+    coalescer = CommandCoalescer(lambda key, value: sent.append((key, value)), max_rate_hz=20)
+    coalescer.submit(1, 0.0)
+    for value in range(1, 100):
+        coalescer.submit(1, value)
+        coalescer.submit(2, -value)
+    assert sent == [(1, 0.0)]
+    process_events(app, 0.15)
+    assert sent == [(1, 0.0), (1, 99), (2, -99)]
+    assert coalescer.stats() == {'requested': 199, 'sent': 3, 'coalesced': 196}
+
+
+def test_unchanged_values_are_not_sent_again(app):
+    sent = []
+    coalescer = CommandCoalescer(lambda key, value: sent.append((key, value)), max_rate_hz=1000)
+    coalescer.submit(1, 0.5)
+    coalescer.flush()
+    coalescer.submit(1, 0.5)
+    coalescer.flush()
+    assert sent == [(1, 0.5)]
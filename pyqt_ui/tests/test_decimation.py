@@ -0,0 +1,30 @@
+# tests/test_decimation.py
+
+import numpy as np
+from core.decimation import lttb
+
+
+def test_lttb_keeps_the_ends_and_the_peaks_in_order():
+    x = np.arange(10000, dtype=np.float64)
+    y = np.sin(x / 500)
+    y[4321] = 25.0
+    y[7000] = -25.0
+    xs, ys = lttb(x, y, 200)
+    assert len(xs) == 200
+    assert xs[0] == 0 and xs[-1] == 9999
+    assert np.all(np.diff(xs) > 0)
+    assert 4321 in xs and 7000 in xs
+
+
+def test_lttb_picks_one_point_per_bucket_with_nan_samples():
+    x = np.arange(1000, dtype=np.float64)
+    y = np.cos(x / 50)
+    y[100:110] = np.nan
+    xs, _ = lttb(x, y, 50)
+    assert len(xs) == 50 and np.all(np.diff(xs) > 0)
+
+
+def test_lttb_returns_short_inputs_unchanged():
+    x = np.arange(10.0)
+    xs, ys = lttb(x, x, 20)
+    assert xs is x and ys is x
@@ -0,0 +1,79 @@
+# tests/test_force_control.py
+
+import sys
+import threading
+import numpy as np
+import pytest
+from core.force_control import ForceController, ForceLookup
+from core.force_model import ForceModel
+
+
+def model(curve):
+    distances = np.linspace(0.0, 10.0, len(curve))
+    forces = np.column_stack((np.zeros(len(curve)), np.zeros(len(curve)), curve))
+    return ForceModel(distances, forces)
+
+
+def test_inverse_undoes_the_forward_table():
+    # Force grows towards the plate at distance 0
+    lookup = ForceLookup(model(100.0 / (1.0 + np.linspace(0.0, 10.0, 50))), 'Force_z')
+    assert lookup.toward_plate == -1.0
+    for distance in np.linspace(0.5, 9.5, 19):
+        assert lookup.distance(lookup.force(distance)) == pytest.approx(distance, abs=0.01)
+
+
+def test_inverse_is_single_valued_on_a_noisy_curve():
+    # A dip in the measurements: each force maps to the farthest distance it is first reached at
+    curve = np.array([50.0, 40.0, 30.0, 32.0, 20.0, 10.0])
+    lookup = ForceLookup(model(curve), 'Force_z')
+    assert lookup.distance(31.0) == pytest.approx(8.0 - 2.0 * 11.0 / 12.0, abs=0.01)
+    distances = [lookup.distance(force) for force in np.linspace(*lookup.force_range, 200)]
+    assert np.all(np.diff(distances) <= 1e-9)
+
+
+def test_queries_are_clamped_to_the_tables():
+    lookup = ForceLookup(model(np.linspace(10.0, 0.0, 11)), 'Force_z')
+    assert lookup.force_range == (0.0, 10.0)
+    assert lookup.distance(-5.0) == pytest.approx(10.0)
+    assert lookup.distance(50.0) == pytest.approx(0.0)
+    assert lookup.force(-1.0) == pytest.approx(10.0)
+
+
+def test_constant_channel_cannot_be_inverted():
+    with pytest.raises(ValueError, match="constant"):
+        ForceLookup(model(np.full(5, 3.0)), 'Force_z')
+
+
+def test_loop_error_zeroes_the_torque_and_is_reported():
+    lookup = ForceLookup(model(np.linspace(10.0, 0.0, 11)), 'Force_z')
+    readings = iter([5.0, 5.0])
+    torques, errors = [], []
+    switch_interval = sys.getswitchinterval()
+    controller = ForceController(lookup, lambda: next(readings), torques.append, rate_hz=500,
+                                 switch_interval=0.001)
+    controller.on_error = errors.append
+    controller.set_target(8.0)
+    controller.start()
+    controller.thread.join(2.0)
+    assert not controller.running
+    assert torques[0] != 0.0 and torques[-1] == 0.0
+    assert len(errors) == 1 and errors[0] == controller.error and "Force control stopped" in errors[0]
+    assert sys.getswitchinterval() == switch_interval
+    assert controller.stop()
+
+
+def test_stop_does_not_wait_for_a_stuck_tick():
+    lookup = ForceLookup(model(np.linspace(10.0, 0.0, 11)), 'Force_z')
+    writing, release = threading.Event(), threading.Event()
+
+    def write_torque(torque):
+        writing.set()
+        release.wait()
+
+    controller = ForceController(lookup, lambda: 5.0, write_torque, rate_hz=500)
+    controller.start()
+    assert writing.wait(2.0)
+    assert not controller.stop(timeout=0.05)
+    assert controller.running
+    release.set()
+    assert controller.stop(timeout=2.0) and not controller.running
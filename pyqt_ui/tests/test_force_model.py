@@ -0,0 +1,51 @@
+# tests/test_force_model.py
+
+import numpy as np
+import pytest
+from core.force_model import ForceModel
+
+DISTANCES = np.array([0.0, 1.0, 2.0, 4.0])
+FORCES = np.column_stack((DISTANCES * 2.0, DISTANCES ** 2, np.array([5.0, 3.0, 3.0, 0.0])))
+
+
+@pytest.mark.parametrize('mode', ['linear', 'pchip'])
+def test_measured_points_are_reproduced(mode):
+    model = ForceModel(DISTANCES, FORCES, mode=mode)
+    np.testing.assert_allclose(model.forces(DISTANCES), FORCES, atol=1e-12)
+
+
+def test_linear_interpolates_between_points_and_clamps_outside():
+    model = ForceModel(DISTANCES, FORCES)
+    np.testing.assert_allclose(model.forces(3.0), [6.0, 10.0, 1.5])
+    np.testing.assert_allclose(model.forces([-5.0, 9.0]), FORCES[[0, -1]])
+
+
+def test_pchip_keeps_monotone_data_monotone():
+    model = ForceModel(DISTANCES, FORCES, mode='pchip')
+    values = model.forces(np.linspace(0.0, 4.0, 401))
+    assert np.all(np.diff(values[:, 0]) >= -1e-12)
+    # Flat between 1 and 2 mm: no overshoot
+    flat = model.forces(np.linspace(1.0, 2.0, 51))[:, 2]
+    np.testing.assert_allclose(flat, 3.0)
+
+
+def test_array_queries_match_scalar_queries():
+    model = ForceModel(DISTANCES, FORCES, mode='pchip')
+    distances = np.random.default_rng(0).uniform(0.0, 4.0, 1000)
+    batch = model.query(distances)
+    assert batch['Force_y'].shape == (1000,)
+    assert model.query(float(distances[7]))['Force_y'] == pytest.approx(batch['Force_y'][7])
+
+
+def test_unsorted_or_repeated_distances():
+    model = ForceModel(DISTANCES[::-1], FORCES[::-1])
+    np.testing.assert_allclose(model.forces(0.5), [1.0, 0.5, 4.0])
+    with pytest.raises(ValueError):
+        ForceModel([0.0, 1.0, 1.0], np.zeros((3, 3)))
+    with pytest.raises(ValueError):
+        ForceModel(DISTANCES, FORCES, mode='cubic')
+
+
+def test_from_csv_covers_the_measured_range():
+    model = ForceModel.from_csv()
+    assert model.distance_range == (-40.0, 0.0)
@@ -0,0 +1,44 @@
+# tests/test_frame_pool.py
+
+import pytest
+from core.frame_pool import FramePool
+
+
+def test_buffers_are_recycled_after_the_last_release():
+    pool = FramePool(count=2)
+    frame = pool.acquire((4, 4, 3))
+    frame.retain()
+    assert pool.in_flight() == 1
+    frame.release()
+    assert pool.in_flight() == 1
+    frame.release()
+    assert pool.in_flight() == 0
+    # Both buffers can be taken again, the released one included, without allocating
+    assert frame in (pool.acquire((4, 4, 3)), pool.acquire((4, 4, 3)))
+    assert pool.allocations == 2
+
+
+def test_acquire_returns_none_when_every_buffer_is_in_flight():
+    pool = FramePool(count=2)
+    frames = [pool.acquire((2, 2, 3)) for _ in range(2)]
+    assert pool.acquire((2, 2, 3)) is None and pool.exhausted == 1
+    frames[0].release()
+    assert pool.acquire((2, 2, 3)) is frames[0]
+
+
+def test_frames_of_an_old_shape_are_dropped_on_release():
+    pool = FramePool(count=2)
+    old = pool.acquire((2, 2, 3))
+    new = pool.acquire((3, 3, 3))
+    old.release()
+    assert old not in pool.free and pool.in_flight() == 1
+    new.release()
+    assert pool.in_flight() == 0
+
+
+def test_over_release_raises():
+    pool = FramePool(count=1)
+    frame = pool.acquire((2, 2, 3))
+    frame.release()
+    with pytest.raises(RuntimeError):
+        frame.release()
@@ -0,0 +1,87 @@
+# tests/test_gif_cache.py
+
+import time
+import pytest
+from PyQt6.QtGui import QImage
+from core import gif_cache
+from core.gif_cache import GifCache, GifClip
+
+
+def fake_clip(path, size=(64, 64), frames=3):
+    images = [QImage(size[0], size[1], QImage.Format.Format_RGB32) for _ in range(frames)]
+    for image in images:
+        image.fill(0)
+    return GifClip(path, images, [100] * frames)
+
+
+@pytest.fixture
+def decoded(monkeypatch):
+    """Replace the GIF decoder with fake clips, counting the decodes per path."""
+    counts = {}
+
+    def decode(path):
+        counts[path] = counts.get(path, 0) + 1
+        return fake_clip(path)
+
+    monkeypatch.setattr(gif_cache, 'decode_gif', decode)
+    return counts
+
+
+def wait_for(condition, timeout=5.0):
+    end = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < end, "timed out"
+        time.sleep(0.005)
+
+
+def test_scaled_copies_never_evict_decoded_clips(decoded):
+    clip_bytes = fake_clip('a').nbytes
+    cache = GifCache(memory_limit_mb=2 * clip_bytes / (1024 * 1024),
+                     scaled_memory_mb=1.5 * clip_bytes / (1024 * 1024))
+    for path in ('a', 'b'):
+        cache.get_scaled(path, 64, 64)
+    wait_for(lambda: cache.stats()['scaled_clips'] >= 1 and not cache.pending)
+    stats = cache.stats()
+    assert stats['clips'] == 2 and stats['evictions'] == 0
+    assert stats['scaled_clips'] == 1 and stats['scaled_evictions'] == 1
+    assert stats['scaled_memory_mb'] * 1024 * 1024 <= 1.5 * clip_bytes
+    cache.stop()
+
+
+def test_requests_after_stop_restart_the_worker(decoded):
+    cache = GifCache()
+    cache.preload(['a'])
+    cache.stop()
+    assert cache.thread is None
+    assert cache.get('a') is not None
+    assert cache.get('b') is None
+    wait_for(lambda: cache.get('b') is not None)
+    cache.stop()
+
+
+def test_scaled_limit_counts_sizes_not_copies(decoded):
+    cache = GifCache(scaled_limit=2)
+    paths = ['a', 'b', 'c', 'd', 'e']
+    for size in ((10, 10), (20, 20)):
+        for path in paths:
+            cache.get_scaled(path, *size)
+    wait_for(lambda: not cache.pending)
+    assert cache.stats()['scaled_clips'] == 10
+    # A third size evicts every copy of the least recently used size
+    cache.get_scaled('a', 30, 30)
+    wait_for(lambda: not cache.pending)
+    stats = cache.stats()
+    assert stats['scaled_sizes'] == 2 and stats['scaled_clips'] == 6
+    assert cache.get_scaled('a', 10, 10) is None
+    cache.stop()
+
+
+def test_scaling_an_undecoded_clip_decodes_it_once(decoded):
+    cache = GifCache()
+    cache.get_scaled('a', 10, 10)
+    cache.request('a')
+    cache.get('a')
+    wait_for(lambda: not cache.pending)
+    assert decoded == {'a': 1}
+    assert cache.get('a') is not None
+    cache.stop()
@@ -0,0 +1,77 @@
+# tests/test_lod_pyramid.py
+
+import numpy as np
+from core.lod_pyramid import LodPyramid
+
+
+def sweep(count):
+    """A non-decreasing distance channel and a value channel."""
+    distance = np.arange(count, dtype=np.float64) * 0.5
+    return np.vstack((distance, np.sin(distance)))
+
+
+def test_index_range_covers_the_requested_values():
+    pyramid = LodPyramid(2, levels=6, retention=None)
+    data = sweep(1000)
+    pyramid.extend(data)
+    start, stop = pyramid.index_range(0, 100.0, 200.0)
+    inside = np.nonzero((data[0] >= 100.0) & (data[0] <= 200.0))[0]
+    assert start <= inside[0] and stop >= inside[-1] + 1
+    # One sample of margin on each side so the curve reaches the viewport edges
+    assert inside[0] - start <= 1 and stop - (inside[-1] + 1) <= 1
+
+
+def test_index_range_uses_a_coarser_level_once_raw_samples_are_gone():
+    pyramid = LodPyramid(2, levels=6, retention=64, min_retention=16)
+    data = sweep(1000)
+    for first in range(0, 1000, 100):
+        pyramid.extend(data[:, first:first + 100])
+    start, stop = pyramid.index_range(0, 400.0, 450.0)
+    inside = np.nonzero((data[0] >= 400.0) & (data[0] <= 450.0))[0]
+    assert start <= inside[0] and stop >= inside[-1] + 1 and stop <= 1000
+
+
+def test_index_range_is_empty_without_samples():
+    assert LodPyramid(1, levels=4).index_range(0, 0.0, 1.0) == (0, 0)
+
+
+def test_levels_aggregate_min_max_mean():
+    pyramid = LodPyramid(1, levels=3, retention=None)
+    pyramid.extend(np.array([[1.0, 3.0, 2.0, 6.0, 5.0]]))
+    np.testing.assert_array_equal(pyramid.entries(1, 0, 2), [[1.0, 2.0], [3.0, 6.0], [2.0, 4.0]])
+    np.testing.assert_array_equal(pyramid.entries(2, 0, 1), [[1.0], [6.0], [3.0]])
+
+
+def random_walk(count, seed=0):
+    """A distance channel going back and forth, and the sample index."""
+    distance = np.cumsum(np.random.default_rng(seed).normal(size=count))
+    return np.vstack((distance, np.arange(count, dtype=np.float64)))
+
+
+def test_select_reaches_the_raw_samples_of_a_narrow_range():
+    pyramid = LodPyramid(2, levels=20, retention=None)
+    data = random_walk(100003)
+    pyramid.extend(data)
+    x_min, x_max = data[0, -1] - 0.05, data[0, -1] + 0.05
+    segments = pyramid.select(0, x_min, x_max, 1000)
+    assert [level for level, _ in segments] == [0]
+    inside = (data[0] >= x_min) & (data[0] <= x_max)
+    np.testing.assert_array_equal(segments[0][1][1], data[1, inside])
+
+
+def test_select_stays_within_the_budget_and_covers_every_visible_sample():
+    pyramid = LodPyramid(2, levels=20, retention=None)
+    data = random_walk(100003)
+    pyramid.extend(data)
+    x_min, x_max = np.percentile(data[0], [20, 80])
+    segments = pyramid.select(0, x_min, x_max, 500)
+    level = segments[0][0]
+    assert level > 0 and segments[0][1].shape[1] <= 500
+    # Every visible sample falls in one of the returned entries
+    covered = np.zeros(data.shape[1], dtype=bool)
+    for k, entries in segments:
+        first = (entries[2 * 2 + 1] if k else entries[1]) - (2 ** k - 1) / 2  # Mean sample index
+        for start in np.round(first).astype(int):
+            covered[start:start + 2 ** k] = True
+    inside = (data[0] >= x_min) & (data[0] <= x_max)
+    assert np.all(covered[inside])
@@ -0,0 +1,57 @@
+# tests/test_magnet_detector.py
+
+import cv2
+import numpy as np
+from core.magnet_detector import MagnetDetector, TargetTracker
+
+TARGETS = {'magnet': {'lower': [0, 150, 100], 'upper': [10, 255, 255], 'min_area': 20}}
+
+
+def frame_with_magnet(x, y, width=100, height=100):
+    image = np.full((height, width, 3), 90, dtype=np.uint8)
+    cv2.circle(image, (x, y), 6, (0, 0, 255), -1)
+    return image
+
+
+def test_search_window_stays_inside_the_frame():
+    tracker = TargetTracker('magnet', [0, 0, 0], [0, 0, 0])
+    tracker.update(np.array([90.0, 50.0]), (11, 11), 0.0)
+    tracker.update(np.array([110.0, 50.0]), (11, 11), 0.1)
+    # Predicted at x = 130, past the right edge of a 100 px frame
+    x0, y0, x1, y1 = tracker.search_window((100, 100, 3), 0.2, 3.0)
+    assert 0 <= x0 < x1 <= 100 and 0 <= y0 < y1 <= 100
+
+
+def test_search_window_is_none_when_the_prediction_left_the_frame():
+    tracker = TargetTracker('magnet', [0, 0, 0], [0, 0, 0])
+    tracker.update(np.array([10.0, 50.0]), (11, 11), 0.0)
+    tracker.update(np.array([-40.0, 50.0]), (11, 11), 0.1)
+    assert tracker.search_window((100, 100, 3), 0.5, 3.0) is None
+
+
+def test_magnet_leaving_the_frame_is_a_loss_and_is_found_again():
+    detector = MagnetDetector(TARGETS)
+    for step, x in enumerate((60, 75, 90)):
+        detections = detector.detect(frame_with_magnet(x, 50), step * 0.1)
+        assert len(detections) == 1
+    # The velocity now predicts the magnet off the right edge; it reappears elsewhere
+    detections = detector.detect(frame_with_magnet(20, 30), 0.5)
+    assert detector.losses == 1
+    assert len(detections) == 1 and not detections[0]['tracked']
+    assert abs(detections[0]['pixel'][0] - 20) < 1 and abs(detections[0]['pixel'][1] - 30) < 1
+
+
+def test_tracked_magnet_is_found_in_the_window():
+    detector = MagnetDetector(TARGETS)
+    detector.detect(frame_with_magnet(40, 40), 0.0)
+    detections = detector.detect(frame_with_magnet(44, 42), 0.1)
+    assert detections[0]['tracked']
+    assert detector.full_scans == 1 and detector.roi_scans == 1
+
+
+def test_contours_without_area_are_skipped():
+    # A one-pixel-wide line: its contour has no area, so no centroid
+    image = np.full((50, 50, 3), 90, dtype=np.uint8)
+    image[10:40, 25] = (0, 0, 255)
+    tracker = TargetTracker('magnet', [0, 150, 100], [10, 255, 255], min_area=0)
+    assert tracker.find(cv2.cvtColor(image, cv2.COLOR_BGR2HSV)) is None
@@ -0,0 +1,47 @@
+# tests/test_motor_controller.py
+
+import pytest
+from core.motor_controller import MotorController
+
+
+def test_reserve_returns_zero_based_indices():
+    controller = MotorController({1: [1], 2: [2]}, motor_count=7)
+    assert list(controller.reserve('trajectory axes', [5, 6, 7])) == [4, 5, 6]
+    # The same owner may reserve its motors again (one section per view)
+    assert list(controller.reserve('trajectory axes', [5, 6])) == [4, 5]
+
+
+def test_reserve_rejects_motors_of_another_owner():
+    controller = MotorController({1: [1], 2: [2]}, motor_count=7)
+    with pytest.raises(ValueError, match="Motor 1 is used by both sliders and trajectory axes"):
+        controller.reserve('trajectory axes', [1, 5])
+
+
+def test_reserve_rejects_motors_out_of_range():
+    controller = MotorController({1: [1]}, motor_count=4)
+    with pytest.raises(ValueError, match="outside 1..4"):
+        controller.reserve('force control', [5])
+
+
+def test_refused_reservation_takes_no_motor():
+    controller = MotorController({1: [1]}, motor_count=7)
+    with pytest.raises(ValueError, match="Motor 1 is used by both sliders and force control"):
+        controller.reserve('force control', [5, 1])
+    # Motor 5 was checked before motor 1 but must still be free
+    assert list(controller.reserve('trajectory axes', [5])) == [4]
+
+
+def test_synchronized_torque_skips_reserved_motors():
+    controller = MotorController({1: [1]}, sync_mode='synchronized', motor_count=4)
+    controller.reserve('force control', [3])
+    controller.set_torque(9, 2.5)
+    assert list(controller.torques()) == [2.5, 2.5, 0.0, 2.5]
+
+
+def test_motors_updated_does_not_share_the_slider_indices():
+    controller = MotorController({1: [1, 2]}, motor_count=4)
+    emitted = []
+    controller.motors_updated.connect(lambda indices, values: emitted.append(indices))
+    controller.set_torque(1, 1.0)
+    emitted[0][:] = 3
+    assert list(controller.slider_indices[1]) == [0, 1]
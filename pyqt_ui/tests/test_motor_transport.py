@@ -0,0 +1,102 @@
+# tests/test_motor_transport.py
+
+import time
+import pytest
+from core.motor_transport import LatencyHistogram, LoopbackBackend, MotorTransport, StreamBackend
+
+
+class UnreachableBackend(StreamBackend):
+    async def connect(self):
+        raise OSError("no such device")
+
+
+def wait_for(condition, timeout=5.0):
+    end = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < end, "timed out"
+        time.sleep(0.005)
+
+
+def test_stream_backend_is_abstract():
+    with pytest.raises(TypeError):
+        StreamBackend()
+
+
+def test_open_failure_is_reported_and_commands_are_dropped():
+    transport = MotorTransport(UnreachableBackend())
+    transport.start()
+    wait_for(lambda: transport.error is not None)
+    assert "no such device" in transport.error
+    transport.send('TORQUE', 1, 0.5)
+    wait_for(lambda: transport.dropped == 1)
+    assert not transport.stats()['connected']
+    transport.stop()
+
+
+def test_lost_connection_is_reported():
+    backend = LoopbackBackend(response_delay=0.0)
+    transport = MotorTransport(backend)
+    transport.start()
+    assert transport.connected.wait(2.0)
+    backend.drive.stop()
+    wait_for(lambda: transport.error is not None)
+    assert "closed the connection" in transport.error
+    transport.stop()
+
+
+def test_lost_connection_stops_the_other_loops():
+    backend = LoopbackBackend(response_delay=10.0)
+    transport = MotorTransport(backend, timeout=0.2)
+    transport.start()
+    assert transport.connected.wait(2.0)
+    transport.send('TORQUE', 1, 0.5)
+    wait_for(lambda: transport.sent == 1)
+    backend.drive.stop()
+    wait_for(lambda: transport.error is not None)
+    # The unacknowledged command must not be reported as timed out after the failure
+    time.sleep(0.5)
+    assert transport.timeouts == 0
+    transport.stop()
+
+
+def test_stopped_transport_refuses_commands():
+    transport = MotorTransport(LoopbackBackend(response_delay=0.0))
+    transport.start()
+    transport.stop()
+    with pytest.raises(RuntimeError, match="must be called before sending"):
+        transport.send('TORQUE', 1, 0.5)
+
+
+def test_commands_are_acknowledged_in_order():
+    transport = MotorTransport(LoopbackBackend(response_delay=0.0), window=4)
+    transport.start()
+    for index in range(20):
+        transport.send('TORQUE', index % 4 + 1, 0.5)
+    transport.send('BOGUS')
+    wait_for(lambda: transport.acked + transport.errors == 21)
+    assert transport.acked == 20 and transport.errors == 1 and transport.dropped == 0
+    transport.stop()
+
+
+
+def test_latest_value_slot_keeps_only_the_newest_setpoint():
+    backend = LoopbackBackend(response_delay=0.005)
+    transport = MotorTransport(backend, window=1, queue_size=4)
+    transport.start()
+    assert transport.connected.wait(2.0)
+    # Far faster than the drive acknowledges, and more setpoints than the queue holds
+    for index in range(500):
+        transport.send_latest('force', 'TORQUE', 4, index)
+    wait_for(lambda: transport.sent + transport.superseded == 500 and transport.acked == transport.sent)
+    assert transport.dropped == 0 and transport.superseded > 0
+    assert backend.drive.torques[4] == 499
+    transport.stop()
+
+def test_latency_histogram_percentiles():
+    histogram = LatencyHistogram()
+    for latency in [0.001] * 98 + [0.1, 0.2]:
+        histogram.add(latency)
+    stats = histogram.stats()
+    assert stats['latency_ms_p50'] == pytest.approx(1.0, rel=0.3)
+    assert stats['latency_ms_p99'] >= 50
+    assert stats['latency_ms_max'] == pytest.approx(200.0)
@@ -0,0 +1,41 @@
+# tests/test_replay_engine.py
+
+import numpy as np
+import pytest
+from core.replay_engine import ReplayEngine
+
+
+def engine(rows=10):
+    return ReplayEngine({'Distance': np.arange(rows), 'Force_z': -np.arange(rows)})
+
+
+def test_blocks_cover_every_sample_once_as_views():
+    replay = engine(10)
+    blocks = list(replay.blocks(4))
+    assert [start for start, _ in blocks] == [0, 4, 8]
+    np.testing.assert_array_equal(np.concatenate([block['Distance'] for _, block in blocks]), np.arange(10))
+    assert np.shares_memory(blocks[1][1]['Force_z'], replay.columns['Force_z'])
+
+
+def test_blocks_resume_from_a_start_index():
+    assert [start for start, _ in engine(10).blocks(3, start=5)] == [5, 8]
+
+
+def test_sample_returns_floats():
+    assert engine().sample(3) == {'Distance': 3.0, 'Force_z': -3.0}
+
+
+def test_columns_of_different_lengths_are_rejected():
+    with pytest.raises(ValueError):
+        ReplayEngine({'a': np.zeros(3), 'b': np.zeros(4)})
+
+
+def test_block_size_must_be_positive():
+    with pytest.raises(ValueError):
+        list(engine().blocks(0))
+
+
+def test_from_csv_loads_the_force_columns():
+    replay = ReplayEngine.from_csv('config/HBsteel-M22-F.csv')
+    assert set(replay.columns) == {'Distance', 'Force_x', 'Force_y', 'Force_z'}
+    assert len(replay) > 0 and replay.sample(0)['Distance'] == -40.0
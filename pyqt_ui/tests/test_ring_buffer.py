@@ -0,0 +1,44 @@
+# tests/test_ring_buffer.py
+
+import numpy as np
+import pytest
+from core.ring_buffer import GrowableBuffer, RingBuffer
+
+
+def samples(start, stop):
+    values = np.arange(start, stop, dtype=np.float64)
+    return np.vstack((values, -values))
+
+
+def test_append_wraps_around_oldest_first():
+    ring = RingBuffer(4, 2)
+    for value in range(7):
+        ring.append((value, -value))
+    np.testing.assert_array_equal(ring.view(), samples(3, 7))
+    assert len(ring) == 4 and ring.total == 7
+
+
+@pytest.mark.parametrize('sizes', [[3, 3, 3], [1, 5, 2], [6], [2, 9, 1]])
+def test_extend_across_the_end_matches_the_newest_samples(sizes):
+    ring = RingBuffer(5, 2)
+    start = 0
+    for size in sizes:
+        ring.extend(samples(start, start + size))
+        start += size
+        np.testing.assert_array_equal(ring.view(), samples(max(start - 5, 0), start))
+    assert ring.total == start
+
+
+def test_view_is_contiguous_without_copying():
+    ring = RingBuffer(4, 1)
+    ring.extend(samples(0, 6)[:1])
+    view = ring.view()
+    assert np.shares_memory(view, ring.data) and view.flags['C_CONTIGUOUS']
+
+
+def test_growable_buffer_keeps_every_sample():
+    buffer = GrowableBuffer(2, initial_capacity=2)
+    buffer.extend(samples(0, 3))
+    buffer.append((3, -3))
+    buffer.extend(samples(4, 9))
+    np.testing.assert_array_equal(buffer.view(), samples(0, 9))
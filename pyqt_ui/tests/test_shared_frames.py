@@ -0,0 +1,128 @@
+# tests/test_shared_frames.py
+
+import multiprocessing
+import os
+import uuid
+import numpy as np
+import pytest
+from core.shared_frames import MAX_SUBSCRIBERS, PIDS, PORTS, SharedFrameReader, SharedFrameWriter, lock_path
+
+
+@pytest.fixture
+def writer():
+    writer = SharedFrameWriter(f"mbr_test_{uuid.uuid4().hex[:8]}", (4, 6, 3), slots=3)
+    yield writer
+    writer.close()
+
+
+def frame(value):
+    return np.full((4, 6, 3), value, dtype=np.uint8)
+
+
+def test_reader_sees_the_newest_frame(writer):
+    reader = SharedFrameReader(writer.name, notify=False)
+    assert reader.latest() is None
+    for value in range(5):
+        writer.write(frame(value), timestamp=float(value))
+    sequence, timestamp, view = reader.latest()
+    assert sequence == 5 and timestamp == 4.0 and np.all(view == 4)
+    reader.close()
+
+
+def test_each_slot_keeps_the_shape_of_its_frame(writer):
+    reader = SharedFrameReader(writer.name, notify=False)
+    writer.write(frame(1))
+    writer.write(np.full((2, 3), 7, dtype=np.uint8))
+    sequence, _, view = reader.latest()
+    assert view.shape == (2, 3) and np.all(view == 7)
+    # The previous slot still describes the full-size frame
+    previous = (sequence - 1) % writer.ring.slots
+    assert list(writer.ring.shapes[previous]) == [4, 6, 3]
+    reader.close()
+
+
+def test_view_is_no_longer_current_once_the_writer_wraps(writer):
+    reader = SharedFrameReader(writer.name, notify=False)
+    writer.write(frame(1))
+    sequence, _, view = reader.latest()
+    assert reader.is_current(sequence)
+    for value in range(writer.ring.slots):
+        writer.write(frame(value))
+    assert not reader.is_current(sequence)
+    reader.close()
+
+
+def test_slot_being_written_is_not_returned(writer):
+    reader = SharedFrameReader(writer.name, notify=False)
+    writer.write(frame(1))
+    sequence = writer.ring.latest
+    slot = sequence % writer.ring.slots
+    # Simulate the writer in the middle of filling the newest slot (odd seqlock value)
+    writer.ring.sequences[slot] = 2 * sequence + 1
+    assert reader.latest() is None and reader.copy_latest() is None
+    assert reader.torn_reads > 0
+    reader.close()
+
+
+def subscribe(name, results):
+    reader = SharedFrameReader(name)
+    results.put(reader.subscriber_slot)
+    # Stay attached until the writer publishes, i.e. until every reader has subscribed
+    reader.listener.recv(8)
+    reader.close()
+
+
+def test_concurrent_readers_get_distinct_slots(writer):
+    results = multiprocessing.Queue()
+    processes = [multiprocessing.Process(target=subscribe, args=(writer.name, results)) for _ in range(6)]
+    for process in processes:
+        process.start()
+    slots = [results.get(timeout=10) for _ in processes]
+    writer.write(frame(0))
+    for process in processes:
+        process.join(timeout=10)
+    assert None not in slots and len(set(slots)) == len(slots)
+
+
+def test_subscriptions_are_capped(writer):
+    readers = [SharedFrameReader(writer.name) for _ in range(MAX_SUBSCRIBERS + 1)]
+    assert readers[-1].listener is None
+    for reader in readers:
+        reader.close()
+    assert writer.ring.subscribers() == []
+
+
+def test_entries_of_crashed_readers_are_reused(writer):
+    # Every entry held by a reader that died without closing (no process has such a pid)
+    writer.ring.header[PORTS:PIDS] = 9
+    writer.ring.header[PIDS:PIDS + MAX_SUBSCRIBERS] = 2 ** 22 + 1
+    reader = SharedFrameReader(writer.name)
+    assert reader.subscriber_slot == 0
+    assert int(writer.ring.header[PIDS]) == os.getpid()
+    reader.close()
+
+
+def test_close_removes_the_lock_file():
+    writer = SharedFrameWriter(f"mbr_test_{uuid.uuid4().hex[:8]}", (4, 6, 3))
+    reader = SharedFrameReader(writer.name)
+    assert os.path.exists(lock_path(writer.name))
+    writer.close()
+    reader.close()
+    assert not os.path.exists(lock_path(writer.name))
+
+
+def test_live_ring_is_not_reclaimed(writer):
+    with pytest.raises(FileExistsError):
+        SharedFrameWriter(writer.name, (4, 6, 3))
+
+
+def test_stale_ring_is_reclaimed():
+    crashed = SharedFrameWriter(f"mbr_test_{uuid.uuid4().hex[:8]}", (4, 6, 3))
+    # Pretend the writer died without unlinking: no process has a pid above the default pid_max
+    crashed.ring.header[7] = 2 ** 22 + 1
+    crashed.notifier.close()
+    crashed.ring = None
+    crashed.segment.close()
+    replacement = SharedFrameWriter(crashed.name, (4, 6, 3))
+    assert int(replacement.ring.header[7]) == os.getpid()
+    replacement.close()
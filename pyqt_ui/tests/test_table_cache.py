@@ -0,0 +1,63 @@
+# tests/test_table_cache.py
+
+import json
+import os
+import numpy as np
+import pytest
+from core import table_cache
+
+TABLE = '"dist","label","force"\n1,a,10\n2,b,20\n3,c,30\n'
+
+
+@pytest.fixture
+def table(tmp_path):
+    path = tmp_path / 'table.csv'
+    path.write_text(TABLE)
+    return str(path)
+
+
+def test_only_the_wanted_columns_are_parsed(table):
+    headers, values = table_cache.parse_csv(table, ['force', 'dist'])
+    assert headers == ['force', 'dist']
+    np.testing.assert_array_equal(values, [[10, 20, 30], [1, 2, 3]])
+
+
+def test_missing_columns_raise(table):
+    with pytest.raises(ValueError, match="not found"):
+        table_cache.load_columns(table, {'torque': 'torque'})
+
+
+def test_second_load_is_a_memory_mapped_cache_hit(table):
+    first = table_cache.load_columns(table, {'d': 'dist', 'f': 'force'})
+    assert not isinstance(first['d'].base, np.memmap)
+    second = table_cache.load_columns(table, {'d': 'dist', 'f': 'force'})
+    assert isinstance(second['d'].base, np.memmap)
+    np.testing.assert_array_equal(second['f'], [10, 20, 30])
+
+
+def test_cache_is_rebuilt_when_the_content_changes(table):
+    table_cache.load_columns(table, {'f': 'force'})
+    with open(table, 'a') as file:
+        file.write('4,d,40\n')
+    np.testing.assert_array_equal(table_cache.load_columns(table, {'f': 'force'})['f'], [10, 20, 30, 40])
+
+
+def test_touched_file_only_refreshes_the_key(table):
+    table_cache.load_columns(table, {'f': 'force'})
+    data_path, meta_path = table_cache.cache_paths(table)
+    built = os.stat(data_path).st_mtime_ns
+    stat = os.stat(table)
+    os.utime(table, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    table_cache.load_columns(table, {'f': 'force'})
+    with open(meta_path) as file:
+        assert json.load(file)['mtime_ns'] == stat.st_mtime_ns + 10**9
+    assert os.stat(data_path).st_mtime_ns == built
+    assert not os.path.exists(meta_path + '.tmp')
+
+
+def test_new_columns_extend_the_cache(table):
+    table_cache.load_columns(table, {'f': 'force'})
+    columns = table_cache.load_columns(table, {'d': 'dist'})
+    np.testing.assert_array_equal(columns['d'], [1, 2, 3])
+    headers, _ = table_cache.load_table(table, ['force'])
+    assert headers == ['force', 'dist']
@@ -0,0 +1,55 @@
+# tests/test_tick_scheduler.py
+
+import threading
+import time
+import pytest
+from core.tick_scheduler import TickScheduler
+
+
+def test_virtual_clock_replays_an_hour_without_sleeping():
+    scheduler = TickScheduler(1000, virtual=True)
+    start = time.perf_counter()
+    for _ in range(3600 * 1000):
+        scheduler.wait()
+    assert time.perf_counter() - start < 30
+    assert scheduler.now() == pytest.approx(3600.0)
+    assert scheduler.tick == 3600 * 1000
+
+
+def test_deadlines_do_not_drift_with_the_loop_body():
+    scheduler = TickScheduler(200)
+    for _ in range(40):
+        time.sleep(0.002)  # Body shorter than the 5 ms period
+        assert scheduler.wait()
+    assert scheduler.now() == pytest.approx(40 / 200, abs=0.02)
+    assert scheduler.skipped == 0
+
+
+def test_overruns_skip_the_missed_ticks():
+    scheduler = TickScheduler(100, virtual=False)
+    time.sleep(0.055)
+    scheduler.wait()
+    assert scheduler.overruns == 1 and scheduler.skipped >= 3
+    # The next deadline is back on the original grid
+    assert scheduler.deadline() - scheduler.origin == pytest.approx(scheduler.tick * 0.01)
+
+
+def test_set_rate_keeps_the_current_deadline():
+    scheduler = TickScheduler(10, virtual=True)
+    for _ in range(5):
+        scheduler.wait()
+    deadline = scheduler.deadline()
+    scheduler.set_rate(100)
+    assert scheduler.deadline() == pytest.approx(deadline)
+    scheduler.wait()
+    assert scheduler.deadline() == pytest.approx(deadline + 0.01)
+    with pytest.raises(ValueError):
+        scheduler.set_rate(0)
+
+
+def test_stop_wakes_a_pending_wait():
+    scheduler = TickScheduler(0.1)
+    threading.Timer(0.05, scheduler.stop).start()
+    start = time.monotonic()
+    assert scheduler.wait() is False
+    assert time.monotonic() - start < 1.0
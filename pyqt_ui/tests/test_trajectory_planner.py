@@ -0,0 +1,65 @@
+# tests/test_trajectory_planner.py
+
+import numpy as np
+import pytest
+from core.trajectory_planner import plan_moves, plan_path, scurve_timing
+
+V_MAX, A_MAX, J_MAX = [50.0, 50.0], [200.0, 200.0], [2000.0, 2000.0]
+DT = 0.001
+# Finite differences of a sampled profile overshoot the exact limits slightly
+TOLERANCE = 1.02
+
+
+def derivatives(positions, dt):
+    velocity = np.diff(positions, axis=0) / dt
+    acceleration = np.diff(velocity, axis=0) / dt
+    return velocity, acceleration, np.diff(acceleration, axis=0) / dt
+
+
+def assert_within_limits(trajectory, end, profile):
+    _, positions = trajectory.sample(DT)
+    np.testing.assert_array_equal(positions[-1], end)
+    velocity, acceleration, jerk = derivatives(positions, DT)
+    assert np.all(np.abs(velocity).max(axis=0) <= np.array(V_MAX) * TOLERANCE)
+    assert np.all(np.abs(acceleration).max(axis=0) <= np.array(A_MAX) * TOLERANCE)
+    if profile == 'scurve':
+        assert np.all(np.abs(jerk).max(axis=0) <= np.array(J_MAX) * TOLERANCE)
+
+
+@pytest.mark.parametrize('profile', ['trapezoid', 'scurve'])
+@pytest.mark.parametrize('end', [
+    [300.0, 150.0],  # Cruise at the velocity limit
+    [8.0, 4.0],      # Short: the velocity limit is not reached
+    [0.05, 0.0],     # Tiny: the acceleration limit is not reached either
+], ids=['cruise', 'short', 'tiny'])
+def test_sampled_profile_stays_within_the_limits_and_ends_on_target(profile, end):
+    trajectory = plan_moves([[0.0, 0.0]], [end], V_MAX, A_MAX, J_MAX, profile=profile)
+    assert_within_limits(trajectory, end, profile)
+
+
+def test_diagonal_trapezoid_keeps_the_projected_acceleration_limit():
+    trajectory = plan_moves([[0.0, 0.0]], [[300.0, 150.0]], V_MAX, A_MAX, profile='trapezoid')
+    _, positions = trajectory.sample(DT)
+    _, acceleration, _ = derivatives(positions, DT)
+    assert np.abs(acceleration[:, 0]).max() <= 200.0 * TOLERANCE
+
+
+def test_path_visits_every_waypoint_in_order():
+    waypoints = np.array([[0.0, 0.0], [10.0, 0.0], [10.0, 10.0], [10.0, 10.0], [0.0, 0.0]])
+    trajectory = plan_path(waypoints, V_MAX, A_MAX, J_MAX)
+    _, positions = trajectory.sample(DT)
+    samples = np.round(trajectory.start_times / DT).astype(int)
+    np.testing.assert_allclose(positions[samples], waypoints[:-1], atol=1e-9)
+    np.testing.assert_array_equal(positions[-1], waypoints[-1])
+
+
+def test_scurve_timing_covers_the_full_length():
+    lengths = np.array([300.0, 8.0, 0.05])
+    limits = [np.full(3, value) for value in (50.0, 200.0, 2000.0)]
+    tj, ta, tv, a_peak = scurve_timing(lengths, *limits)
+    v_peak = a_peak * (ta - tj)
+    np.testing.assert_allclose(v_peak * ta + v_peak * tv, lengths)
+    assert np.all(a_peak <= 200.0 + 1e-9) and np.all(v_peak <= 50.0 + 1e-9)
+    assert np.all(ta >= 2 * tj - 1e-12)
+    # Cruise only when the velocity limit is reached
+    assert tv[0] > 0 and tv[1] == 0 and tv[2] == 0
@@ -0,0 +1,60 @@
+# tests/test_undistort.py
+
+import json
+import pytest
+from core.undistort import save_calibration
+
+CALIBRATION = {'camera_matrix': [[500.0, 0.0, 320.0], [0.0, 500.0, 240.0], [0.0, 0.0, 1.0]],
+               'dist_coeffs': [0.1, -0.05, 0.0, 0.0], 'image_size': [640, 480], 'rms': 0.3, 'images': 12}
+
+CAMERAS = """{
+  "camera": {"fps": 30},
+  "cameras": [
+    {"name": "top", "source": {"type": "device", "index": 0}},
+    {
+      "name": "side",
+      "source": {"type": "device", "index": 1}
+    }
+  ]
+}
+"""
+
+
+def test_calibration_goes_in_the_matching_camera_entry(tmp_path):
+    config_file = tmp_path / 'config.json'
+    config_file.write_text(CAMERAS)
+    assert save_calibration(CALIBRATION, str(config_file), 'side') == 'cameras[1].calibration'
+    config = json.loads(config_file.read_text())
+    assert config['cameras'][1]['calibration'] == CALIBRATION
+    assert 'calibration' not in config['cameras'][0] and 'calibration' not in config['camera']
+    # Only the new member was added: the rest keeps its layout
+    lines = config_file.read_text().splitlines()
+    assert lines[:6] == CAMERAS.splitlines()[:6]
+    assert lines[6] == '      "source": {"type": "device", "index": 1},'
+    assert lines[7].startswith('      "calibration": {')
+    assert lines[8:] == CAMERAS.splitlines()[7:]
+
+
+def test_calibration_is_replaced_in_place(tmp_path):
+    config_file = tmp_path / 'config.json'
+    config_file.write_text(CAMERAS)
+    save_calibration(CALIBRATION, str(config_file), 'top')
+    first = config_file.read_text()
+    save_calibration(dict(CALIBRATION, rms=0.2), str(config_file), 'top')
+    assert config_file.read_text() == first.replace('"rms": 0.3', '"rms": 0.2')
+
+
+def test_ambiguous_camera_is_refused(tmp_path):
+    config_file = tmp_path / 'config.json'
+    config_file.write_text(CAMERAS)
+    with pytest.raises(ValueError, match=r"\['top', 'side'\]"):
+        save_calibration(CALIBRATION, str(config_file))
+    assert config_file.read_text() == CAMERAS
+
+
+def test_single_camera_config_gets_camera_calibration(tmp_path):
+    config_file = tmp_path / 'config.json'
+    config_file.write_text('{\n    "window_settings": {}\n}\n')
+    assert save_calibration(CALIBRATION, str(config_file)) == 'camera.calibration'
+    assert json.loads(config_file.read_text())['camera']['calibration'] == CALIBRATION
+    assert config_file.read_text().startswith('{\n    "window_settings": {},\n    "camera": {')
@@ -0,0 +1,36 @@
+# tests/test_video_recorder.py
+
+import os
+from core.frame_pool import FramePool
+from core.video_recorder import VideoRecorder
+
+
+def record(recorder, frames=3):
+    pool = FramePool(frames)
+    recorder.start()
+    for _ in range(frames):
+        frame = pool.acquire((48, 64, 3))
+        frame.array[:] = 128
+        recorder.submit(frame)
+        frame.release()
+    recorder.stop()
+    assert recorder.wait(5.0)
+    assert pool.in_flight() == 0
+
+
+def test_unsupported_format_falls_back_and_counts_written_frames(tmp_path):
+    recorder = VideoRecorder(str(tmp_path), codec='ZZZZ', extension='.avi')
+    record(recorder)
+    assert (recorder.codec, recorder.extension) == ('MJPG', '.avi')
+    assert recorder.frames_written == 3 and recorder.error is None
+    assert [os.path.basename(path) for path in recorder.segments] == os.listdir(tmp_path)
+
+
+def test_unwritable_segment_is_reported_and_nothing_is_counted(tmp_path):
+    errors = []
+    recorder = VideoRecorder(str(tmp_path), prefix='missing/camera')
+    recorder.on_error = errors.append
+    record(recorder)
+    assert recorder.frames_written == 0 and not recorder.segments
+    assert len(errors) == 1 and errors[0] == recorder.stats()['error']
+    assert "Cannot open" in errors[0]
@@ -13,9 +13,10 @@ class DetailedView(QWidget):
     # Define a custom signal to notify MainWindow to switch back to the main view
     back_to_main = pyqtSignal()
 
-    def __init__(self, config_manager, real_data=False):
+    def __init__(self, config_manager, real_data=False, motor_controller=None):
         super().__init__()
         self.config = config_manager
+        self.motor_controller = motor_controller
         self.real_data = real_data
         self.init_ui()
 
@@ -31,7 +32,7 @@ class DetailedView(QWidget):
         self.graph_section = GraphSection(self.config)
         self.animation_section = AnimationSection()
         self.camera_section = CameraSection(self.config)
-        self.motor_control_section = MotorControlSection(self.config)
+        self.motor_control_section = MotorControlSection(self.config, self.motor_controller)
 
         # Layout setup
         main_layout = QVBoxLayout()
@@ -87,7 +88,7 @@ class DetailedView(QWidget):
         # Initialize data simulator if using simulated data
         if not self.real_data:
             # self.data_simulator = DataSimulator(file_path="config/param_set_axes.yaml")
-            # self.data_simulator.data_updated.connect(self.graph_section.update_graph_data)
+            # self.data_simulator.block_updated.connect(self.graph_section.update_graph_block)
             # self.data_simulator.start()
             pass
         else:
@@ -134,8 +135,8 @@ class DetailedView(QWidget):
         """Initialize simulated data components."""
         if not hasattr(self, 'data_simulator'):
 
-            self.data_simulator = DataSimulator()
-            self.data_simulator.data_updated.connect(self.graph_section.update_graph_data)
+            self.data_simulator = DataSimulator.from_config(self.config.get('simulator', default=None))
+            self.data_simulator.block_updated.connect(self.graph_section.update_graph_block)
             self.data_simulator.start()
 
     def cleanup_simulated_data(self):
@@ -148,6 +149,7 @@ class DetailedView(QWidget):
         """Cleanup resources when switching views."""
         if not self.real_data and hasattr(self, 'data_simulator'):
             self.data_simulator.stop()
-        self.camera_section.stop_camera()
+        # The camera section releases its streams itself when it is hidden (hideEvent)
         self.animation_section.stop_animation()
+        self.motor_control_section.stop_motion()
         # Add any other cleanup tasks here
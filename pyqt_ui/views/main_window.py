@@ -1,7 +1,9 @@
 #views.main_window.py
 import os
-from PyQt6.QtWidgets import QMainWindow, QWidget, QHBoxLayout, QStackedWidget
+from PyQt6.QtWidgets import QMainWindow, QWidget, QHBoxLayout, QStackedWidget, QMessageBox
 from PyQt6.QtCore import pyqtSlot
+from core.motor_controller import MotorController
+from core.motor_transport import create_transport
 from .simulation_view import SimulationView
 from .real_data_view import RealDataView
 # from .detailed_view import DetailedView
@@ -13,6 +15,7 @@ class MainWindow(QMainWindow):
     def __init__(self, config_manager):
         super().__init__()
         self.config = config_manager
+        self.init_motors()
         self.init_ui()
         self.setStyleSheet("background-color: white;")
         
@@ -22,6 +25,22 @@ class MainWindow(QMainWindow):
         # self.data_simulator.data_updated.connect(self.update_real_data_view)
         # self.data_simulator.start()
 
+    def init_motors(self):
+        """Create the motor transport and controller shared by every view (one port, one torque state)."""
+        try:
+            self.motor_transport = create_transport(self.config.get('motor_transport', default=None), self)
+        except ImportError as e:
+            self.motor_transport = None
+            QMessageBox.warning(self, "Motor Transport Error", f"{e}\nMotor commands are disabled.")
+        if self.motor_transport is not None:
+            self.motor_transport.connection_failed.connect(self.show_motor_error)
+        self.motor_controller = MotorController.from_config(self.config, self.motor_transport, self)
+
+    @pyqtSlot(str)
+    def show_motor_error(self, message):
+        """Report a motor transport that could not connect or lost its connection."""
+        QMessageBox.warning(self, "Motor Transport Error", message)
+
     def init_ui(self):
         """Initialize the main window UI."""
         # Set window size from config
@@ -38,8 +57,8 @@ class MainWindow(QMainWindow):
         # Initialize different views
         self.main_view = QWidget()
         # self.detailed_view = DetailedView(self.config, real_data=False)
-        self.real_detailed_view = RealDetailedView(self.config)
-        self.simulated_detailed_view = SimulatedDetailedView(self.config)
+        self.real_detailed_view = RealDetailedView(self.config, self.motor_controller)
+        self.simulated_detailed_view = SimulatedDetailedView(self.config, self.motor_controller)
 
 
         # Setup main view layout
@@ -91,6 +110,8 @@ class MainWindow(QMainWindow):
 
     def closeEvent(self, event):
         """Handle the window close event."""
-        self.data_simulator.stop()
-        self.detailed_view.cleanup()
+        self.simulated_detailed_view.cleanup()
+        self.real_detailed_view.cleanup()
+        if self.motor_transport is not None:
+            self.motor_transport.stop()
         event.accept()
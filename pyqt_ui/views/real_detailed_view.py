@@ -13,9 +13,10 @@ class DetailedView(QWidget):
     # Define a custom signal to notify MainWindow to switch back to the main view
     back_to_main = pyqtSignal()
 
-    def __init__(self, config_manager):
+    def __init__(self, config_manager, motor_controller=None):
         super().__init__()
         self.config = config_manager
+        self.motor_controller = motor_controller
         self.init_ui()
 
         # Set background color based on data type
@@ -30,7 +31,7 @@ class DetailedView(QWidget):
         self.graph_section = GraphSection(self.config)
         self.animation_section = AnimationSection()
         self.camera_section = CameraSection(self.config)
-        self.motor_control_section = MotorControlSection(self.config)
+        self.motor_control_section = MotorControlSection(self.config, self.motor_controller)
 
         # Layout setup
         main_layout = QVBoxLayout()
@@ -114,8 +115,8 @@ class DetailedView(QWidget):
         """Initialize simulated data components."""
         if not hasattr(self, 'data_simulator'):
 
-            self.data_simulator = DataSimulator()
-            self.data_simulator.data_updated.connect(self.graph_section.update_graph_data)
+            self.data_simulator = DataSimulator.from_config(self.config.get('simulator', default=None))
+            self.data_simulator.block_updated.connect(self.graph_section.update_graph_block)
             self.data_simulator.start()
 
     # def cleanup_simulated_data(self):
@@ -127,6 +128,7 @@ class DetailedView(QWidget):
     def cleanup(self):
         """Cleanup resources when switching views."""
 
-        self.camera_section.stop_camera()
+        # The camera section releases its streams itself when it is hidden (hideEvent)
         self.animation_section.stop_animation()
+        self.motor_control_section.stop_motion()
         # Add any other cleanup tasks here
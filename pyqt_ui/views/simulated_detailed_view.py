@@ -1,7 +1,7 @@
 # views/simulated_detailed_view.py
 
 from PyQt6.QtWidgets import QWidget, QGridLayout, QPushButton, QVBoxLayout, QSizePolicy, QFrame
-from PyQt6.QtCore import pyqtSlot, pyqtSignal, Qt, QSize
+from PyQt6.QtCore import pyqtSlot, pyqtSignal, Qt, QSize, QTimer
 from core.data_simulator import DataSimulator
 from core.motor_controller import MotorController
 from core.camera_stream import CameraStreamHandler
@@ -14,9 +14,10 @@ class DetailedView(QWidget):
     # Define a custom signal to notify MainWindow to switch back to the main view
     back_to_main = pyqtSignal()
 
-    def __init__(self, config_manager, parent=None):
+    def __init__(self, config_manager, motor_controller=None, parent=None):
         super().__init__(parent)
         self.config = config_manager
+        self.motor_controller = motor_controller
         
         self.init_ui()
 
@@ -31,8 +32,8 @@ class DetailedView(QWidget):
         # Initialize components
         self.graph_section = GraphSection(self.config)
         self.animation_section = AnimationSection()
-        self.video_section = VideoSection()
-        self.motor_control_section = MotorControlSection(self.config)
+        self.video_section = VideoSection(self.config)
+        self.motor_control_section = MotorControlSection(self.config, self.motor_controller)
 
         # Layout setup
         main_layout = QVBoxLayout()
@@ -84,18 +85,28 @@ class DetailedView(QWidget):
         grid_layout.setColumnStretch(0, 1)
         grid_layout.setColumnStretch(1, 1)
 
+        # Resize the animation only once the window size has settled
+        self.resize_timer = QTimer(self)
+        self.resize_timer.setSingleShot(True)
+        self.resize_timer.setInterval(self.config.get('gif_cache', 'resize_debounce_ms', default=150))
+        self.resize_timer.timeout.connect(self.update_video_size)
+
         # Connect the motor control section's signal to the video section's slot
         self.motor_control_section.next_video.connect(self.video_section.next_video)
         self.motor_control_section.previous_video.connect(self.video_section.previous_video)
 
     def resizeEvent(self, event):
-        """Handle the window resize event to adjust the animation size to 1/4 of the screen."""
+        """Handle the window resize event; the animation follows once resizing pauses."""
+        self.resize_timer.start()
+        super().resizeEvent(event)
+
+    def update_video_size(self):
+        """Adjust the animation size to 1/4 of the screen."""
         window_width = self.width()
         window_height = self.height()
         quarter_size = QSize(window_width // 2, window_height // 2)
-        
+
         self.video_section.update_gif_size(quarter_size)
-        super().resizeEvent(event)
 
     def init_ui(self):
         """Initialize the detailed view UI."""
@@ -136,8 +147,8 @@ class DetailedView(QWidget):
     def init_simulated_data(self):
         """Initialize simulated data components."""
         if not hasattr(self, 'data_simulator'):
-            self.data_simulator = DataSimulator()
-            self.data_simulator.data_updated.connect(self.graph_section.update_graph_data)
+            self.data_simulator = DataSimulator.from_config(self.config.get('simulator', default=None))
+            self.data_simulator.block_updated.connect(self.graph_section.update_graph_block)
             self.data_simulator.start()
 
     def cleanup_simulated_data(self):
@@ -151,4 +162,6 @@ class DetailedView(QWidget):
         if hasattr(self, 'data_simulator'):
             self.data_simulator.stop()
         self.animation_section.stop_animation()
+        self.video_section.stop_animation()
+        self.motor_control_section.stop_motion()
         # Add any other cleanup tasks here
\ No newline at end of file